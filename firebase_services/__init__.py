@@ -43,7 +43,7 @@ class FirebaseManager:
         self.question_packs = QuestionPackManager(self.base_manager)
         self.users = UserManager(self.base_manager)
         self.status = StatusManager(self.base_manager)
-        self.analytics = AnalyticsManager(self.base_manager)
+        self.analytics = AnalyticsManager(self.base_manager, self.users, self.status, self.question_packs)
         self.fcm = FCMManager(self.base_manager)
 
         # Maintain backward compatibility by exposing service_account_path
@@ -65,6 +65,9 @@ class FirebaseManager:
     def get_question_packs_with_counts(self):
         return self.question_packs.get_question_packs_with_counts()
     
+    def backfill_question_counts(self, pack_ids=None):
+        return self.question_packs.backfill_question_counts(pack_ids)
+    
     def upload_questions(self, pack_name, questions_data):
         return self.question_packs.upload_questions(pack_name, questions_data)
     
@@ -81,22 +84,75 @@ class FirebaseManager:
     def get_users_with_engagement_metrics(self):
         return self.users.get_users_with_engagement_metrics()
     
-    def identify_test_accounts(self, include_criteria=None):
-        return self.users.identify_test_accounts(include_criteria)
+    def get_users_page(self, sort_key='name', descending=False, page_size=50, cursor=None):
+        return self.users.get_users_page(sort_key, descending, page_size, cursor)
+    
+    def identify_test_accounts(self, include_criteria=None, users=None):
+        return self.users.identify_test_accounts(include_criteria, users)
+    
+    def classify_test_accounts(self, rules=None, threshold=1.0, users=None):
+        return self.users.classify_test_accounts(rules, threshold, users)
+    
+    def scan_relationship_integrity(self, dry_run=True):
+        return self.users.scan_relationship_integrity(dry_run)
+    
+    def get_overdue_responders(self, now=None, limit=500, sample=None):
+        return self.users.get_overdue_responders(now, limit, sample)
+    
+    def get_check_in_schedules(self, user_ids):
+        return self.users.get_check_in_schedules(user_ids)
     
     # Status methods
     def get_responder_status_data(self):
         return self.status.get_responder_status_data()
     
+    def sync_check_in_store(self, full=False):
+        return self.status.sync_check_in_store(full)
+    
     def get_responder_check_ins(self, responder_id, limit=20):
         return self.status.get_responder_check_ins(responder_id, limit)
     
+    def get_check_ins_page(self, responder_id, page_size=20, cursor=None, newer=False):
+        return self.status.get_check_ins_page(responder_id, page_size, cursor, newer)
+    
+    def iter_check_ins(self, responder_id, page_size=100):
+        return self.status.iter_check_ins(responder_id, page_size)
+    
+    def get_check_in_heatmap(self, responder_id=None, observer_id=None, result=None):
+        return self.status.get_check_in_heatmap(responder_id, observer_id, result)
+    
     def purge_responder_status(self, responder_id):
         return self.status.purge_responder_status(responder_id)
     
+    def compact_check_ins(self, days=90, responder_ids=None, dry_run=False, max_writes_per_second=500):
+        return self.status.compact_check_ins(days, responder_ids, dry_run, max_writes_per_second)
+    
+    def apply_check_in_retention(self, days, overrides=None, dry_run=True, checkpoint_path=None,
+                                 max_writes_per_second=500):
+        return self.status.apply_check_in_retention(days, overrides, dry_run, checkpoint_path,
+                                                    max_writes_per_second)
+    
+    def reconcile_orphans(self, include_user_names=False):
+        return self.status.reconcile_orphans(include_user_names)
+    
     # Analytics methods
-    def get_engagement_summary(self):
-        return self.analytics.get_engagement_summary()
+    def get_engagement_summary(self, users=None):
+        return self.analytics.get_engagement_summary(users)
+    
+    def get_engagement_summary_aggregated(self):
+        return self.analytics.get_engagement_summary_aggregated()
+    
+    def get_engagement_analytics(self, users=None, role=None, version=None):
+        return self.analytics.get_engagement_analytics(users, role, version=version)
+    
+    def get_question_performance(self, correct_results=('correct',), since=None, until=None):
+        return self.analytics.get_question_performance(correct_results, since, until)
+    
+    def get_check_in_trends(self, window=20, correct_results=('correct',), users=None):
+        return self.analytics.get_check_in_trends(window, correct_results, users)
+    
+    def get_observer_health(self, users=None, token_issues=None, sync=True):
+        return self.analytics.get_observer_health(users, token_issues, sync)
     
     # Cleanup method
     def _cleanup_resources(self):
@@ -0,0 +1,168 @@
+# firebase_services/account_rules.py
+
+import re
+import time
+
+
+class AccountRule:
+    """A named, weighted predicate used to score likely test accounts
+
+    The predicate is called as predicate(user, now) for each user record
+    produced by UserManager.get_users_with_engagement_metrics, where now is
+    the evaluation time as a Unix timestamp.
+    """
+
+    def __init__(self, name, predicate, weight=1.0, description=''):
+        self.name = name
+        self.predicate = predicate
+        self.weight = weight
+        self.description = description
+
+    def evaluate(self, users, now):
+        """Evaluate the rule over a batch of users
+
+        Returns:
+            List of booleans, one per user
+        """
+        predicate = self.predicate
+        return [bool(predicate(user, now)) for user in users]
+
+
+# === RULE FACTORIES ===
+
+def name_pattern_rule(pattern=r'\d', weight=1.0, name='name_pattern'):
+    """Match users whose name matches a regular expression (default: contains a digit)"""
+    regex = re.compile(pattern)
+    return AccountRule(
+        name,
+        lambda user, now: regex.search(user.get('name', '')) is not None,
+        weight,
+        f"Name matches '{pattern}'"
+    )
+
+
+def low_engagement_rule(threshold=20, weight=1.0, name='low_engagement'):
+    """Match users whose engagement score is below the threshold"""
+    return AccountRule(
+        name,
+        lambda user, now: user.get('engagement_score', 0) < threshold,
+        weight,
+        f"Engagement score below {threshold}"
+    )
+
+
+def account_age_rule(min_days=7, weight=1.0, name='account_age'):
+    """Match accounts older than min_days (accounts with unknown age never match)"""
+    min_seconds = min_days * 86400
+
+    def predicate(user, now):
+        created = user.get('created_timestamp')
+        return created is not None and now - created > min_seconds
+
+    return AccountRule(name, predicate, weight, f"Account older than {min_days} days")
+
+
+def notification_count_rule(max_successful=0, min_failures=0, weight=1.0, name='notification_count'):
+    """Match users with at most max_successful successful and at least min_failures failed notifications"""
+    return AccountRule(
+        name,
+        lambda user, now: (user.get('successful_notification_count', 0) <= max_successful and
+                           user.get('token_failure_count', 0) >= min_failures),
+        weight,
+        f"At most {max_successful} successful and at least {min_failures} failed notifications"
+    )
+
+
+def relationship_degree_rule(max_degree=0, weight=1.0, name='relationship_degree'):
+    """Match users linked to at most max_degree other users"""
+    def predicate(user, now):
+        if user.get('role') == 'responder':
+            degree = len(user.get('linked_observers', {}))
+        else:
+            degree = len(user.get('observing', {}))
+        return degree <= max_degree
+
+    return AccountRule(name, predicate, weight, f"At most {max_degree} relationships")
+
+
+def all_of(name, rules, weight=1.0):
+    """Combine rules so that a user matches only if every rule matches"""
+    predicates = [rule.predicate for rule in rules]
+    return AccountRule(
+        name,
+        lambda user, now: all(predicate(user, now) for predicate in predicates),
+        weight,
+        " and ".join(rule.description for rule in rules)
+    )
+
+
+def default_rules(include_criteria=None):
+    """Build the rule set used by UserManager.identify_test_accounts
+
+    The name rule is always included. include_criteria may contain
+    'low_engagement' and/or 'no_activity' to add the optional rules.
+    """
+    rules = [name_pattern_rule(r'\d', name='name_contains_digits')]
+
+    if include_criteria:
+        if 'low_engagement' in include_criteria:
+            rules.append(low_engagement_rule(20))
+
+        if 'no_activity' in include_criteria:
+            rules.append(all_of('no_activity', [
+                notification_count_rule(max_successful=0),
+                account_age_rule(7)
+            ]))
+
+    return rules
+
+
+class AccountClassifier:
+    """Scores users against a set of rules and classifies likely test accounts
+
+    A user's score is the sum of the weights of the rules it matches, and it is
+    classified as a test account when the score reaches the threshold. Rules are
+    evaluated a batch at a time so a large user set is processed rule by rule
+    rather than user by user.
+    """
+
+    def __init__(self, rules=None, threshold=1.0, batch_size=5000):
+        self.rules = list(rules) if rules is not None else default_rules()
+        self.threshold = threshold
+        self.batch_size = batch_size
+
+    def classify(self, users, now=None):
+        """Classify users
+
+        Args:
+            users: List of user dictionaries
+            now: Evaluation time as a Unix timestamp (defaults to the current time)
+
+        Returns:
+            List of dictionaries with 'id', 'name', 'score', 'matched_rules' and 'is_test'
+        """
+        if now is None:
+            now = time.time()
+
+        results = []
+        for start in range(0, len(users), self.batch_size):
+            batch = users[start:start + self.batch_size]
+            scores = [0.0] * len(batch)
+            matched = [[] for _ in batch]
+
+            for rule in self.rules:
+                for i, hit in enumerate(rule.evaluate(batch, now)):
+                    if hit:
+                        scores[i] += rule.weight
+                        matched[i].append(rule.name)
+
+            for user, score, rule_names in zip(batch, scores, matched):
+                results.append({
+                    'id': user['id'],
+                    'name': user.get('name', 'Unnamed'),
+                    'score': score,
+                    'matched_rules': rule_names,
+                    'is_test': score >= self.threshold
+                })
+
+        return results
@@ -1,59 +1,367 @@
 # firebase_services/analytics_manager.py
 
+from concurrent.futures import ThreadPoolExecutor
+import time
+from google.cloud.firestore_v1 import FieldFilter
+
+from .engagement_analytics import (EngagementColumns, histogram, percentiles,
+                                   role_success_rates, signup_cohorts)
+from .check_in_trends import CheckInTrends
+from .observer_health import observer_rollup
+from .question_analytics import DEFAULT_CORRECT_RESULTS, build_question_index, question_performance
+
+
+class EngagementAggregate:
+    """Running engagement totals that can be updated one user at a time
+
+    Holds the counters behind get_engagement_summary so the summary can be
+    built in a single pass and kept current as users are added or deleted,
+    without rescanning the users collection.
+    """
+
+    def __init__(self, users=()):
+        self.total_users = 0
+        self.healthy_users = 0
+        self.declining_users = 0
+        self.churned_users = 0
+        self.test_accounts = 0
+        self.users_with_activity = 0
+        self.total_successes = 0  # Among users with at least one successful notification
+        self.total_failures = 0  # Among users with at least one successful notification
+
+        for user in users:
+            self.add_user(user)
+
+    def _apply(self, user, delta):
+        score = user.get('engagement_score', 0)
+        successes = user.get('successful_notification_count', 0)
+
+        self.total_users += delta
+        if score > 90:
+            self.healthy_users += delta
+        elif score >= 50:
+            self.declining_users += delta
+        else:
+            self.churned_users += delta
+
+        if user.get('is_likely_test', False):
+            self.test_accounts += delta
+
+        if successes > 0:
+            self.users_with_activity += delta
+            self.total_successes += delta * successes
+            self.total_failures += delta * user.get('token_failure_count', 0)
+
+    def add_user(self, user):
+        """Include a user in the totals"""
+        self._apply(user, 1)
+
+    def remove_user(self, user):
+        """Remove a previously added user from the totals"""
+        self._apply(user, -1)
+
+    def to_summary(self):
+        """Get the totals in the get_engagement_summary format"""
+        if self.total_users <= 0:
+            return {}
+
+        avg_success_rate = 0
+        total_attempts = self.total_successes + self.total_failures
+        if total_attempts > 0:
+            avg_success_rate = (self.total_successes / total_attempts) * 100
+
+        return {
+            'total_users': self.total_users,
+            'healthy_users': self.healthy_users,
+            'declining_users': self.declining_users,
+            'churned_users': self.churned_users,
+            'test_accounts': self.test_accounts,
+            'avg_notification_success_rate': avg_success_rate,
+            'users_with_activity': self.users_with_activity
+        }
+
 
 class AnalyticsManager:
     """Manager for engagement metrics and analytics operations"""
 
-    def __init__(self, base_manager):
+    def __init__(self, base_manager, user_manager=None, status_manager=None, question_pack_manager=None):
         self.base_manager = base_manager
+        self.user_manager = user_manager
+        self.status_manager = status_manager
+        self.question_pack_manager = question_pack_manager
+        self._columns = None  # EngagementColumns built from _columns_source
+        self._columns_source = None
+        self._columns_version = None  # Caller's data version the columns were built at
+        self._trends = None  # CheckInTrends fed from the check-in mirror
+        self._trend_settings = None
 
     @property
     def db(self):
         """Get the Firestore database client from base manager"""
         return self.base_manager.db
 
-    def get_engagement_summary(self):
+    def _get_users(self, users=None):
+        """Get the users to analyze, preferring already-loaded data"""
+        if users is not None:
+            return users
+
+        if self.user_manager is None:
+            from .user_manager import UserManager
+            self.user_manager = UserManager(self.base_manager)
+        return self.user_manager.get_cached_users()
+
+    def build_engagement_aggregate(self, users=None):
+        """Build running engagement totals that callers can update incrementally
+
+        Args:
+            users: Already-loaded users (defaults to the cached users)
+
+        Returns:
+            EngagementAggregate instance
+        """
+        return EngagementAggregate(self._get_users(users))
+
+    def get_engagement_summary(self, users=None):
         """Get summary statistics for user engagement
 
+        Args:
+            users: Already-loaded users with engagement metrics. If omitted, the
+                users cached by UserManager are used (loading them only if needed).
+
         Returns:
             Dictionary with engagement statistics
         """
         try:
-            # We need to get users with engagement metrics, but this is now in UserManager
-            # We'll need to coordinate with UserManager for this
-            from .user_manager import UserManager
-            user_manager = UserManager(self.base_manager)
-            users = user_manager.get_users_with_engagement_metrics()
+            return self.build_engagement_aggregate(users).to_summary()
+        except Exception as e:
+            print(f"Error getting engagement summary: {str(e)}")
+            return {}
+
+    def get_engagement_summary_aggregated(self):
+        """Get engagement summary statistics using server-side aggregation queries
+
+        Runs count() and sum() aggregations over the users collection concurrently
+        instead of downloading every user document. Users without an engagement
+        score count as churned, matching get_engagement_summary. Test accounts are
+        identified by name, which cannot be aggregated server-side, so
+        'test_accounts' is None in the result.
+
+        Falls back to the client-side get_engagement_summary if the aggregation
+        queries are not supported.
+
+        Returns:
+            Dictionary with engagement statistics
+        """
+        try:
+            users_ref = self.db.collection('users')
+            score_field = 'engagementMetrics.engagementScore'
+            success_field = 'engagementMetrics.successfulNotificationCount'
+            failure_field = 'engagementMetrics.tokenFailureCount'
+
+            queries = {
+                'total': users_ref.count(alias='count'),
+                'healthy': users_ref.where(filter=FieldFilter(score_field, '>', 90)).count(alias='count'),
+                'declining': users_ref
+                    .where(filter=FieldFilter(score_field, '>=', 50))
+                    .where(filter=FieldFilter(score_field, '<=', 90))
+                    .count(alias='count'),
+                'active': users_ref
+                    .where(filter=FieldFilter(success_field, '>', 0))
+                    .count(alias='count')
+                    .sum(success_field, alias='successes')
+                    .sum(failure_field, alias='failures')
+            }
+
+            def run_query(query):
+                return {result.alias: result.value for result in query.get()[0]}
+
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                futures = {name: executor.submit(run_query, query) for name, query in queries.items()}
+                results = {name: future.result() for name, future in futures.items()}
 
-            if not users:
+            total_users = int(results['total']['count'])
+            if total_users == 0:
                 return {}
 
-            # Calculate summary statistics
-            total_users = len(users)
-            healthy_users = len([u for u in users if u['engagement_score'] > 90])
-            declining_users = len([u for u in users if 50 <= u['engagement_score'] <= 90])
-            churned_users = len([u for u in users if u['engagement_score'] < 50])
-            test_accounts = len([u for u in users if u['is_likely_test']])
+            healthy_users = int(results['healthy']['count'])
+            declining_users = int(results['declining']['count'])
 
-            # Token health statistics
-            users_with_notifications = [u for u in users if u['successful_notification_count'] > 0]
+            total_successes = results['active'].get('successes') or 0
+            total_failures = results['active'].get('failures') or 0
             avg_success_rate = 0
-            if users_with_notifications:
-                total_successes = sum(u['successful_notification_count'] for u in users_with_notifications)
-                total_failures = sum(u['token_failure_count'] for u in users_with_notifications)
-                total_attempts = total_successes + total_failures
-                if total_attempts > 0:
-                    avg_success_rate = (total_successes / total_attempts) * 100
+            if total_successes + total_failures > 0:
+                avg_success_rate = (total_successes / (total_successes + total_failures)) * 100
 
             return {
                 'total_users': total_users,
                 'healthy_users': healthy_users,
                 'declining_users': declining_users,
-                'churned_users': churned_users,
-                'test_accounts': test_accounts,
+                'churned_users': total_users - healthy_users - declining_users,
+                'test_accounts': None,
                 'avg_notification_success_rate': avg_success_rate,
-                'users_with_activity': len(users_with_notifications)
+                'users_with_activity': int(results['active']['count'])
             }
         except Exception as e:
-            print(f"Error getting engagement summary: {str(e)}")
-            return {}
\ No newline at end of file
+            print(f"Server-side engagement aggregation unavailable, falling back to client-side: {str(e)}")
+            return self.get_engagement_summary()
+
+    def get_engagement_columns(self, users=None, version=None):
+        """Get a columnar view of the users' engagement fields
+
+        User lists can be changed in place, so the columns are only reused for
+        the same list at the same version; without a version they are rebuilt
+        on every call.
+
+        Args:
+            users: Already-loaded users (defaults to the cached users)
+            version: Version of the users list, bumped by the owner on every change
+                (e.g. UserTable.version)
+
+        Returns:
+            EngagementColumns instance
+        """
+        users = self._get_users(users)
+        if (self._columns is None or version is None or users is not self._columns_source
+                or version != self._columns_version):
+            self._columns = EngagementColumns(users)
+            self._columns_source = users
+            self._columns_version = version
+        return self._columns
+
+    def get_engagement_analytics(self, users=None, role=None, min_score=None, max_score=None,
+                                 created_after=None, created_before=None, bins=10, now=None, version=None):
+        """Get engagement distribution, cohort and per-role analytics for a slice of users
+
+        Args:
+            users: Already-loaded users (defaults to the cached users)
+            role, min_score, max_score, created_after, created_before:
+                Optional slice conditions (see EngagementColumns.select)
+            bins: Number of score histogram bins over 0-100
+            now: Reference Unix timestamp for cohort ages (defaults to the current time)
+            version: Version of the users list (see get_engagement_columns)
+
+        Returns:
+            Dictionary with 'users', 'histogram', 'percentiles', 'cohorts',
+            'score_decay_per_week' and 'roles'
+        """
+        try:
+            columns = self.get_engagement_columns(users, version)
+            indices = columns.select(role, min_score, max_score, created_after, created_before)
+            scores = [columns.scores[i] for i in indices]
+
+            cohorts, decay = signup_cohorts(columns, indices, now if now is not None else time.time())
+
+            return {
+                'users': len(indices),
+                'histogram': histogram(scores, bins),
+                'percentiles': percentiles(scores),
+                'cohorts': cohorts,
+                'score_decay_per_week': decay,
+                'roles': role_success_rates(columns, indices)
+            }
+        except Exception as e:
+            print(f"Error computing engagement analytics: {str(e)}")
+            return {}
+
+    def _get_status_manager(self):
+        if self.status_manager is None:
+            from .status_manager import StatusManager
+            self.status_manager = StatusManager(self.base_manager)
+        return self.status_manager
+
+    def get_question_performance(self, correct_results=DEFAULT_CORRECT_RESULTS, since=None, until=None,
+                                 min_check_ins=10, sync=True):
+        """Get answer accuracy and volume per question and per question pack
+
+        Check-ins from every responder are counted per prompt and result in the
+        local check-in mirror, then joined to the pack questions by prompt text.
+
+        Args:
+            correct_results: Check-in result values counted as correct
+            since / until: Optional Unix time bounds on the check-ins
+            min_check_ins: Questions with fewer check-ins are never flagged
+                as confusing or trivial
+            sync: Bring the check-in mirror up to date first
+
+        Returns:
+            Dictionary with 'questions', 'packs', 'unmatched' and 'check_ins'
+            (see question_analytics.question_performance)
+        """
+        try:
+            status_manager = self._get_status_manager()
+            if self.question_pack_manager is None:
+                from .question_pack_manager import QuestionPackManager
+                self.question_pack_manager = QuestionPackManager(self.base_manager)
+
+            if sync:
+                status_manager.sync_check_in_store()
+
+            packs = self.question_pack_manager.get_pack_questions()
+            prompt_counts = status_manager.check_in_store.prompt_result_counts(since, until)
+            return question_performance(prompt_counts, build_question_index(packs), packs,
+                                        correct_results, min_check_ins)
+        except Exception as e:
+            print(f"Error computing question performance: {str(e)}")
+            return {}
+
+    def get_check_in_trends(self, window=20, correct_results=DEFAULT_CORRECT_RESULTS, users=None, sync=True):
+        """Get rolling accuracy and lateness trends for every responder
+
+        The trends are kept between calls: each call syncs the check-in mirror
+        and adds only each responder's check-ins newer than those already
+        counted (see CheckInTrends.update_from_store). Changing the window or
+        the correct results starts over from the whole mirror.
+
+        Args:
+            window: Number of check-ins per rolling window
+            correct_results: Check-in result values counted as correct
+            users: Already-loaded users for the expected check-in intervals
+                (defaults to the cached users)
+            sync: Bring the check-in mirror up to date first
+
+        Returns:
+            Dictionary with 'responders' (responder_id -> CheckInTrends.trend)
+            and 'declining' (responder IDs)
+        """
+        try:
+            status_manager = self._get_status_manager()
+            if sync:
+                status_manager.sync_check_in_store()
+
+            settings = (window, tuple(correct_results))
+            if self._trends is None or settings != self._trend_settings:
+                self._trends = CheckInTrends(window, correct_results)
+                self._trend_settings = settings
+            trends = self._trends
+
+            trends.set_schedules(self._get_users(users))
+            trends.update_from_store(status_manager.check_in_store)
+
+            return {
+                'responders': {responder_id: trends.trend(responder_id) for responder_id in trends.responder_ids()},
+                'declining': trends.declining()
+            }
+        except Exception as e:
+            print(f"Error computing check-in trends: {str(e)}")
+            return {}
+
+    def get_observer_health(self, users=None, token_issues=None, sync=True):
+        """Get a health rollup of the responders each observer watches
+
+        Joins the already-loaded users, the check-in mirror's per-responder
+        summary and token issues in memory (see observer_health.observer_rollup).
+
+        Args:
+            users: Already-loaded users (defaults to the cached users)
+            token_issues: Dictionary mapping user ID to its token issue entry
+            sync: Bring the check-in mirror up to date first
+
+        Returns:
+            List of observer rollup dictionaries, worst health first
+        """
+        try:
+            summary = self._get_status_manager().get_check_in_summary(sync)
+            return observer_rollup(self._get_users(users), summary, token_issues)
+        except Exception as e:
+            print(f"Error computing observer health: {str(e)}")
+            return []
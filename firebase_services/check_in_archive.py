@@ -0,0 +1,205 @@
+# firebase_services/check_in_archive.py
+
+import json
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from .lru_cache import LRUCache
+from .overdue_monitor import to_epoch
+
+ARCHIVE_COLLECTION = 'check_in_archives'
+ARCHIVE_ENCODING = 'zlib+json'
+MAX_ARCHIVE_BYTES = 900000  # Leaves room under Firestore's 1 MiB document limit
+
+# Position of an archived check-in, used as a page cursor like a document snapshot
+ArchiveCursor = namedtuple('ArchiveCursor', ['month', 'ts', 'check_in_id'])
+
+
+def month_key(epoch):
+    """Get the 'YYYY-MM' archive ID of the UTC month containing a Unix time"""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m')
+
+
+def _encode_value(value):
+    if hasattr(value, 'timestamp'):
+        return {'__datetime__': value.timestamp()}
+    return str(value)
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromtimestamp(obj['__datetime__'], tz=timezone.utc)
+    return obj
+
+
+def encode_check_ins(check_ins):
+    """Compress check-in dictionaries (each with its 'id') into an archive blob
+
+    Datetimes are tagged so they decode back to datetimes; other values
+    JSON can't hold are stored as strings.
+    """
+    return zlib.compress(json.dumps(check_ins, default=_encode_value, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def decode_check_ins(blob):
+    """Decompress an archive blob back into check-in dictionaries"""
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'), object_hook=_decode_object)
+
+
+def _sort_key(check_in):
+    return to_epoch(check_in.get('timestamp')) or 0.0, check_in['id']
+
+
+class CheckInArchive:
+    """Monthly compressed archives of a responder's old check-ins
+
+    Each archive is one document in responder_status/{id}/check_in_archives
+    named after its UTC month, holding every check-in of that month as
+    zlib-compressed JSON plus its count and oldest/newest Unix times. Reading
+    a month of history is one document read instead of one per check-in.
+
+    Decoded months and each responder's month index are kept in LRU caches,
+    so paging through archived history only reads each archive once.
+    """
+
+    def __init__(self, db_provider, cache_size=64):
+        self._db_provider = db_provider
+        self._months = LRUCache(maxsize=cache_size)  # (responder_id, month) -> check-ins newest first
+        self._indexes = LRUCache(maxsize=cache_size)  # responder_id -> [(month, oldest, newest)] newest first
+
+    @property
+    def db(self):
+        return self._db_provider()
+
+    def _collection(self, responder_id):
+        return self.db.collection('responder_status').document(responder_id).collection(ARCHIVE_COLLECTION)
+
+    def invalidate(self, responder_id):
+        """Forget everything cached for a responder"""
+        index = self._indexes.pop(responder_id) or []
+        for month, _, _ in index:
+            self._months.pop((responder_id, month))
+
+    def clear(self):
+        """Forget everything cached"""
+        self._indexes.clear()
+        self._months.clear()
+
+    # === Reads ===
+
+    def month_index(self, responder_id):
+        """Get a responder's archived months as (month, oldest, newest) tuples, newest first"""
+        index = self._indexes.get(responder_id)
+        if index is None:
+            index = []
+            for doc in self._collection(responder_id).select(['oldest', 'newest']).stream():
+                data = doc.to_dict() or {}
+                index.append((doc.id, data.get('oldest'), data.get('newest')))
+            index.sort(reverse=True)
+            self._indexes.put(responder_id, index)
+        return index
+
+    def load_month(self, responder_id, month):
+        """Get the check-ins archived for a month, newest first"""
+        check_ins = self._months.get((responder_id, month))
+        if check_ins is None:
+            doc = self._collection(responder_id).document(month).get()
+            data = doc.to_dict() if doc.exists else None
+            check_ins = decode_check_ins(data['data']) if data and data.get('data') else []
+            check_ins.sort(key=_sort_key, reverse=True)
+            self._months.put((responder_id, month), check_ins)
+        return check_ins
+
+    def older(self, responder_id, before=None, limit=20):
+        """Get archived check-ins older than a cursor, newest first
+
+        Args:
+            responder_id: ID of the responder
+            before: ArchiveCursor to continue from, or None to start at the newest archive
+            limit: Maximum number of check-ins to return
+
+        Returns:
+            Tuple (check_ins, has_more)
+        """
+        result = []
+        for month, _, _ in self.month_index(responder_id):
+            if before is not None and month > before.month:
+                continue
+            for check_in in self.load_month(responder_id, month):
+                if before is not None and _sort_key(check_in) >= (before.ts, before.check_in_id):
+                    continue
+                if len(result) == limit:
+                    return result, True
+                result.append(check_in)
+        return result, False
+
+    def newer(self, responder_id, after, limit=20):
+        """Get archived check-ins newer than a cursor, oldest first
+
+        Args:
+            responder_id: ID of the responder
+            after: ArchiveCursor to continue from
+            limit: Maximum number of check-ins to return
+
+        Returns:
+            Tuple (check_ins, has_more)
+        """
+        result = []
+        for month, _, _ in reversed(self.month_index(responder_id)):
+            if month < after.month:
+                continue
+            for check_in in reversed(self.load_month(responder_id, month)):
+                if _sort_key(check_in) <= (after.ts, after.check_in_id):
+                    continue
+                if len(result) == limit:
+                    return result, True
+                result.append(check_in)
+        return result, False
+
+    def iter_all(self, responder_id):
+        """Iterate over every archived check-in of a responder, newest first"""
+        for month, _, _ in self.month_index(responder_id):
+            yield from self.load_month(responder_id, month)
+
+    @staticmethod
+    def cursor(check_in):
+        """Get the ArchiveCursor of an archived check-in"""
+        ts, check_in_id = _sort_key(check_in)
+        return ArchiveCursor(month_key(ts), ts, check_in_id)
+
+    # === Writes ===
+
+    def write_month(self, responder_id, month, check_ins):
+        """Merge check-ins into a month's archive
+
+        Check-ins already in the archive are replaced by ID, so compacting the
+        same check-ins twice leaves one copy.
+
+        Args:
+            responder_id: ID of the responder
+            month: 'YYYY-MM' archive ID
+            check_ins: Check-in dictionaries, each with its document 'id'
+
+        Returns:
+            Tuple (success, message)
+        """
+        merged = {check_in['id']: check_in for check_in in self.load_month(responder_id, month)}
+        merged.update((check_in['id'], check_in) for check_in in check_ins)
+        ordered = sorted(merged.values(), key=_sort_key, reverse=True)
+
+        blob = encode_check_ins(ordered)
+        if len(blob) > MAX_ARCHIVE_BYTES:
+            return False, f"Archive {month} for {responder_id} would be {len(blob)} bytes, over the document limit"
+
+        self._collection(responder_id).document(month).set({
+            'month': month,
+            'count': len(ordered),
+            'oldest': _sort_key(ordered[-1])[0],
+            'newest': _sort_key(ordered[0])[0],
+            'encoding': ARCHIVE_ENCODING,
+            'data': blob
+        })
+        self.invalidate(responder_id)
+        self._months.pop((responder_id, month))
+        return True, f"Archived {len(ordered)} check-ins in {month}"
@@ -0,0 +1,365 @@
+# firebase_services/check_in_retention.py
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from google.cloud.firestore_v1 import FieldFilter
+
+from .check_in_archive import ARCHIVE_COLLECTION
+
+ALL_RESPONDERS = '*'
+
+
+def cutoff_value(sample, epoch):
+    """Express a cutoff Unix time the way check-in timestamps are stored
+
+    Firestore range filters only match values of the same type, so the cutoff
+    takes the type of a stored timestamp: a datetime, epoch seconds or
+    milliseconds, or an ISO 8601 string (compared as text, in UTC).
+    """
+    if isinstance(sample, str):
+        return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    if isinstance(sample, (int, float)):
+        return int(epoch * 1000) if sample > 1e11 else epoch
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+class _BulkDeleter:
+    """Deletes through Firestore's BulkWriter, which batches, parallelizes and rate-limits itself"""
+
+    def __init__(self, db, max_writes_per_second):
+        from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+
+        self._lock = threading.Lock()
+        self._deleted = []
+        self.errors = []
+        self._writer = db.bulk_writer(options=BulkWriterOptions(
+            initial_ops_per_second=min(500, max_writes_per_second),
+            max_ops_per_second=max_writes_per_second))
+        self._writer.on_write_result(self._on_result)
+        self._writer.on_write_error(self._on_error)
+
+    def _on_result(self, reference, result, writer):
+        with self._lock:
+            self._deleted.append(reference.path)
+
+    def _on_error(self, error, writer):
+        if error.attempts < 5:
+            return True  # Retry with backoff
+        with self._lock:
+            self.errors.append(f"{error.reference.path}: {error.message}")
+        return False
+
+    def delete(self, reference):
+        self._writer.delete(reference)
+
+    def flush(self):
+        """Wait for queued deletes and get the paths deleted since the last flush"""
+        self._writer.flush()
+        with self._lock:
+            deleted, self._deleted = self._deleted, []
+        return deleted
+
+    def close(self):
+        self._writer.close()
+
+
+class _BatchDeleter:
+    """Fallback for clients without BulkWriter: concurrent WriteBatch commits, rate-limited"""
+
+    BATCH_SIZE = 400
+
+    def __init__(self, db, max_writes_per_second, max_workers):
+        self._db = db
+        self._rate = max_writes_per_second
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+        self._pending = []
+        self._started = time.monotonic()
+        self._submitted = 0
+        self.errors = []
+
+    def _commit(self, references):
+        batch = self._db.batch()
+        for reference in references:
+            batch.delete(reference)
+        batch.commit()
+        return [reference.path for reference in references]
+
+    def _submit(self):
+        # Hold back until this batch fits in the write rate since the start
+        self._submitted += len(self._pending)
+        wait = self._submitted / self._rate - (time.monotonic() - self._started)
+        if wait > 0:
+            time.sleep(wait)
+        self._futures.append(self._executor.submit(self._commit, self._pending))
+        self._pending = []
+
+    def delete(self, reference):
+        self._pending.append(reference)
+        if len(self._pending) >= self.BATCH_SIZE:
+            self._submit()
+
+    def flush(self):
+        """Commit queued deletes and get the paths deleted since the last flush"""
+        if self._pending:
+            self._submit()
+        deleted = []
+        for future in self._futures:
+            try:
+                deleted.extend(future.result())
+            except Exception as e:
+                self.errors.append(str(e))
+        self._futures = []
+        return deleted
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown()
+
+
+def open_deleter(db, max_writes_per_second=500, max_workers=4):
+    """Get a rate-limited bulk deleter with delete(reference), flush() and close()
+
+    flush() waits for the queued deletes and returns the paths deleted since
+    the last flush; failures are collected in the deleter's errors list.
+    """
+    if hasattr(db, 'bulk_writer'):
+        return _BulkDeleter(db, max_writes_per_second)
+    return _BatchDeleter(db, max_writes_per_second, max_workers)
+
+
+class CheckInRetention:
+    """Deletes check-ins older than a retention policy across all responders
+
+    The default policy is one collection_group('check_ins') range query on
+    timestamp, which needs the same collection-group index as incremental
+    check-in syncs. Responders with an override are skipped by that query and
+    get their own range query on their check_ins subcollection. Queries only
+    select the timestamp, so matches stream as keys in pages, and deletes go
+    through a rate-limited BulkWriter (or concurrent batches when the client
+    has none).
+
+    Monthly archives (see CheckInArchive) whose newest check-in is older than
+    the cutoff are deleted the same way; an archive straddling the cutoff is
+    kept whole.
+
+    Progress is checkpointed to a JSON file after every page; a run with the
+    same policy picks up after the scopes a previous run completed.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, db, check_in_store=None):
+        self.db = db
+        self.check_in_store = check_in_store
+
+    def run(self, days, overrides=None, dry_run=True, checkpoint_path=None,
+            max_writes_per_second=500, max_workers=4, now=None):
+        """Apply a retention policy to every responder's check-ins
+
+        Args:
+            days: Days of check-ins to keep (None keeps everything not overridden)
+            overrides: Dictionary mapping responder ID to days to keep for that
+                responder (None keeps all of its check-ins)
+            dry_run: If True, only count the check-ins that would be deleted
+            checkpoint_path: JSON file to record progress in and resume from
+            max_writes_per_second: Ceiling on the delete rate
+            max_workers: Concurrent batch commits when BulkWriter is unavailable
+            now: Reference Unix time for the cutoffs (defaults to the current time)
+
+        Returns:
+            Dictionary with the run report, including a 'scopes' list with the
+            cutoff and matched/deleted counts of the default policy and each override
+        """
+        now = now if now is not None else time.time()
+        overrides = overrides or {}
+        policy = {'days': days, 'overrides': overrides}
+        report = {
+            'dry_run': dry_run,
+            'policy': policy,
+            'scopes': [],
+            'matched': 0,
+            'deleted': 0,
+            'archives_matched': 0,
+            'archives_deleted': 0,
+            'resumed': False,
+            'errors': []
+        }
+
+        try:
+            sample = self._oldest_timestamp()
+            if sample is None:
+                return report
+
+            scopes = []
+            if days is not None:
+                scopes.append((ALL_RESPONDERS, now - days * 86400))
+            for responder_id, keep_days in sorted(overrides.items()):
+                if keep_days is not None:
+                    scopes.append((responder_id, now - keep_days * 86400))
+
+            checkpoint = {'policy': policy, 'completed': [], 'deleted': 0}
+            if not dry_run and checkpoint_path:
+                saved = self._load_checkpoint(checkpoint_path)
+                if saved and saved.get('policy') == policy:
+                    checkpoint = saved
+                    report['resumed'] = True
+                    report['deleted'] = saved.get('deleted', 0)
+
+            deleter = None if dry_run else open_deleter(self.db, max_writes_per_second, max_workers)
+
+            try:
+                for scope, cutoff in scopes:
+                    entry = {
+                        'scope': scope,
+                        'cutoff': datetime.fromtimestamp(cutoff, tz=timezone.utc).isoformat(),
+                        'matched': 0,
+                        'deleted': 0,
+                        'archives_matched': 0,
+                        'archives_deleted': 0
+                    }
+                    report['scopes'].append(entry)
+                    if scope in checkpoint['completed']:
+                        entry['skipped'] = True
+                        continue
+
+                    query = self._scope_query(scope, cutoff_value(sample, cutoff))
+                    errors_before = len(deleter.errors) if deleter is not None else 0
+                    skip = set(overrides) if scope == ALL_RESPONDERS else set()
+
+                    if dry_run and not skip:
+                        # Nothing to filter out per document, so let Firestore count the matches
+                        entry['matched'] = int(query.count(alias='count').get()[0][0].value)
+                    else:
+                        for references in self._pages(query, skip):
+                            entry['matched'] += len(references)
+                            if dry_run:
+                                continue
+                            for reference in references:
+                                deleter.delete(reference)
+                            deleted = deleter.flush()
+                            entry['deleted'] += len(deleted)
+                            checkpoint['deleted'] += len(deleted)
+                            if self.check_in_store is not None:
+                                self.check_in_store.remove_paths(deleted)
+                            self._save_checkpoint(checkpoint_path, checkpoint)
+                            print(f"Retention ({scope}): deleted {entry['deleted']} check-ins so far")
+
+                    # Archives store their newest check-in as a Unix time, whatever the timestamp type
+                    archive_query = self._scope_query(scope, cutoff, ARCHIVE_COLLECTION, 'newest')
+                    for references in self._pages(archive_query, skip):
+                        entry['archives_matched'] += len(references)
+                        if dry_run:
+                            continue
+                        for reference in references:
+                            deleter.delete(reference)
+                        deleted = deleter.flush()
+                        entry['archives_deleted'] += len(deleted)
+                        if self.check_in_store is not None:
+                            self.check_in_store.remove_archived(deleted)
+
+                    report['matched'] += entry['matched']
+                    report['archives_matched'] += entry['archives_matched']
+                    if not dry_run:
+                        report['archives_deleted'] += entry['archives_deleted']
+                        report['deleted'] += entry['deleted']
+                        if len(deleter.errors) == errors_before:
+                            checkpoint['completed'].append(scope)
+                            self._save_checkpoint(checkpoint_path, checkpoint)
+            finally:
+                if deleter is not None:
+                    deleter.close()
+                    report['errors'].extend(deleter.errors)
+
+            if not dry_run and checkpoint_path and not report['errors']:
+                os.remove(checkpoint_path)  # Finished, so the next run starts over
+
+            mode = "would delete" if dry_run else "deleted"
+            count = report['matched'] if dry_run else report['deleted']
+            archives = report['archives_matched'] if dry_run else report['archives_deleted']
+            print(f"Check-in retention {mode} {count} check-ins and {archives} archives")
+            return report
+
+        except Exception as e:
+            print(f"Error applying check-in retention: {e}")
+            import traceback
+            print(traceback.format_exc())
+            report['errors'].append(str(e))
+            return report
+
+    def _oldest_timestamp(self):
+        """Get the oldest stored check-in timestamp, which sets the type of the cutoffs"""
+        docs = self.db.collection_group('check_ins') \
+            .order_by('timestamp') \
+            .select(['timestamp']) \
+            .limit(1) \
+            .stream()
+        for doc in docs:
+            return (doc.to_dict() or {}).get('timestamp')
+        return None
+
+    def _scope_query(self, scope, cutoff, collection='check_ins', field='timestamp'):
+        if scope == ALL_RESPONDERS:
+            query = self.db.collection_group(collection)
+        else:
+            query = self.db.collection('responder_status').document(scope).collection(collection)
+        return query.where(filter=FieldFilter(field, '<', cutoff)) \
+            .order_by(field) \
+            .select([field])
+
+    def _pages(self, query, skip_responders):
+        """Yield lists of matching document references, a page at a time
+
+        Pages are read in full before they are deleted, and each page resumes
+        after the last document of the previous one.
+        """
+        last = None
+        while True:
+            page_query = query.limit(self.PAGE_SIZE)
+            if last is not None:
+                page_query = page_query.start_after(last)
+            docs = list(page_query.stream())
+            if not docs:
+                return
+
+            references = []
+            for doc in docs:
+                status_ref = doc.reference.parent.parent
+                if status_ref is None or status_ref.parent.id != 'responder_status':
+                    continue  # A subcollection somewhere else
+                if status_ref.id in skip_responders:
+                    continue  # Has its own retention override
+                references.append(doc.reference)
+            if references:
+                yield references
+
+            if len(docs) < self.PAGE_SIZE:
+                return
+            last = docs[-1]
+
+    @staticmethod
+    def _load_checkpoint(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable retention checkpoint {path}: {e}")
+            return None
+
+    @staticmethod
+    def _save_checkpoint(path, checkpoint):
+        if not path:
+            return
+        checkpoint['updated'] = datetime.now(timezone.utc).isoformat()
+        # Write then rename so an interrupted save never leaves a truncated checkpoint
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(temp_path, path)
@@ -0,0 +1,361 @@
+# firebase_services/check_in_store.py
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from .overdue_monitor import to_epoch
+
+
+def default_store_path(project_id):
+    """Get the mirror file for a Firebase project under the user's app-data directory
+
+    One file per project, so switching service accounts never mixes check-ins.
+    """
+    base = (os.environ.get('APPDATA') or os.environ.get('XDG_DATA_HOME')
+            or os.path.join(os.path.expanduser('~'), '.local', 'share'))
+    directory = os.path.join(base, 'danoggin_admin')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"check_ins_{project_id or 'default'}.sqlite3")
+
+
+class CheckInStore:
+    """Local SQLite mirror of the check_ins subcollections of every responder
+
+    Each check-in is one row keyed by its document path, with the responder ID,
+    the timestamp as a Unix time for ordering, the result and prompt as columns
+    and the full document as JSON. Indexes on (responder_id, ts) and ts make
+    counts, latest check-ins, per-responder history and cross-responder range
+    queries local lookups instead of subcollection reads.
+
+    The store also remembers the newest check-in timestamp it has seen (the
+    high-water mark), in the form Firestore stores it, so StatusManager can
+    fetch only newer check-ins on the next sync. Both live in the database
+    file, so syncs stay incremental across launches.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS check_ins (
+                    path TEXT PRIMARY KEY,
+                    responder_id TEXT NOT NULL,
+                    check_in_id TEXT NOT NULL,
+                    ts REAL,
+                    timestamp TEXT,
+                    result TEXT,
+                    prompt TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS check_ins_responder_ts ON check_ins (responder_id, ts);
+                CREATE INDEX IF NOT EXISTS check_ins_ts ON check_ins (ts);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    # === Writes ===
+
+    def upsert_check_ins(self, check_ins):
+        """Add or replace check-ins
+
+        Args:
+            check_ins: Iterable of (path, responder_id, check_in_id, data) tuples,
+                where data is the check-in document's dictionary
+
+        Returns:
+            Number of check-ins written
+        """
+        rows = []
+        high_water = self.high_water
+        high_water_epoch = to_epoch(high_water)
+        for path, responder_id, check_in_id, data in check_ins:
+            timestamp = data.get('timestamp')
+            ts = to_epoch(timestamp)
+            rows.append((path, responder_id, check_in_id, ts,
+                         str(timestamp) if timestamp is not None else None,
+                         _text(data.get('result')), _text(data.get('prompt')),
+                         json.dumps(data, default=str)))
+            if ts is not None and (high_water_epoch is None or ts > high_water_epoch):
+                high_water, high_water_epoch = timestamp, ts
+
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO check_ins VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._set_high_water(high_water)
+        return len(rows)
+
+    def remove_responder(self, responder_id):
+        """Remove all of a responder's check-ins"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM check_ins WHERE responder_id = ?", (responder_id,))
+
+    def remove_paths(self, paths):
+        """Remove check-ins by document path"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM check_ins WHERE path = ?", [(path,) for path in paths])
+
+    def remove_archived(self, archive_paths):
+        """Remove the check-ins of deleted monthly archives
+
+        Args:
+            archive_paths: Paths of responder_status/{id}/check_in_archives/{YYYY-MM} documents
+        """
+        rows = []
+        for path in archive_paths:
+            parts = path.split('/')
+            year, month = (int(part) for part in parts[-1].split('-'))
+            start = datetime(year, month, 1, tzinfo=timezone.utc)
+            end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+            rows.append((parts[1], start.timestamp(), end.timestamp()))
+
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM check_ins WHERE responder_id = ? AND ts >= ? AND ts < ?", rows)
+
+    def clear(self):
+        """Remove every check-in and the high-water mark"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM check_ins")
+            self._conn.execute("DELETE FROM meta")
+
+    # === High-water mark ===
+
+    @property
+    def high_water(self):
+        """Newest check-in timestamp in the store, as stored in Firestore (None if empty)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'high_water'").fetchone()
+        if row is None:
+            return None
+
+        kind, value = json.loads(row[0])
+        if kind == 'datetime':
+            return datetime.fromtimestamp(value, tz=timezone.utc)
+        return value
+
+    def _set_high_water(self, timestamp):
+        if timestamp is None:
+            return
+        if isinstance(timestamp, (str, int, float)):
+            value = ['value', timestamp]
+        else:
+            value = ['datetime', to_epoch(timestamp)]
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('high_water', ?)", (json.dumps(value),))
+
+    # === Queries ===
+
+    def count(self, responder_id=None):
+        """Count the check-ins of one responder, or of everyone"""
+        with self._lock:
+            if responder_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM check_ins").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM check_ins WHERE responder_id = ?",
+                                      (responder_id,)).fetchone()[0]
+
+    def summary(self):
+        """Get each responder's check-in count and latest check-in timestamp
+
+        The timestamp is decoded from the stored check-in, so epoch numbers and
+        strings keep their type (datetimes come back as ISO-style strings).
+
+        Returns:
+            Dictionary mapping responder ID to (count, latest_timestamp)
+        """
+        # With MAX(), SQLite takes the bare data column from the row holding the maximum
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT responder_id, COUNT(*), MAX(ts), data
+                FROM check_ins
+                GROUP BY responder_id
+            """).fetchall()
+        return {responder_id: (count, json.loads(data).get('timestamp'))
+                for responder_id, count, _, data in rows}
+
+    def prompt_result_counts(self, since=None, until=None):
+        """Count check-ins per prompt and result, grouped in SQLite
+
+        Args:
+            since / until: Optional Unix time bounds (inclusive / exclusive)
+
+        Returns:
+            Dictionary mapping prompt to {'results': {result: count},
+            'responders': set of responder IDs}
+        """
+        conditions, params = ["prompt IS NOT NULL"], []
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(until)
+        where = " WHERE " + " AND ".join(conditions)
+
+        with self._lock:
+            result_rows = self._conn.execute(
+                "SELECT prompt, result, COUNT(*) FROM check_ins" + where + " GROUP BY prompt, result", params).fetchall()
+            responder_rows = self._conn.execute(
+                "SELECT prompt, responder_id FROM check_ins" + where + " GROUP BY prompt, responder_id", params).fetchall()
+
+        counts = {}
+        for prompt, responder_id in responder_rows:
+            entry = counts.get(prompt)
+            if entry is None:
+                entry = counts[prompt] = {'results': {}, 'responders': set()}
+            entry['responders'].add(responder_id)
+        for prompt, result, count in result_rows:
+            counts[prompt]['results'][result] = count
+        return counts
+
+    def timed_counts(self):
+        """Count each responder's check-ins that have a timestamp
+
+        Returns:
+            Dictionary mapping responder ID to its count
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT responder_id, COUNT(*)
+                FROM check_ins
+                WHERE ts IS NOT NULL
+                GROUP BY responder_id
+            """).fetchall()
+        return dict(rows)
+
+    def result_rows(self, since=None, responder_id=None, after=None):
+        """Get (responder_id, ts, check_in_id, result) for check-ins in timestamp order
+
+        Args:
+            since: Only check-ins at or after this Unix time
+            responder_id: Only this responder's check-ins
+            after: Only check-ins after this (ts, check_in_id) position
+        """
+        sql = "SELECT responder_id, ts, check_in_id, result FROM check_ins WHERE ts IS NOT NULL"
+        params = []
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        if responder_id is not None:
+            sql += " AND responder_id = ?"
+            params.append(responder_id)
+        if after is not None:
+            sql += " AND (ts > ? OR (ts = ? AND check_in_id > ?))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY ts, check_in_id"
+
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def heatmap(self, responder_ids=None, result=None, correct_results=('correct',), utc=False):
+        """Count check-ins and correct answers by weekday and hour of day
+
+        SQLite streams over the matching rows into 7 x 24 groups, so the work
+        is one pass and the result size is constant however many check-ins match.
+
+        Args:
+            responder_ids: Only these responders (None for all)
+            result: Only check-ins with this result
+            correct_results: Result values counted as correct
+            utc: Bucket by UTC instead of local time
+
+        Returns:
+            Tuple (counts, correct), each 7 lists (Monday first) of 24 hourly values
+        """
+        modifier = "" if utc else ", 'localtime'"
+        conditions, params = ["ts IS NOT NULL"], []
+        if responder_ids is not None:
+            conditions.append("responder_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(responder_ids)))
+        if result is not None:
+            conditions.append("result = ?")
+            params.append(_text(result))
+        correct_results = [str(value) for value in correct_results]
+
+        sql = (f"SELECT CAST(strftime('%w', ts, 'unixepoch'{modifier}) AS INTEGER),"
+               f" CAST(strftime('%H', ts, 'unixepoch'{modifier}) AS INTEGER),"
+               f" COUNT(*), SUM(result IN ({', '.join('?' * len(correct_results)) or 'NULL'}))"
+               f" FROM check_ins WHERE {' AND '.join(conditions)} GROUP BY 1, 2")
+
+        with self._lock:
+            rows = self._conn.execute(sql, correct_results + params).fetchall()
+
+        counts = [[0] * 24 for _ in range(7)]
+        correct = [[0] * 24 for _ in range(7)]
+        for weekday, hour, count, correct_count in rows:
+            day = (weekday + 6) % 7  # SQLite weeks start on Sunday
+            counts[day][hour] = count
+            correct[day][hour] = correct_count or 0
+        return counts, correct
+
+    def latest(self, responder_id):
+        """Get a responder's latest check-in, or None"""
+        history = self.history(responder_id, limit=1)
+        return history[0] if history else None
+
+    def history(self, responder_id, limit=20, before=None):
+        """Get a responder's check-ins, newest first
+
+        Args:
+            responder_id: ID of the responder
+            limit: Maximum number of check-ins to return
+            before: Only return check-ins older than this Unix time
+
+        Returns:
+            List of check-in dictionaries, each with its document 'id'
+        """
+        sql = "SELECT check_in_id, data FROM check_ins WHERE responder_id = ?"
+        params = [responder_id]
+        if before is not None:
+            sql += " AND ts < ?"
+            params.append(before)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(json.loads(data), id=check_in_id) for check_in_id, data in rows]
+
+    def query(self, since=None, until=None, result=None, limit=None):
+        """Find check-ins across all responders, newest first
+
+        Args:
+            since / until: Unix time bounds (inclusive / exclusive)
+            result: Only return check-ins with this result
+            limit: Maximum number of check-ins to return
+
+        Returns:
+            List of check-in dictionaries, each with its document 'id' and 'responder_id'
+        """
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(until)
+        if result is not None:
+            conditions.append("result = ?")
+            params.append(_text(result))
+
+        sql = "SELECT responder_id, check_in_id, data FROM check_ins"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(json.loads(data), id=check_in_id, responder_id=responder_id)
+                for responder_id, check_in_id, data in rows]
+
+
+def _text(value):
+    return str(value) if value is not None else None
@@ -0,0 +1,206 @@
+# firebase_services/check_in_trends.py
+
+from collections import deque
+
+from .overdue_monitor import to_epoch
+from .question_analytics import DEFAULT_CORRECT_RESULTS
+
+
+class _ResponderWindows:
+    """Rolling windows over one responder's check-ins
+
+    The last 2 * window correctness flags and lateness values are kept in
+    deques with running sums for the current and previous window, so adding a
+    check-in updates both windows in constant time.
+    """
+
+    def __init__(self, window, max_points):
+        self.window = window
+        self.correct = deque()  # 1/0 per check-in, newest last, at most 2 * window
+        self.lateness = deque()  # Minutes late per check-in, at most 2 * window
+        self.correct_sums = [0, 0]  # Previous window, current window
+        self.lateness_sums = [0.0, 0.0]
+        self.last_key = None  # (ts, check_in_id) of the newest check-in added
+        self.last_ts = None
+        self.accuracy_series = deque(maxlen=max_points)  # (ts, rolling accuracy %)
+        self.lateness_series = deque(maxlen=max_points)  # (ts, rolling mean minutes late)
+        self.check_ins = 0
+
+    @staticmethod
+    def _push(values, sums, value, window):
+        values.append(value)
+        sums[1] += value
+        if len(values) > window:
+            # The oldest value of the current window moves into the previous window
+            sums[1] -= values[-window - 1]
+            sums[0] += values[-window - 1]
+        if len(values) > 2 * window:
+            sums[0] -= values.popleft()
+
+    def add(self, ts, check_in_id, correct, expected_interval):
+        key = (ts, check_in_id)
+        if self.last_key is not None and key <= self.last_key:
+            return False  # Already counted (syncs re-read the newest timestamp)
+
+        window = self.window
+        self._push(self.correct, self.correct_sums, 1 if correct else 0, window)
+        current = min(len(self.correct), window)
+        self.accuracy_series.append((ts, self.correct_sums[1] / current * 100))
+
+        if self.last_ts is not None and expected_interval:
+            late = max(0.0, (ts - self.last_ts - expected_interval) / 60)
+            self._push(self.lateness, self.lateness_sums, late, window)
+            current = min(len(self.lateness), window)
+            self.lateness_series.append((ts, self.lateness_sums[1] / current))
+
+        self.last_key = key
+        self.last_ts = ts
+        self.check_ins += 1
+        return True
+
+    def window_means(self, values, sums):
+        """Get (previous, current) window means, None where a window isn't full yet"""
+        window = self.window
+        current = sums[1] / window if len(values) >= window else None
+        previous = sums[0] / window if len(values) >= 2 * window else None
+        return previous, current
+
+
+class CheckInTrends:
+    """Rolling accuracy and lateness per responder, updated incrementally
+
+    Check-ins are fed in timestamp order (see CheckInStore.result_rows); each
+    one updates only its responder's windows, so new check-ins from a sync are
+    applied without rescanning the history. update_from_store tracks each
+    responder's position separately, and replays a responder whose mirrored
+    history changed behind that position (a late check-in or a deletion).
+    Lateness is how many minutes a
+    check-in came after the expected interval since the previous one, with the
+    interval taken from the responder's checkInSettings (nextCheckInTime -
+    lastCheckInTime).
+
+    A responder is flagged as declining when its current window's accuracy is
+    at least accuracy_drop points below the previous window's, or its mean
+    lateness is at least lateness_rise minutes above it.
+    """
+
+    def __init__(self, window=20, correct_results=DEFAULT_CORRECT_RESULTS, accuracy_drop=15.0,
+                 lateness_rise=30.0, max_points=200):
+        self.window = window
+        self.correct_results = {str(result) for result in correct_results}
+        self.accuracy_drop = accuracy_drop
+        self.lateness_rise = lateness_rise
+        self.max_points = max_points
+        self._responders = {}  # responder_id -> _ResponderWindows
+        self._intervals = {}  # responder_id -> expected seconds between check-ins
+
+    def set_schedules(self, users):
+        """Take each responder's expected check-in interval from its checkInSettings
+
+        Args:
+            users: Users in the format of get_users_with_engagement_metrics
+        """
+        for user in users:
+            if user.get('role') != 'responder':
+                continue
+            next_time = to_epoch(user.get('nextCheckInTime'))
+            last_time = to_epoch(user.get('lastCheckInTime'))
+            if next_time is not None and last_time is not None and next_time > last_time:
+                self._intervals[user['id']] = next_time - last_time
+
+    def add_check_ins(self, rows):
+        """Add check-ins in timestamp order
+
+        Args:
+            rows: Iterable of (responder_id, ts, check_in_id, result) tuples
+
+        Returns:
+            Number of check-ins added (check-ins seen before are skipped)
+        """
+        added = 0
+        responders = self._responders
+        for responder_id, ts, check_in_id, result in rows:
+            if ts is None:
+                continue
+            windows = responders.get(responder_id)
+            if windows is None:
+                windows = responders[responder_id] = _ResponderWindows(self.window, self.max_points)
+            if windows.add(ts, check_in_id, str(result) in self.correct_results,
+                           self._intervals.get(responder_id)):
+                added += 1
+        return added
+
+    def update_from_store(self, store):
+        """Add the check-ins a CheckInStore holds beyond each responder's last one counted
+
+        A responder whose mirrored check-in count doesn't match what was counted
+        plus what's newer gained or lost check-ins older than its newest one,
+        so its windows are rebuilt from its full history.
+
+        Args:
+            store: CheckInStore mirroring the check-ins
+
+        Returns:
+            Number of check-ins added
+        """
+        counts = store.timed_counts()
+        for responder_id in [responder_id for responder_id in self._responders if responder_id not in counts]:
+            del self._responders[responder_id]
+
+        added = 0
+        for responder_id, count in counts.items():
+            windows = self._responders.get(responder_id)
+            if windows is not None and windows.check_ins == count:
+                continue
+            rows = store.result_rows(responder_id=responder_id,
+                                     after=windows.last_key if windows is not None else None)
+            if windows is not None and windows.check_ins + len(rows) != count:
+                del self._responders[responder_id]
+                rows = store.result_rows(responder_id=responder_id)
+            added += self.add_check_ins(rows)
+        return added
+
+    def responder_ids(self):
+        """Get the IDs of responders with at least one check-in"""
+        return list(self._responders)
+
+    def trend(self, responder_id):
+        """Get a responder's rolling series and window comparison
+
+        Returns:
+            Dictionary with 'check_ins', 'accuracy_series' and 'lateness_series'
+            (lists of (ts, value)), 'accuracy' and 'lateness' (previous, current)
+            window means, and 'declining', or None if the responder has no check-ins
+        """
+        windows = self._responders.get(responder_id)
+        if windows is None:
+            return None
+
+        accuracy, lateness = self._window_means(windows)
+        return {
+            'check_ins': windows.check_ins,
+            'accuracy_series': list(windows.accuracy_series),
+            'lateness_series': list(windows.lateness_series),
+            'accuracy': accuracy,
+            'lateness': lateness,
+            'declining': self._is_declining(accuracy, lateness)
+        }
+
+    @staticmethod
+    def _window_means(windows):
+        previous_correct, current_correct = windows.window_means(windows.correct, windows.correct_sums)
+        accuracy = (previous_correct * 100 if previous_correct is not None else None,
+                    current_correct * 100 if current_correct is not None else None)
+        return accuracy, windows.window_means(windows.lateness, windows.lateness_sums)
+
+    def _is_declining(self, accuracy, lateness):
+        previous, current = accuracy
+        if previous is not None and current is not None and previous - current >= self.accuracy_drop:
+            return True
+        previous, current = lateness
+        return previous is not None and current is not None and current - previous >= self.lateness_rise
+
+    def declining(self):
+        """Get the IDs of responders whose performance is declining"""
+        return [responder_id for responder_id, windows in self._responders.items()
+                if self._is_declining(*self._window_means(windows))]
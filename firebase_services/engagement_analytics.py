@@ -0,0 +1,195 @@
+# firebase_services/engagement_analytics.py
+
+from datetime import datetime, timedelta, timezone
+
+
+class EngagementColumns:
+    """Column-oriented copy of the engagement fields of a user set
+
+    Each field is stored as one flat list so distributions and group-bys run
+    as tight loops over a single column instead of dictionary lookups per user.
+    Slices are lists of row indices, so re-slicing never copies the data.
+    """
+
+    def __init__(self, users):
+        self.ids = [user['id'] for user in users]
+        self.roles = [user.get('role', 'unknown') for user in users]
+        self.scores = [user.get('engagement_score', 0) or 0 for user in users]
+        self.successes = [user.get('successful_notification_count', 0) or 0 for user in users]
+        self.failures = [user.get('token_failure_count', 0) or 0 for user in users]
+        self.created = [user.get('created_timestamp') for user in users]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def select(self, role=None, min_score=None, max_score=None, created_after=None, created_before=None):
+        """Get the row indices matching all of the given conditions
+
+        Args:
+            role: Only rows with this role
+            min_score / max_score: Inclusive engagement score bounds
+            created_after / created_before: Unix timestamp bounds on account creation
+
+        Returns:
+            List of row indices
+        """
+        indices = range(len(self.ids))
+        if role is not None:
+            roles = self.roles
+            indices = [i for i in indices if roles[i] == role]
+        if min_score is not None:
+            scores = self.scores
+            indices = [i for i in indices if scores[i] >= min_score]
+        if max_score is not None:
+            scores = self.scores
+            indices = [i for i in indices if scores[i] <= max_score]
+        if created_after is not None or created_before is not None:
+            created = self.created
+            low = created_after if created_after is not None else float('-inf')
+            high = created_before if created_before is not None else float('inf')
+            indices = [i for i in indices if created[i] is not None and low <= created[i] <= high]
+        return list(indices)
+
+
+def histogram(values, bins=10, value_range=(0, 100)):
+    """Count values into equal-width bins
+
+    Values outside value_range are clamped into the first or last bin.
+
+    Returns:
+        Dictionary with 'edges' (bins + 1 bin edges) and 'counts'
+    """
+    low, high = value_range
+    width = (high - low) / bins
+    edges = [low + width * i for i in range(bins + 1)]
+    counts = [0] * bins
+    last = bins - 1
+
+    for value in values:
+        index = int((value - low) / width)
+        counts[min(max(index, 0), last)] += 1
+
+    return {'edges': edges, 'counts': counts}
+
+
+def percentiles(values, qs=(10, 25, 50, 75, 90)):
+    """Compute percentiles with linear interpolation between closest ranks
+
+    Returns:
+        Dictionary mapping each percentile to its value (empty if no values)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+
+    result = {}
+    last = len(ordered) - 1
+    for q in qs:
+        position = last * q / 100
+        lower = int(position)
+        upper = min(lower + 1, last)
+        fraction = position - lower
+        result[q] = ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+    return result
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc).date()
+
+
+def _week_number(timestamp):
+    """Get the number of the UTC Monday-based week containing a Unix timestamp
+
+    1970-01-01 was a Thursday, so shifting by 3 days aligns weeks to Mondays.
+    """
+    return (int(timestamp // 86400) + 3) // 7
+
+
+def _week_start(week_number):
+    """Get the Monday date that starts a week from _week_number"""
+    return _EPOCH + timedelta(days=week_number * 7 - 3)
+
+
+def signup_cohorts(columns, indices, now):
+    """Group users by signup week and summarize each cohort's engagement
+
+    Users without a creation time are skipped. Score statistics only include
+    users with a non-zero score, since 0 means no engagement data yet.
+
+    Returns:
+        Tuple (cohorts, score_decay_per_week). Cohorts are ordered oldest first.
+        score_decay_per_week is the least-squares drop in mean score per week
+        of cohort age (None with fewer than two scored cohorts).
+    """
+    created = columns.created
+    scores = columns.scores
+
+    groups = {}
+    for i in indices:
+        if created[i] is not None:
+            week = _week_number(created[i])
+            group = groups.get(week)
+            if group is None:
+                group = groups[week] = []
+            group.append(i)
+
+    current_week = _week_number(now)
+    cohorts = []
+    for week in sorted(groups):
+        members = groups[week]
+        scored = sorted(scores[i] for i in members if scores[i] > 0)
+        cohort = {
+            'week': _week_start(week).isoformat(),
+            'weeks_since_signup': current_week - week,
+            'users': len(members),
+            'scored_users': len(scored),
+            'mean_score': sum(scored) / len(scored) if scored else None,
+            'median_score': percentiles(scored, (50,)).get(50),
+            'healthy_pct': (sum(1 for score in scored if score > 90) / len(members)) * 100
+        }
+        cohorts.append(cohort)
+
+    points = [(c['weeks_since_signup'], c['mean_score']) for c in cohorts if c['mean_score'] is not None]
+    decay = None
+    if len(points) >= 2:
+        mean_age = sum(age for age, _ in points) / len(points)
+        mean_score = sum(score for _, score in points) / len(points)
+        variance = sum((age - mean_age) ** 2 for age, _ in points)
+        if variance > 0:
+            slope = sum((age - mean_age) * (score - mean_score) for age, score in points) / variance
+            decay = -slope
+
+    return cohorts, decay
+
+
+def role_success_rates(columns, indices):
+    """Aggregate notification success and engagement per role
+
+    Returns:
+        Dictionary mapping role to its totals and success rate
+    """
+    roles = columns.roles
+    successes = columns.successes
+    failures = columns.failures
+    scores = columns.scores
+
+    totals = {}
+    for i in indices:
+        entry = totals.get(roles[i])
+        if entry is None:
+            entry = totals[roles[i]] = [0, 0, 0, 0]
+        entry[0] += 1
+        entry[1] += successes[i]
+        entry[2] += failures[i]
+        entry[3] += scores[i]
+
+    result = {}
+    for role, (users, role_successes, role_failures, score_total) in totals.items():
+        attempts = role_successes + role_failures
+        result[role] = {
+            'users': users,
+            'successful_notifications': role_successes,
+            'failed_notifications': role_failures,
+            'success_rate': (role_successes / attempts) * 100 if attempts else None,
+            'mean_score': score_total / users
+        }
+    return result
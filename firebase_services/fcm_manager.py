@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud.firestore_v1 import FieldFilter
 from datetime import datetime, timedelta
 
@@ -5,6 +6,8 @@ from datetime import datetime, timedelta
 class FCMManager:
     """Manager for FCM token analytics and management operations"""
 
+    IN_FILTER_LIMIT = 30  # Most values a Firestore 'in' filter accepts
+
     def __init__(self, base_manager):
         self.base_manager = base_manager
 
@@ -82,6 +85,47 @@ class FCMManager:
             print(f"Error getting token events for user {user_id}: {e}")
             return []
 
+    def get_token_events_for_users(self, user_ids, days=30, max_workers=4):
+        """Get the token events of several users with batched 'in' queries
+
+        One query is made per 30 user IDs instead of one per user, and the
+        batches run concurrently.
+
+        Args:
+            user_ids: IDs of the users to get events for
+            days: Number of days to look back
+            max_workers: Number of batches to query concurrently
+
+        Returns:
+            Dictionary mapping every requested user ID to its events, newest first
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        events_by_user = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return events_by_user
+
+        cutoff_str = (datetime.now() - timedelta(days=days)).isoformat()
+        chunks = [user_ids[i:i + self.IN_FILTER_LIMIT] for i in range(0, len(user_ids), self.IN_FILTER_LIMIT)]
+
+        def query_chunk(chunk):
+            query = self.db.collection('token_events')\
+                .where(filter=FieldFilter('userId', 'in', chunk))\
+                .where(filter=FieldFilter('timestamp', '>=', cutoff_str))\
+                .order_by('timestamp', direction='DESCENDING')
+            return list(query.stream())
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                for docs in executor.map(query_chunk, chunks):
+                    for doc in docs:
+                        event_data = doc.to_dict()
+                        event_data['id'] = doc.id
+                        events_by_user.setdefault(event_data.get('userId'), []).append(event_data)
+        except Exception as e:
+            print(f"Error getting token events for {len(user_ids)} users: {e}")
+
+        return events_by_user
+
     def get_error_patterns(self, days=7):
         """Analyze error patterns from recent token events
         
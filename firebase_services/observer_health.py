@@ -0,0 +1,97 @@
+# firebase_services/observer_health.py
+
+import time
+
+from .overdue_monitor import to_epoch
+
+
+def _token_status(issue):
+    """Classify a user's token issues like the users grid's Token Status column"""
+    if not issue:
+        return 'Healthy'
+    removals = issue.get('total_removals', 0)
+    strikes = issue.get('total_strikes', 0)
+    if removals > 0 or strikes >= 2:
+        return 'Critical'
+    if strikes > 0:
+        return 'Warning'
+    return 'Healthy'
+
+
+def observer_rollup(users, check_in_summary, token_issues=None, now=None):
+    """Summarize how the responders each observer watches are doing
+
+    Users, check-in summaries and token issues are each indexed by user ID
+    once; every observer's observing map is then joined against those
+    dictionaries, so the rollup is a single pass with no per-responder queries.
+
+    Args:
+        users: Users in the format of get_users_with_engagement_metrics
+        check_in_summary: Dictionary mapping responder ID to (count, latest_timestamp)
+            (see CheckInStore.summary)
+        token_issues: Dictionary mapping user ID to its get_users_with_token_issues entry
+        now: Reference Unix time for overdue check-ins (defaults to the current time)
+
+    Returns:
+        List of observer dictionaries, worst health first, each with counts,
+        a 'health' of 'Critical', 'Attention' or 'Healthy', and a
+        'responders_detail' list of per-responder details
+    """
+    now = now if now is not None else time.time()
+    token_issues = token_issues or {}
+    users_by_id = {user['id']: user for user in users}
+
+    rows = []
+    for observer in users:
+        if observer.get('role') != 'observer':
+            continue
+
+        details = []
+        for responder_id, linked_name in observer.get('observing', {}).items():
+            responder = users_by_id.get(responder_id)
+            check_ins, latest = check_in_summary.get(responder_id, (0, None))
+            due = to_epoch(responder.get('nextCheckInTime')) if responder else None
+            details.append({
+                'id': responder_id,
+                'name': responder.get('name', linked_name) if responder else linked_name,
+                'exists': responder is not None,
+                'check_ins': check_ins,
+                'latest_check_in': latest,
+                'overdue': due is not None and due < now,
+                'engagement_score': responder.get('engagement_score', 0) if responder else 0,
+                'token_status': _token_status(token_issues.get(responder_id))
+            })
+
+        existing = [detail for detail in details if detail['exists']]
+        latest_epochs = [(to_epoch(detail['latest_check_in']), detail['latest_check_in'])
+                         for detail in details if detail['latest_check_in'] is not None]
+        latest_epochs = [entry for entry in latest_epochs if entry[0] is not None]
+
+        row = {
+            'observer_id': observer['id'],
+            'observer_name': observer.get('name', 'Unnamed'),
+            'responders': len(details),
+            'missing_responders': len(details) - len(existing),
+            'silent_responders': sum(1 for detail in details if detail['check_ins'] == 0),
+            'overdue_responders': sum(1 for detail in details if detail['overdue']),
+            'check_ins': sum(detail['check_ins'] for detail in details),
+            'latest_check_in': max(latest_epochs)[1] if latest_epochs else None,
+            'mean_engagement': (sum(detail['engagement_score'] for detail in existing) / len(existing)
+                                if existing else None),
+            'token_issue_responders': sum(1 for detail in details if detail['token_status'] != 'Healthy'),
+            'responders_detail': details
+        }
+
+        critical_tokens = any(detail['token_status'] == 'Critical' for detail in details)
+        if row['overdue_responders'] or row['missing_responders'] or critical_tokens:
+            row['health'] = 'Critical'
+        elif (row['silent_responders'] or row['token_issue_responders']
+              or (row['mean_engagement'] is not None and row['mean_engagement'] < 50)):
+            row['health'] = 'Attention'
+        else:
+            row['health'] = 'Healthy'
+        rows.append(row)
+
+    severity = {'Critical': 0, 'Attention': 1, 'Healthy': 2}
+    rows.sort(key=lambda row: (severity[row['health']], row['observer_name'].lower()))
+    return rows
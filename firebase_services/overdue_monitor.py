@@ -0,0 +1,158 @@
+# firebase_services/overdue_monitor.py
+
+import heapq
+import time
+from datetime import datetime
+
+
+def to_epoch(value):
+    """Convert a check-in time to a Unix timestamp
+
+    Accepts Firestore timestamps/datetimes, ISO 8601 strings and epoch numbers
+    (seconds or milliseconds). Returns None if the value can't be interpreted.
+    """
+    if value is None:
+        return None
+    if hasattr(value, 'timestamp'):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class OverdueMonitor:
+    """Tracks which responders are past their next check-in time
+
+    Responders are kept in a min-heap keyed on checkInSettings.nextCheckInTime,
+    so each poll only looks at the responders that became due since the last
+    one instead of scanning every user. Updated times are pushed as new heap
+    entries and stale entries are skipped when they surface.
+    """
+
+    def __init__(self):
+        self._heap = []  # (next_check_in_epoch, user_id)
+        self._next_check_in = {}  # user_id -> current next check-in epoch
+        self._names = {}  # user_id -> name
+        self._overdue = {}  # user_id -> next check-in epoch that was missed
+
+    def load(self, users):
+        """Reset the monitor from loaded user records (non-responders are ignored)"""
+        self._heap = []
+        self._next_check_in = {}
+        self._names = {}
+        self._overdue = {}
+
+        for user in users:
+            if user.get('role') != 'responder':
+                continue
+            due = to_epoch(user.get('nextCheckInTime'))
+            if due is None:
+                continue
+            self._next_check_in[user['id']] = due
+            self._names[user['id']] = user.get('name', 'Unnamed')
+            self._heap.append((due, user['id']))
+
+        heapq.heapify(self._heap)
+
+    def update(self, user_id, name, next_check_in):
+        """Record a responder's new next check-in time"""
+        due = to_epoch(next_check_in)
+        self._overdue.pop(user_id, None)
+
+        if due is None:
+            self.remove(user_id)
+            return
+
+        self._next_check_in[user_id] = due
+        self._names[user_id] = name
+        heapq.heappush(self._heap, (due, user_id))
+
+        # Rebuild once stale entries outnumber live ones
+        if len(self._heap) > 2 * len(self._next_check_in) + 64:
+            self._heap = [(due, user_id) for user_id, due in self._next_check_in.items()
+                          if user_id not in self._overdue]
+            heapq.heapify(self._heap)
+
+    def remove(self, user_id):
+        """Stop tracking a responder (its heap entries become stale)"""
+        self._next_check_in.pop(user_id, None)
+        self._names.pop(user_id, None)
+        self._overdue.pop(user_id, None)
+
+    def poll(self, now=None):
+        """Move responders whose next check-in has passed into the overdue set
+
+        Returns:
+            List of user IDs that became overdue during this poll
+        """
+        now = now if now is not None else time.time()
+        newly_overdue = []
+
+        while self._heap and self._heap[0][0] <= now:
+            due, user_id = heapq.heappop(self._heap)
+            if self._next_check_in.get(user_id) != due:
+                continue  # Stale entry from an earlier update or removal
+            if user_id not in self._overdue:
+                self._overdue[user_id] = due
+                newly_overdue.append(user_id)
+
+        return newly_overdue
+
+    def reconcile(self, overdue_responders, complete=True, now=None):
+        """Bring the overdue set in line with a server-side overdue query
+
+        Responders the query returns are tracked with their stored next
+        check-in time, including ones that weren't loaded. When the query
+        result is complete, overdue responders missing from it have probably
+        checked in since they were loaded. They stay overdue until their new
+        time is passed to update(), so a failed lookup never hides them.
+
+        Args:
+            overdue_responders: Dictionaries with 'id', 'name' and 'nextCheckInTime'
+            complete: False if the query hit its limit or couldn't match every
+                stored time, so absence means nothing
+            now: Reference Unix time (defaults to the current time)
+
+        Returns:
+            IDs of overdue responders whose next check-in time should be re-read
+        """
+        returned = set()
+        for responder in overdue_responders:
+            due = to_epoch(responder.get('nextCheckInTime'))
+            if due is None:
+                continue
+            returned.add(responder['id'])
+            if self._next_check_in.get(responder['id']) != due:
+                self.update(responder['id'], responder.get('name', 'Unnamed'), due)
+
+        self.poll(now)
+        if not complete:
+            return []
+        return [user_id for user_id in self._overdue if user_id not in returned]
+
+    def get_overdue(self, now=None):
+        """Get the currently overdue responders, most overdue first
+
+        Returns:
+            List of dictionaries with 'id', 'name', 'next_check_in' and 'overdue_seconds'
+        """
+        now = now if now is not None else time.time()
+        self.poll(now)
+
+        return [
+            {
+                'id': user_id,
+                'name': self._names.get(user_id, 'Unnamed'),
+                'next_check_in': due,
+                'overdue_seconds': now - due
+            }
+            for user_id, due in sorted(self._overdue.items(), key=lambda item: item[1])
+        ]
+
+    def __len__(self):
+        return len(self._next_check_in)
@@ -0,0 +1,132 @@
+# firebase_services/question_analytics.py
+
+# Check-in results counted as a correct answer unless the caller says otherwise
+DEFAULT_CORRECT_RESULTS = ('correct',)
+
+
+def normalize_prompt(prompt):
+    """Get the join key of a prompt: whitespace collapsed and case folded"""
+    return ' '.join(str(prompt).split()).casefold()
+
+
+def build_question_index(packs):
+    """Map each question prompt to the pack question it comes from
+
+    A prompt used in several packs is attributed to the first pack by ID.
+
+    Args:
+        packs: Dictionary mapping pack ID to (pack_name, questions)
+
+    Returns:
+        Dictionary mapping normalized prompt to (pack_id, pack_name, question_number, prompt)
+    """
+    index = {}
+    for pack_id in sorted(packs):
+        pack_name, questions = packs[pack_id]
+        for number, question in enumerate(questions, 1):
+            prompt = question.get('prompt') if isinstance(question, dict) else None
+            if prompt:
+                index.setdefault(normalize_prompt(prompt), (pack_id, pack_name, number, prompt))
+    return index
+
+
+def question_performance(prompt_counts, question_index, packs, correct_results=DEFAULT_CORRECT_RESULTS,
+                         min_check_ins=10, confusing_below=40.0, trivial_above=95.0):
+    """Join per-prompt result counts to pack questions and compute accuracy
+
+    Args:
+        prompt_counts: Dictionary mapping each check-in prompt to
+            {'results': {result: count}, 'responders': set of responder IDs}
+            (see CheckInStore.prompt_result_counts)
+        question_index: Output of build_question_index
+        packs: Dictionary mapping pack ID to (pack_name, questions)
+        correct_results: Result values counted as correct
+        min_check_ins: Questions with fewer check-ins are never flagged
+        confusing_below / trivial_above: Accuracy percentages below / above
+            which a question is flagged 'confusing' / 'trivial'
+
+    Returns:
+        Dictionary with 'questions' (least accurate first), 'packs',
+        'unmatched' (prompts with no pack question, most answered first)
+        and 'check_ins'
+    """
+    correct_results = {str(result) for result in correct_results}
+
+    # Several raw prompts can share a normalized key, so group on the key first
+    by_key = {}
+    for prompt, counts in prompt_counts.items():
+        if prompt is None:
+            continue
+        key = normalize_prompt(prompt)
+        entry = by_key.get(key)
+        if entry is None:
+            entry = by_key[key] = {'prompt': prompt, 'results': {}, 'responders': set()}
+        for result, count in counts['results'].items():
+            entry['results'][result] = entry['results'].get(result, 0) + count
+        entry['responders'] |= counts['responders']
+
+    questions = []
+    unmatched = []
+    pack_totals = {pack_id: [0, 0, 0] for pack_id in packs}  # check_ins, correct, questions answered
+    total = 0
+
+    for key, entry in by_key.items():
+        check_ins = sum(entry['results'].values())
+        correct = sum(count for result, count in entry['results'].items() if result in correct_results)
+        total += check_ins
+
+        question = question_index.get(key)
+        if question is None:
+            unmatched.append({'prompt': entry['prompt'], 'check_ins': check_ins})
+            continue
+
+        pack_id, pack_name, number, prompt = question
+        accuracy = (correct / check_ins) * 100 if check_ins else None
+        flag = None
+        if accuracy is not None and check_ins >= min_check_ins:
+            if accuracy < confusing_below:
+                flag = 'confusing'
+            elif accuracy > trivial_above:
+                flag = 'trivial'
+
+        questions.append({
+            'pack_id': pack_id,
+            'pack_name': pack_name,
+            'question_number': number,
+            'prompt': prompt,
+            'check_ins': check_ins,
+            'correct': correct,
+            'accuracy': accuracy,
+            'responders': len(entry['responders']),
+            'results': entry['results'],
+            'flag': flag
+        })
+
+        totals = pack_totals[pack_id]
+        totals[0] += check_ins
+        totals[1] += correct
+        totals[2] += 1
+
+    questions.sort(key=lambda q: (q['accuracy'] is None, q['accuracy'] or 0, -q['check_ins']))
+    unmatched.sort(key=lambda u: -u['check_ins'])
+
+    pack_rows = []
+    for pack_id, (check_ins, correct, answered) in pack_totals.items():
+        pack_name, pack_questions = packs[pack_id]
+        pack_rows.append({
+            'pack_id': pack_id,
+            'pack_name': pack_name,
+            'questions': len(pack_questions),
+            'questions_answered': answered,
+            'check_ins': check_ins,
+            'correct': correct,
+            'accuracy': (correct / check_ins) * 100 if check_ins else None
+        })
+    pack_rows.sort(key=lambda p: -p['check_ins'])
+
+    return {
+        'questions': questions,
+        'packs': pack_rows,
+        'unmatched': unmatched,
+        'check_ins': total
+    }
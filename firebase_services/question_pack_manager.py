@@ -1,9 +1,15 @@
 # firebase_services/question_pack_manager.py
 
+import json
+
+from google.cloud.firestore_v1 import ArrayUnion, FieldFilter, FieldPath, Increment, transactional
+
 
 class QuestionPackManager:
     """Manager for question pack operations"""
 
+    CONTAINS_ANY_LIMIT = 30  # Most values an array_contains_any filter accepts
+
     def __init__(self, base_manager):
         self.base_manager = base_manager
 
@@ -22,7 +28,8 @@ class QuestionPackManager:
             pack_data = {
                 'name': display_name,
                 'imageFolder': f'question_packs/{pack_name}/images',
-                'questions': []
+                'questions': [],
+                'questionCount': 0
             }
 
             # Add the pack to Firestore
@@ -33,9 +40,15 @@ class QuestionPackManager:
             return False, f"Error creating question pack: {str(e)}"
 
     def get_question_packs(self):
-        """Get all question packs from Firestore"""
+        """Get all question packs from Firestore
+
+        Only the pack names are read, not the questions.
+
+        Returns:
+            List of tuples (pack_id, pack_name)
+        """
         try:
-            pack_refs = self.db.collection('question_packs').stream()
+            pack_refs = self.db.collection('question_packs').select(['name']).stream()
             packs = []
             for pack_ref in pack_refs:
                 pack_data = pack_ref.to_dict()
@@ -48,49 +61,178 @@ class QuestionPackManager:
     def get_question_packs_with_counts(self):
         """Get all question packs from Firestore with question counts
 
+        Counts come from each pack's maintained questionCount field, so the
+        questions themselves are not read. Packs created before questionCount
+        existed are counted once and backfilled (see backfill_question_counts).
+
         Returns:
             List of tuples (pack_id, pack_name, question_count)
         """
         try:
-            pack_refs = self.db.collection('question_packs').stream()
+            pack_refs = self.db.collection('question_packs').select(['name', 'questionCount']).stream()
             packs = []
+            missing = []
             for pack_ref in pack_refs:
-                pack_data = pack_ref.to_dict()
+                pack_data = pack_ref.to_dict() or {}
                 pack_id = pack_ref.id
                 pack_name = pack_data.get('name', 'Unnamed')
-                question_count = len(pack_data.get('questions', []))
+                question_count = pack_data.get('questionCount')
+                if question_count is None:
+                    missing.append(pack_id)
                 packs.append((pack_id, pack_name, question_count))
+
+            if missing:
+                counts = self.backfill_question_counts(missing)
+                packs = [(pack_id, pack_name, counts.get(pack_id, 0) if question_count is None else question_count)
+                         for pack_id, pack_name, question_count in packs]
             return packs
         except Exception as e:
             print(f"Error fetching question packs: {str(e)}")
             return []
 
+    def get_pack_questions(self):
+        """Get every question pack with its questions
+
+        Returns:
+            Dictionary mapping pack_id to (pack_name, questions)
+        """
+        try:
+            pack_refs = self.db.collection('question_packs').stream()
+            packs = {}
+            for pack_ref in pack_refs:
+                pack_data = pack_ref.to_dict() or {}
+                packs[pack_ref.id] = (pack_data.get('name', 'Unnamed'), pack_data.get('questions', []))
+            return packs
+        except Exception as e:
+            print(f"Error getting question pack questions: {str(e)}")
+            return {}
+
+    def backfill_question_counts(self, pack_ids=None):
+        """Set questionCount on packs from the length of their questions array
+
+        Args:
+            pack_ids: IDs of the packs to backfill (None for every pack without a questionCount)
+
+        Returns:
+            Dictionary mapping pack_id to its question count
+        """
+        try:
+            packs_ref = self.db.collection('question_packs')
+            if pack_ids is None:
+                pack_ids = [pack_ref.id for pack_ref in packs_ref.select(['questionCount']).stream()
+                            if (pack_ref.to_dict() or {}).get('questionCount') is None]
+            if not pack_ids:
+                return {}
+
+            refs = [packs_ref.document(pack_id) for pack_id in pack_ids]
+            counts = {}
+            batch = self.db.batch()
+            batch_size = 0
+            for pack_doc in self.db.get_all(refs, field_paths=['questions']):
+                if not pack_doc.exists:
+                    continue
+                counts[pack_doc.id] = len((pack_doc.to_dict() or {}).get('questions', []))
+                batch.update(pack_doc.reference, {'questionCount': counts[pack_doc.id]})
+                batch_size += 1
+                if batch_size >= 400:
+                    batch.commit()
+                    batch = self.db.batch()
+                    batch_size = 0
+            if batch_size > 0:
+                batch.commit()
+
+            print(f"Backfilled questionCount on {len(counts)} question packs")
+            return counts
+        except Exception as e:
+            print(f"Error backfilling question counts: {str(e)}")
+            return {}
+
     def upload_questions(self, pack_name, questions_data):
-        """Upload questions to a question pack"""
+        """Append questions to a question pack
+
+        The append is a server-side ArrayUnion inside a transaction, so only
+        the new questions are sent and concurrent uploads can't overwrite each
+        other. ArrayUnion skips questions the pack already holds, so those are
+        found first with array_contains_any queries on the pack, which keeps
+        questionCount exact without downloading the questions.
+
+        Args:
+            pack_name: ID of the question pack
+            questions_data: List of question dictionaries
+
+        Returns:
+            Tuple (success, message)
+        """
         try:
-            # Get reference to the question pack
+            # Duplicates within the upload would also be collapsed by ArrayUnion
+            unique = {}
+            for question in questions_data:
+                unique.setdefault(json.dumps(question, sort_keys=True), question)
+            questions = list(unique.values())
+
             pack_ref = self.db.collection('question_packs').document(pack_name)
-            doc = pack_ref.get()
 
-            if not doc.exists:
-                return False, f"Question pack '{pack_name}' does not exist!"
+            @transactional
+            def append_questions(transaction):
+                doc = pack_ref.get(field_paths=['questionCount'], transaction=transaction)
+                if not doc.exists:
+                    return None
+
+                existing = self._existing_questions(pack_ref, questions, transaction)
+                new_questions = [question for question in questions
+                                 if json.dumps(question, sort_keys=True) not in existing]
 
-            # Get current pack data
-            current_data = doc.to_dict()
+                updates = {}
+                if (doc.to_dict() or {}).get('questionCount') is None:
+                    # Packs from before questionCount are counted once
+                    legacy = pack_ref.get(field_paths=['questions'], transaction=transaction)
+                    updates['questionCount'] = len((legacy.to_dict() or {}).get('questions', [])) + len(new_questions)
+                elif new_questions:
+                    updates['questionCount'] = Increment(len(new_questions))
+                if new_questions:
+                    updates['questions'] = ArrayUnion(new_questions)
 
-            # Combine questions
-            current_questions = current_data.get('questions', [])
-            combined_questions = current_questions + questions_data
+                if updates:
+                    transaction.update(pack_ref, updates)
+                return len(new_questions)
 
-            # Update the question pack
-            pack_ref.update({
-                'questions': combined_questions
-            })
+            added = append_questions(self.db.transaction())
+            if added is None:
+                return False, f"Question pack '{pack_name}' does not exist!"
 
-            return True, f"Added {len(questions_data)} questions to '{pack_name}'"
+            message = f"Added {added} questions to '{pack_name}'"
+            skipped = len(questions_data) - added
+            if skipped:
+                message += f" ({skipped} duplicates skipped)"
+            return True, message
         except Exception as e:
             return False, f"Error uploading questions: {str(e)}"
 
+    def _existing_questions(self, pack_ref, questions, transaction):
+        """Find which questions a pack already holds, as JSON keys
+
+        Questions are checked array_contains_any chunks at a time; only a
+        chunk with a match is narrowed down one question at a time.
+        """
+        packs_ref = self.db.collection('question_packs')
+        pack_query = packs_ref.where(filter=FieldFilter(FieldPath.document_id(), '==', pack_ref))
+
+        def contains(operator, value):
+            query = pack_query.where(filter=FieldFilter('questions', operator, value)) \
+                .select(['questionCount']) \
+                .limit(1)
+            return any(True for _ in transaction.get(query))
+
+        existing = set()
+        for i in range(0, len(questions), self.CONTAINS_ANY_LIMIT):
+            chunk = questions[i:i + self.CONTAINS_ANY_LIMIT]
+            if not contains('array_contains_any', chunk):
+                continue
+            for question in chunk:
+                if contains('array_contains', question):
+                    existing.add(json.dumps(question, sort_keys=True))
+        return existing
+
     def delete_question_pack(self, pack_id):
         """Delete a question pack from Firestore
 
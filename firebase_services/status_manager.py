@@ -1,23 +1,142 @@
 # firebase_services/status_manager.py
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from google.cloud.firestore_v1 import FieldFilter, FieldPath
+
+from .check_in_archive import ARCHIVE_COLLECTION, ArchiveCursor, CheckInArchive, decode_check_ins, month_key
+from .check_in_retention import CheckInRetention, cutoff_value, open_deleter
+from .check_in_store import CheckInStore, default_store_path
+from .overdue_monitor import to_epoch
+from .question_analytics import DEFAULT_CORRECT_RESULTS
+
 
 class StatusManager:
     """Manager for responder status and check-in operations"""
 
+    SYNC_CHUNK_SIZE = 1000  # Check-ins written to the local mirror per transaction
+
     def __init__(self, base_manager):
         self.base_manager = base_manager
+        self._check_in_store = None  # Local mirror of every responder's check-ins, opened on first use
+        self.check_in_archive = CheckInArchive(lambda: self.db)  # Monthly archives of old check-ins
 
     @property
     def db(self):
         """Get the Firestore database client from base manager"""
         return self.base_manager.db
 
+    @property
+    def check_in_store(self):
+        """Get the local check-in mirror, persisted per project under the user's app-data directory"""
+        if self._check_in_store is None:
+            try:
+                self._check_in_store = CheckInStore(default_store_path(self.db.project))
+            except Exception as e:
+                print(f"Error opening the check-in mirror file, keeping it in memory: {e}")
+                self._check_in_store = CheckInStore()
+        return self._check_in_store
+
+    def sync_check_in_store(self, full=False):
+        """Bring the local check-in mirror up to date
+
+        The first sync (or a full one) reads every check-in with a single
+        collection_group('check_ins') scan. Later syncs only read check-ins at
+        or after the newest timestamp already mirrored, which needs a
+        collection-group index on check_ins.timestamp. Check-ins deleted outside
+        this tool are only dropped by a full sync. Archived check-ins are
+        older than anything still live, so they are read on full syncs only.
+
+        Args:
+            full: Clear the mirror and read every check-in again
+
+        Returns:
+            Tuple (success, message)
+        """
+        try:
+            store = self.check_in_store
+            if full:
+                store.clear()
+
+            query = self.db.collection_group('check_ins')
+            high_water = store.high_water
+            if high_water is not None:
+                # >= so check-ins sharing the newest timestamp are not missed; re-reading one just replaces it
+                query = query.where(filter=FieldFilter('timestamp', '>=', high_water))
+
+            synced = 0
+            chunk = []
+            for doc in query.stream():
+                status_ref = doc.reference.parent.parent
+                if status_ref is None or status_ref.parent.id != 'responder_status':
+                    continue  # A check_ins subcollection somewhere else
+                chunk.append((doc.reference.path, status_ref.id, doc.id, doc.to_dict() or {}))
+                if len(chunk) >= self.SYNC_CHUNK_SIZE:
+                    synced += store.upsert_check_ins(chunk)
+                    chunk = []
+            synced += store.upsert_check_ins(chunk)
+
+            if high_water is None:
+                for doc in self.db.collection_group(ARCHIVE_COLLECTION).stream():
+                    status_ref = doc.reference.parent.parent
+                    blob = (doc.to_dict() or {}).get('data')
+                    if status_ref is None or status_ref.parent.id != 'responder_status' or not blob:
+                        continue
+                    archive = decode_check_ins(blob)
+                    synced += store.upsert_check_ins(
+                        (f"{status_ref.path}/check_ins/{check_in['id']}", status_ref.id, check_in['id'],
+                         {key: value for key, value in check_in.items() if key != 'id'})
+                        for check_in in archive)
+
+            mode = "Full" if full or high_water is None else "Incremental"
+            message = f"{mode} check-in sync read {synced} check-ins ({store.count()} mirrored)"
+            print(message)
+            return True, message
+
+        except Exception as e:
+            print(f"Error syncing check-ins: {e}")
+            import traceback
+            print(traceback.format_exc())
+            return False, f"Error syncing check-ins: {str(e)}"
+
     def get_responder_status_data(self):
         """Get all responder_status data with summarized check-in information
 
+        Syncs the local check-in mirror and answers the counts and latest
+        check-ins from it, so only new check-ins and the responder_status IDs
+        are read. Falls back to reading every subcollection if the sync fails.
+
         Returns:
             List of dictionaries with responder status information
         """
+        success, _ = self.sync_check_in_store()
+        if not success:
+            return self._scan_responder_status_data()
+
+        try:
+            docs = self.db.collection('responder_status').select([FieldPath.document_id()]).stream()
+            summary = self.check_in_store.summary()
+
+            result = []
+            for doc in docs:
+                count, latest_check_in = summary.get(doc.id, (0, None))
+                result.append({
+                    'id': doc.id,
+                    'check_ins': count,
+                    'latest_check_in': latest_check_in or "Never"
+                })
+
+            print(f"Summarized {len(result)} responder status records from the check-in mirror")
+            return result
+
+        except Exception as e:
+            print(f"Error getting responder status data: {e}")
+            import traceback
+            print(traceback.format_exc())
+            return []
+
+    def _scan_responder_status_data(self):
+        """Get all responder_status data by reading every check_ins subcollection"""
         try:
             print("Starting to fetch responder_status data")
 
@@ -97,6 +216,23 @@ class StatusManager:
             print(traceback.format_exc())
             return []
 
+    def get_check_in_summary(self, sync=True):
+        """Get each responder's check-in count and latest check-in from the local mirror
+
+        Args:
+            sync: Bring the check-in mirror up to date first
+
+        Returns:
+            Dictionary mapping responder ID to (count, latest_timestamp)
+        """
+        try:
+            if sync:
+                self.sync_check_in_store()
+            return self.check_in_store.summary()
+        except Exception as e:
+            print(f"Error getting check-in summary: {e}")
+            return {}
+
     def get_responder_check_ins(self, responder_id, limit=20):
         """Get detailed check-in data for a specific responder
 
@@ -110,15 +246,9 @@ class StatusManager:
         try:
             print(f"Fetching check-ins for responder ID: {responder_id}")
 
-            # First verify the responder_status document exists
+            # Query the check_ins subcollection directly; a missing responder_status
+            # document simply yields no check-ins, so no separate existence read is needed
             doc_ref = self.db.collection('responder_status').document(responder_id)
-            doc = doc_ref.get()
-
-            if not doc.exists:
-                print(f"Responder status document {responder_id} does not exist")
-                return []
-
-            # Query the check_ins subcollection
             check_ins_query = doc_ref.collection('check_ins') \
                 .order_by('timestamp', direction='DESCENDING') \
                 .limit(limit)
@@ -132,6 +262,11 @@ class StatusManager:
                 data['id'] = doc.id  # Add document ID
                 result.append(data)
 
+            if len(result) < limit:
+                # Older history has been compacted into monthly archives
+                archived, _ = self.check_in_archive.older(responder_id, None, limit - len(result))
+                result.extend(dict(check_in) for check_in in archived)
+
             return result
 
         except Exception as e:
@@ -140,6 +275,153 @@ class StatusManager:
             print(traceback.format_exc())
             return []
 
+    def get_check_ins_page(self, responder_id, page_size=20, cursor=None, newer=False):
+        """Get one page of a responder's check-ins, newest first
+
+        Pages are read with start_after on the timestamp order, so each call
+        reads at most page_size + 1 documents however long the history is.
+        Past the oldest live check-in, pages continue into the monthly
+        archives (see compact_check_ins), one archive read per month.
+
+        Args:
+            responder_id: ID of the responder
+            page_size: Maximum number of check-ins to return
+            cursor: Cursor to continue from (a first_cursor or last_cursor of
+                an earlier page), or None for the newest check-ins
+            newer: Read the check-ins newer than the cursor instead of older
+
+        Returns:
+            Tuple (check_ins, first_cursor, last_cursor, has_more). check_ins are
+            ordered newest first; first_cursor and last_cursor are the snapshots
+            of the newest and oldest check-in on the page (None if it is empty);
+            has_more tells whether more check-ins exist beyond the page in the
+            requested direction. Cursors are document snapshots for live
+            check-ins and ArchiveCursors for archived ones.
+        """
+        try:
+            archive = self.check_in_archive
+            from_archive = isinstance(cursor, ArchiveCursor)
+            archived = []  # Oldest first when reading newer, newest first otherwise
+            docs = []
+            has_more = False
+
+            if from_archive and newer:
+                archived, has_more = archive.newer(responder_id, cursor, page_size)
+                if has_more:
+                    archived.reverse()
+                    return ([dict(check_in) for check_in in archived], archive.cursor(archived[0]),
+                            archive.cursor(archived[-1]), True)
+                cursor = None  # The rest of the page is the oldest live check-ins
+
+            if not from_archive or newer:
+                direction = 'ASCENDING' if newer else 'DESCENDING'
+                query = self.db.collection('responder_status').document(responder_id) \
+                    .collection('check_ins') \
+                    .order_by('timestamp', direction=direction)
+
+                if cursor is not None:
+                    query = query.start_after(cursor)
+
+                # One extra document tells whether another page exists
+                remaining = page_size - len(archived)
+                docs = list(query.limit(remaining + 1).stream())
+                has_more = len(docs) > remaining
+                docs = docs[:remaining]
+
+            if not newer and not has_more:
+                # Live check-ins ran out, so carry on into the archives
+                before = cursor if from_archive else None
+                archived, has_more = archive.older(responder_id, before, page_size - len(docs))
+
+            live = []
+            for doc in docs:
+                data = doc.to_dict()
+                data['id'] = doc.id  # Add document ID
+                live.append(data)
+            archived_cursors = [archive.cursor(check_in) for check_in in archived]
+            archived = [dict(check_in) for check_in in archived]
+            if newer:
+                check_ins = archived + live
+                cursors = archived_cursors + docs
+                check_ins.reverse()
+                cursors.reverse()
+            else:
+                check_ins = live + archived
+                cursors = docs + archived_cursors
+
+            if not check_ins:
+                return [], None, None, has_more
+            return check_ins, cursors[0], cursors[-1], has_more
+
+        except Exception as e:
+            print(f"Error getting check-ins page for {responder_id}: {e}")
+            return [], None, None, False
+
+    def iter_check_ins(self, responder_id, page_size=100):
+        """Iterate over a responder's whole check-in history, newest first
+
+        Check-ins are read one page at a time as the caller consumes them, so
+        at most one page is held in memory.
+
+        Args:
+            responder_id: ID of the responder
+            page_size: Number of check-ins to read per query
+
+        Yields:
+            Check-in dictionaries
+        """
+        cursor = None
+        while True:
+            check_ins, _, cursor, has_more = self.get_check_ins_page(responder_id, page_size, cursor)
+            yield from check_ins
+            if not has_more:
+                return
+
+    def get_check_in_heatmap(self, responder_id=None, observer_id=None, result=None,
+                             correct_results=DEFAULT_CORRECT_RESULTS, utc=False, sync=False):
+        """Get check-in counts and success rates by weekday and hour of day
+
+        Aggregated from the local check-in mirror, so the result is a fixed
+        7 x 24 matrix however many check-ins there are.
+
+        Args:
+            responder_id: Only this responder's check-ins
+            observer_id: Only check-ins of the responders this observer is watching
+            result: Only check-ins with this result
+            correct_results: Result values counted as a success
+            utc: Bucket by UTC instead of local time
+            sync: Bring the check-in mirror up to date first
+
+        Returns:
+            Dictionary with 'counts', 'correct' and 'success_rates' (7 lists,
+            Monday first, of 24 hourly values; rates are None where there are
+            no check-ins) and 'total'
+        """
+        try:
+            if sync:
+                self.sync_check_in_store()
+
+            responder_ids = None
+            if observer_id is not None:
+                observer_doc = self.db.collection('users').document(observer_id).get()
+                responder_ids = set((observer_doc.to_dict() or {}).get('observing', {})) if observer_doc.exists else set()
+            if responder_id is not None:
+                responder_ids = {responder_id} if responder_ids is None else responder_ids & {responder_id}
+
+            counts, correct = self.check_in_store.heatmap(responder_ids, result, correct_results, utc)
+            success_rates = [[(good / count) * 100 if count else None for count, good in zip(count_row, correct_row)]
+                             for count_row, correct_row in zip(counts, correct)]
+
+            return {
+                'counts': counts,
+                'correct': correct,
+                'success_rates': success_rates,
+                'total': sum(map(sum, counts))
+            }
+        except Exception as e:
+            print(f"Error building check-in heatmap: {e}")
+            return {}
+
     def purge_responder_status(self, responder_id):
         """Delete a responder_status document and all its check-ins
 
@@ -184,9 +466,15 @@ class StatusManager:
                 print(f"Committing final batch of {batch_size} deletions")
                 batch.commit()
 
+            # Delete the monthly archives of older check-ins
+            for archive_doc in doc_ref.collection(ARCHIVE_COLLECTION).select([FieldPath.document_id()]).stream():
+                archive_doc.reference.delete()
+            self.check_in_archive.invalidate(responder_id)
+
             # Delete the responder_status document itself
             print(f"Deleting responder_status document")
             doc_ref.delete()
+            self.check_in_store.remove_responder(responder_id)
 
             return True, f"Successfully purged responder status and {len(check_ins)} check-ins"
 
@@ -194,4 +482,188 @@ class StatusManager:
             print(f"Error purging responder status: {e}")
             import traceback
             print(traceback.format_exc())
-            return False, f"Error purging responder status: {str(e)}"
\ No newline at end of file
+            return False, f"Error purging responder status: {str(e)}"
+
+    def compact_check_ins(self, days=90, responder_ids=None, dry_run=False, max_writes_per_second=500):
+        """Roll check-ins older than a number of days into monthly archives
+
+        Each responder's old check-ins are grouped by UTC month and merged into
+        one compressed archive document per month (see CheckInArchive). Once a
+        month's archive is written, its original documents are deleted with a
+        rate-limited bulk deleter. The history APIs read archives transparently
+        and the local mirror keeps the archived check-ins.
+
+        Args:
+            days: Check-ins older than this many days are archived
+            responder_ids: Responders to compact (None for every responder_status record)
+            dry_run: If True, only report what would be archived
+            max_writes_per_second: Ceiling on the delete rate
+
+        Returns:
+            Dictionary with the compaction report
+        """
+        report = {
+            'dry_run': dry_run,
+            'responders': 0,
+            'months': 0,
+            'check_ins': 0,
+            'deleted': 0,
+            'errors': []
+        }
+        cutoff = time.time() - days * 86400
+        deleter = None
+
+        try:
+            if responder_ids is None:
+                docs = self.db.collection('responder_status').select([FieldPath.document_id()]).stream()
+                responder_ids = [doc.id for doc in docs]
+            if not dry_run:
+                deleter = open_deleter(self.db, max_writes_per_second)
+
+            for responder_id in responder_ids:
+                check_ins_ref = self.db.collection('responder_status').document(responder_id) \
+                    .collection('check_ins')
+
+                # The oldest check-in gives the type the cutoff must be compared as
+                oldest = list(check_ins_ref.order_by('timestamp').limit(1).stream())
+                if not oldest:
+                    continue
+                sample = (oldest[0].to_dict() or {}).get('timestamp')
+
+                months = {}  # month -> [(reference, check-in)]
+                query = check_ins_ref.where(filter=FieldFilter('timestamp', '<', cutoff_value(sample, cutoff)))
+                for doc in query.stream():
+                    data = doc.to_dict() or {}
+                    ts = to_epoch(data.get('timestamp'))
+                    if ts is None or ts >= cutoff:
+                        continue
+                    data['id'] = doc.id
+                    months.setdefault(month_key(ts), []).append((doc.reference, data))
+                if not months:
+                    continue
+
+                report['responders'] += 1
+                report['months'] += len(months)
+                report['check_ins'] += sum(len(entries) for entries in months.values())
+                if dry_run:
+                    continue
+
+                for month, entries in sorted(months.items()):
+                    success, message = self.check_in_archive.write_month(
+                        responder_id, month, [data for _, data in entries])
+                    if not success:
+                        report['errors'].append(message)
+                        continue
+                    # Originals are only removed once their archive is written
+                    for reference, _ in entries:
+                        deleter.delete(reference)
+                report['deleted'] += len(deleter.flush())
+                print(f"Compacted check-ins for {responder_id} into {len(months)} monthly archives")
+
+            print(f"Archived {report['check_ins']} check-ins into {report['months']} monthly archives")
+            return report
+
+        except Exception as e:
+            print(f"Error compacting check-ins: {e}")
+            import traceback
+            print(traceback.format_exc())
+            report['errors'].append(str(e))
+            return report
+        finally:
+            if deleter is not None:
+                deleter.close()
+                report['errors'].extend(deleter.errors)
+
+    def apply_check_in_retention(self, days, overrides=None, dry_run=True, checkpoint_path=None,
+                                 max_writes_per_second=500):
+        """Delete check-ins older than a retention policy across all responders
+
+        Deleted check-ins are also dropped from the local mirror.
+
+        Args:
+            days: Days of check-ins to keep (None keeps everything not overridden)
+            overrides: Dictionary mapping responder ID to days to keep for that
+                responder (None keeps all of its check-ins)
+            dry_run: If True, only count the check-ins that would be deleted
+            checkpoint_path: JSON file to record progress in and resume from
+            max_writes_per_second: Ceiling on the delete rate
+
+        Returns:
+            Dictionary with the run report (see CheckInRetention.run)
+        """
+        retention = CheckInRetention(self.db, self.check_in_store)
+        report = retention.run(days, overrides, dry_run, checkpoint_path, max_writes_per_second)
+        if not dry_run:
+            self.check_in_archive.clear()
+        return report
+
+    def reconcile_orphans(self, include_user_names=False):
+        """Find responder_status records and token_events owners with no user
+
+        Only document IDs are streamed from users and responder_status, and only
+        the userId field from token_events. The three scans run concurrently and
+        orphans are computed as set differences.
+
+        Args:
+            include_user_names: If True, project the users scan to 'name' as well
+                so callers can label valid records without a second scan
+
+        Returns:
+            Dictionary with the ID sets and orphan sets:
+            'user_ids', 'responder_status_ids', 'token_event_user_ids',
+            'orphaned_responder_status', 'orphaned_token_event_users' and,
+            if requested, 'user_names' (user_id -> name)
+        """
+        try:
+            def scan_users():
+                if include_user_names:
+                    docs = self.db.collection('users').select(['name']).stream()
+                    return {doc.id: (doc.to_dict() or {}).get('name', 'Unnamed') for doc in docs}
+                docs = self.db.collection('users').select([FieldPath.document_id()]).stream()
+                return {doc.id: None for doc in docs}
+
+            def scan_responder_status():
+                docs = self.db.collection('responder_status').select([FieldPath.document_id()]).stream()
+                return {doc.id for doc in docs}
+
+            def scan_token_event_users():
+                docs = self.db.collection('token_events').select(['userId']).stream()
+                user_ids = set()
+                for doc in docs:
+                    user_id = (doc.to_dict() or {}).get('userId')
+                    if user_id:
+                        user_ids.add(user_id)
+                return user_ids
+
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                users_future = executor.submit(scan_users)
+                status_future = executor.submit(scan_responder_status)
+                events_future = executor.submit(scan_token_event_users)
+
+                user_names = users_future.result()
+                responder_status_ids = status_future.result()
+                token_event_user_ids = events_future.result()
+
+            user_ids = set(user_names)
+
+            report = {
+                'user_ids': user_ids,
+                'responder_status_ids': responder_status_ids,
+                'token_event_user_ids': token_event_user_ids,
+                'orphaned_responder_status': responder_status_ids - user_ids,
+                'orphaned_token_event_users': token_event_user_ids - user_ids
+            }
+            if include_user_names:
+                report['user_names'] = user_names
+
+            print(f"Reconciled {len(user_ids)} users, {len(responder_status_ids)} responder_status records "
+                  f"and {len(token_event_user_ids)} token_events users: "
+                  f"{len(report['orphaned_responder_status'])} orphaned status records, "
+                  f"{len(report['orphaned_token_event_users'])} orphaned token_events users")
+            return report
+
+        except Exception as e:
+            print(f"Error reconciling orphans: {e}")
+            import traceback
+            print(traceback.format_exc())
+            return {}
@@ -1,11 +1,31 @@
 # firebase_services/user_manager.py
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from google.cloud.firestore_v1 import DELETE_FIELD, FieldFilter, FieldPath
+
+from .check_in_retention import cutoff_value
+from .account_rules import AccountClassifier, default_rules
+
 
 class UserManager:
     """Manager for user operations and relationships"""
 
+    # get_users_page sort key -> users document field
+    PAGE_SORT_FIELDS = {
+        'name': 'name',
+        'created_at': 'createdAt',
+        'engagement_score': 'engagementMetrics.engagementScore',
+    }
+
     def __init__(self, base_manager):
         self.base_manager = base_manager
+        self._cached_users = None  # Last result of get_users_with_engagement_metrics
+        self._watch = None  # Firestore snapshot listener on users while live sync is on
+        self._live_users = {}  # user_id -> user record, kept current by the listener
+        self._live_lock = threading.Lock()  # The listener updates _live_users on a Firestore thread
+        self._live_listeners = []
 
     @property
     def db(self):
@@ -148,6 +168,13 @@ class UserManager:
             # Delete the user document
             user_ref.delete()
 
+            # Keep the cached users consistent with the deletion
+            if self._cached_users is not None:
+                self._cached_users = [user for user in self._cached_users if user['id'] != user_id]
+                for user in self._cached_users:
+                    user.get('observing', {}).pop(user_id, None)
+                    user.get('linked_observers', {}).pop(user_id, None)
+
             return True, f"User '{user_name}' deleted successfully with all relationships and responder status cleaned up"
         except Exception as e:
             return False, f"Error deleting user: {str(e)}"
@@ -167,120 +194,461 @@ class UserManager:
                 user_data = user_ref.to_dict()
                 user_id = user_ref.id
 
-                # Basic user info
-                user_info = {
-                    'id': user_id,
-                    'name': user_data.get('name', 'Unnamed'),
-                    'role': user_data.get('role', 'unknown'),
-                }
-
-                # Add created timestamp if available
-                if 'createdAt' in user_data:
-                    created_at = user_data['createdAt']
-                    # Handle Firestore timestamp objects
-                    if hasattr(created_at, 'timestamp'):
-                        from datetime import datetime
-                        dt = datetime.fromtimestamp(created_at.timestamp())
-                        user_info['created_at'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        user_info['created_at'] = str(created_at)
-
-                if len(user_data['fcmTokens']) > 0:
-                    user_info['fcmToken'] = user_data['fcmTokens'][0]['token']
-                else:
-                    user_info['fcmToken'] = 'NADA?!'
-                
-                if user_data.get('role') == 'responder':
-                    if 'inviteCode' in user_data:
-                        user_info['invite_code'] = user_data['inviteCode']
-                    if 'linkedObservers' in user_data:
-                        user_info['linked_observers'] = user_data['linkedObservers']
-                    if 'observing' in user_data:
-                        user_info['observing'] = user_data['observing']
-                    
-                    user_info['nextCheckInTime'] = user_data['checkInSettings']['nextCheckInTime']
-                    user_info['lastCheckInTime'] = user_data['checkInSettings']['lastCheckInTime']
-
-                # Add engagement metrics
-                engagement_metrics = user_data.get('engagementMetrics', {})
-                user_info['engagement_score'] = engagement_metrics.get('engagementScore', 0)
-                user_info['token_failure_count'] = engagement_metrics.get('tokenFailureCount', 0)
-                user_info['successful_notification_count'] = engagement_metrics.get('successfulNotificationCount', 0)
-
-                # Calculate token health ratio
-                total_notifications = user_info['token_failure_count'] + user_info['successful_notification_count']
-                if total_notifications > 0:
-                    success_rate = (user_info['successful_notification_count'] / total_notifications) * 100
-                    user_info[
-                        'token_health'] = f"{user_info['successful_notification_count']}/{total_notifications} ({success_rate:.1f}%)"
-                else:
-                    user_info['token_health'] = "No data"
-
-                # Add last activity timestamps
-                if 'lastSuccessfulNotification' in engagement_metrics:
-                    last_success = engagement_metrics['lastSuccessfulNotification']
-                    if hasattr(last_success, 'timestamp'):
-                        from datetime import datetime
-                        dt = datetime.fromtimestamp(last_success.timestamp())
-                        user_info['last_successful_notification'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        user_info['last_successful_notification'] = str(last_success)
-                else:
-                    user_info['last_successful_notification'] = 'Never'
-
-                # Identify test accounts (names containing numbers)
-                user_info['is_likely_test'] = any(char.isdigit() for char in user_info['name'])
-
+                user_info = self._build_engagement_user_info(user_id, user_data)
                 users.append(user_info)
 
+            self._cached_users = users
             return users
         except Exception as e:
             print(f"Error fetching users with engagement metrics: {str(e)}")
             return []
 
-    def identify_test_accounts(self, include_criteria=None):
+    def _build_engagement_user_info(self, user_id, user_data):
+        """Convert a users document into the record format of get_users_with_engagement_metrics"""
+        # Basic user info
+        user_info = {
+            'id': user_id,
+            'name': user_data.get('name', 'Unnamed'),
+            'role': user_data.get('role', 'unknown'),
+        }
+
+        # Add created timestamp if available
+        if 'createdAt' in user_data:
+            created_at = user_data['createdAt']
+            # Handle Firestore timestamp objects
+            if hasattr(created_at, 'timestamp'):
+                from datetime import datetime
+                dt = datetime.fromtimestamp(created_at.timestamp())
+                user_info['created_at'] = dt.strftime('%Y-%m-%d %H:%M:%S')
+                user_info['created_timestamp'] = created_at.timestamp()
+            else:
+                user_info['created_at'] = str(created_at)
+                try:
+                    from datetime import datetime
+                    dt = datetime.fromisoformat(str(created_at).replace('Z', '+00:00'))
+                    user_info['created_timestamp'] = dt.timestamp()
+                except ValueError:
+                    pass
+
+        if len(user_data['fcmTokens']) > 0:
+            user_info['fcmToken'] = user_data['fcmTokens'][0]['token']
+        else:
+            user_info['fcmToken'] = 'NADA?!'
+
+        if user_data.get('role') == 'responder':
+            if 'inviteCode' in user_data:
+                user_info['invite_code'] = user_data['inviteCode']
+            if 'linkedObservers' in user_data:
+                user_info['linked_observers'] = user_data['linkedObservers']
+            if 'observing' in user_data:
+                user_info['observing'] = user_data['observing']
+
+            user_info['nextCheckInTime'] = user_data['checkInSettings']['nextCheckInTime']
+            user_info['lastCheckInTime'] = user_data['checkInSettings']['lastCheckInTime']
+        elif user_data.get('role') == 'observer' and 'observing' in user_data:
+            user_info['observing'] = user_data['observing']
+
+        # Add engagement metrics
+        engagement_metrics = user_data.get('engagementMetrics', {})
+        user_info['engagement_score'] = engagement_metrics.get('engagementScore', 0)
+        user_info['token_failure_count'] = engagement_metrics.get('tokenFailureCount', 0)
+        user_info['successful_notification_count'] = engagement_metrics.get('successfulNotificationCount', 0)
+
+        # Calculate token health ratio
+        total_notifications = user_info['token_failure_count'] + user_info['successful_notification_count']
+        if total_notifications > 0:
+            success_rate = (user_info['successful_notification_count'] / total_notifications) * 100
+            user_info[
+                'token_health'] = f"{user_info['successful_notification_count']}/{total_notifications} ({success_rate:.1f}%)"
+        else:
+            user_info['token_health'] = "No data"
+
+        # Add last activity timestamps
+        if 'lastSuccessfulNotification' in engagement_metrics:
+            last_success = engagement_metrics['lastSuccessfulNotification']
+            if hasattr(last_success, 'timestamp'):
+                from datetime import datetime
+                dt = datetime.fromtimestamp(last_success.timestamp())
+                user_info['last_successful_notification'] = dt.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                user_info['last_successful_notification'] = str(last_success)
+        else:
+            user_info['last_successful_notification'] = 'Never'
+
+        # Identify test accounts (names containing numbers)
+        user_info['is_likely_test'] = any(char.isdigit() for char in user_info['name'])
+
+        return user_info
+
+    def get_users_page(self, sort_key='name', descending=False, page_size=50, cursor=None):
+        """Get one page of users in a server-side sort order
+
+        Reads at most page_size + 1 documents, however large the users
+        collection is. Users without the sort field are not returned, since
+        Firestore leaves them out of queries ordered on that field.
+
+        Args:
+            sort_key: 'name', 'created_at' or 'engagement_score'
+            descending: Sort in descending order
+            page_size: Maximum number of users to return
+            cursor: next_cursor from the previous page (None for the first page)
+
+        Returns:
+            Tuple (users, next_cursor). users are in the format of
+            get_users_with_engagement_metrics; next_cursor is None on the last page.
+        """
+        try:
+            direction = 'DESCENDING' if descending else 'ASCENDING'
+            query = self.db.collection('users') \
+                .order_by(self.PAGE_SORT_FIELDS[sort_key], direction=direction)
+
+            # Starting after the previous page's last snapshot also orders ties by document ID
+            if cursor is not None:
+                query = query.start_after(cursor)
+
+            # One extra document tells whether another page exists
+            docs = list(query.limit(page_size + 1).stream())
+            next_cursor = docs[page_size - 1] if len(docs) > page_size else None
+
+            users = [self._build_engagement_user_info(doc.id, doc.to_dict()) for doc in docs[:page_size]]
+            return users, next_cursor
+        except Exception as e:
+            print(f"Error fetching users page: {str(e)}")
+            return [], None
+
+    def get_cached_users(self, refresh=False):
+        """Get the users most recently loaded by get_users_with_engagement_metrics
+
+        Args:
+            refresh: If True, or if nothing has been loaded yet, reload from Firestore
+
+        Returns:
+            List of user data dictionaries with relationship and engagement information
+        """
+        if self._watch is not None and not refresh:
+            with self._live_lock:
+                return list(self._live_users.values())
+        if refresh or self._cached_users is None:
+            return self.get_users_with_engagement_metrics()
+        return self._cached_users
+
+    # === LIVE SYNC ===
+
+    def start_live_sync(self, listener):
+        """Keep the in-memory user set current through a snapshot listener on users
+
+        The first snapshot delivers every user; after that only changed documents
+        are read and passed on. Several listeners share one Firestore listener.
+
+        Args:
+            listener: Callable taking (changed_users, removed_user_ids). It is
+                called on a Firestore background thread, not the Qt main thread.
+
+        Returns:
+            Tuple (success, message)
+        """
+        try:
+            if listener not in self._live_listeners:
+                self._live_listeners.append(listener)
+
+            if self._watch is None:
+                with self._live_lock:
+                    self._live_users = {}
+                self._watch = self.db.collection('users').on_snapshot(self._on_users_snapshot)
+            else:
+                # Late subscribers start from the current set
+                with self._live_lock:
+                    current_users = list(self._live_users.values())
+                if current_users:
+                    listener(current_users, [])
+
+            return True, "Live user sync started"
+        except Exception as e:
+            # Bound methods are recreated on every access, so compare by equality
+            self._live_listeners = [l for l in self._live_listeners if l != listener]
+            return False, f"Error starting live user sync: {str(e)}"
+
+    def stop_live_sync(self, listener):
+        """Remove a live sync listener, detaching from Firestore when none remain"""
+        # Bound methods are recreated on every access, so compare by equality
+        self._live_listeners = [l for l in self._live_listeners if l != listener]
+
+        if not self._live_listeners and self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception as e:
+                print(f"Error stopping live user sync: {str(e)}")
+            self._watch = None
+            with self._live_lock:
+                self._cached_users = list(self._live_users.values())
+                self._live_users = {}
+
+    def is_live(self):
+        """Check whether live user sync is active"""
+        return self._watch is not None
+
+    def _on_users_snapshot(self, doc_snapshots, changes, read_time):
+        """Apply a users snapshot's changes to the live user set and notify listeners"""
+        changed_users = []
+        removed_ids = []
+
+        for change in changes:
+            doc = change.document
+            if change.type.name == 'REMOVED':
+                removed_ids.append(doc.id)
+                continue
+
+            try:
+                user_info = self._build_engagement_user_info(doc.id, doc.to_dict() or {})
+            except Exception as e:
+                print(f"Error converting live user {doc.id}: {str(e)}")
+                continue
+            changed_users.append(user_info)
+
+        # Runs on a Firestore thread while the Qt thread may be reading the set
+        with self._live_lock:
+            for user_id in removed_ids:
+                self._live_users.pop(user_id, None)
+            for user_info in changed_users:
+                self._live_users[user_info['id']] = user_info
+
+        for listener in list(self._live_listeners):
+            try:
+                listener(changed_users, removed_ids)
+            except Exception as e:
+                print(f"Error in live user sync listener: {str(e)}")
+
+    def identify_test_accounts(self, include_criteria=None, users=None):
         """Identify likely test accounts based on criteria
 
         Args:
             include_criteria: Additional criteria for test account identification
+                ('low_engagement', 'no_activity')
+            users: Already-loaded users to evaluate (defaults to the cached users)
 
         Returns:
             List of user IDs that are likely test accounts
         """
         try:
-            users = self.get_users_with_engagement_metrics()
-            test_account_ids = []
-
-            for user in users:
-                is_test = False
-
-                # Primary criteria: name contains numbers
-                if user['is_likely_test']:
-                    is_test = True
-
-                # Additional criteria can be added here
-                if include_criteria:
-                    # Example: very low engagement score
-                    if 'low_engagement' in include_criteria and user['engagement_score'] < 20:
-                        is_test = True
-
-                    # Example: no successful notifications despite being old account
-                    if 'no_activity' in include_criteria and user['successful_notification_count'] == 0:
-                        # Check if account is older than 7 days
-                        if user.get('created_at') and user['created_at'] != 'Unknown':
-                            from datetime import datetime, timedelta
-                            try:
-                                created_date = datetime.strptime(user['created_at'], '%Y-%m-%d %H:%M:%S')
-                                if datetime.now() - created_date > timedelta(days=7):
-                                    is_test = True
-                            except:
-                                pass
-
-                if is_test:
-                    test_account_ids.append(user['id'])
-
-            return test_account_ids
+            classifications = self.classify_test_accounts(default_rules(include_criteria), users=users)
+            return [result['id'] for result in classifications if result['is_test']]
         except Exception as e:
             print(f"Error identifying test accounts: {str(e)}")
             return []
-        
+
+    def classify_test_accounts(self, rules=None, threshold=1.0, users=None):
+        """Score users against test-account rules
+
+        Args:
+            rules: List of AccountRule objects (defaults to the name rule)
+            threshold: Minimum total rule weight for a user to count as a test account
+            users: Already-loaded users to evaluate (defaults to the cached users)
+
+        Returns:
+            List of classification dictionaries with 'id', 'name', 'score',
+            'matched_rules' and 'is_test'
+        """
+        try:
+            if users is None:
+                users = self.get_cached_users()
+
+            classifier = AccountClassifier(rules, threshold)
+            return classifier.classify(users)
+        except Exception as e:
+            print(f"Error classifying test accounts: {str(e)}")
+            return []
+
+    def scan_relationship_integrity(self, dry_run=True, max_workers=4):
+        """Find and repair one-sided or dangling observer/responder links
+
+        A responder's 'linkedObservers' entry for an observer must be matched by
+        that observer's 'observing' entry for the responder, and vice versa.
+        The users collection is loaded once with only the relationship fields,
+        and every link is checked against the set of existing links.
+
+        Broken links are repaired by removing them, which is the same end state
+        delete_user leaves behind. All removals for one user are coalesced into a
+        single update, and updates are committed in concurrent batches.
+
+        Args:
+            dry_run: If True, only report problems without writing any repairs
+            max_workers: Number of batches to commit concurrently
+
+        Returns:
+            Dictionary with the scan report
+        """
+        report = {
+            'dry_run': dry_run,
+            'users_scanned': 0,
+            'links_checked': 0,
+            'dangling': [],
+            'asymmetric': [],
+            'documents_to_update': 0,
+            'documents_updated': 0,
+            'errors': []
+        }
+
+        try:
+            user_refs = self.db.collection('users') \
+                .select(['linkedObservers', 'observing']) \
+                .stream()
+
+            user_ids = set()
+            observer_links = {}  # responder_id -> {observer_id: name}
+            observing_links = {}  # observer_id -> {responder_id: name}
+
+            for user_ref in user_refs:
+                user_data = user_ref.to_dict() or {}
+                user_ids.add(user_ref.id)
+
+                linked_observers = user_data.get('linkedObservers') or {}
+                if isinstance(linked_observers, dict) and linked_observers:
+                    observer_links[user_ref.id] = linked_observers
+
+                observing = user_data.get('observing') or {}
+                if isinstance(observing, dict) and observing:
+                    observing_links[user_ref.id] = observing
+
+            report['users_scanned'] = len(user_ids)
+
+            # Both sides expressed as (responder_id, observer_id) edges
+            responder_edges = {(responder_id, observer_id)
+                               for responder_id, observers in observer_links.items()
+                               for observer_id in observers}
+            observer_edges = {(responder_id, observer_id)
+                              for observer_id, responders in observing_links.items()
+                              for responder_id in responders}
+            report['links_checked'] = len(responder_edges) + len(observer_edges)
+
+            # user_id -> field -> set of keys to delete
+            repairs = {}
+
+            def add_problem(kind, user_id, field, target_id, target_name):
+                report[kind].append({
+                    'user_id': user_id,
+                    'field': field,
+                    'target_id': target_id,
+                    'target_name': target_name
+                })
+                repairs.setdefault(user_id, {}).setdefault(field, set()).add(target_id)
+
+            for responder_id, observer_id in responder_edges - observer_edges:
+                name = observer_links[responder_id][observer_id]
+                kind = 'asymmetric' if observer_id in user_ids else 'dangling'
+                add_problem(kind, responder_id, 'linkedObservers', observer_id, name)
+
+            for responder_id, observer_id in observer_edges - responder_edges:
+                name = observing_links[observer_id][responder_id]
+                kind = 'asymmetric' if responder_id in user_ids else 'dangling'
+                add_problem(kind, observer_id, 'observing', responder_id, name)
+
+            report['documents_to_update'] = len(repairs)
+
+            if dry_run or not repairs:
+                return report
+
+            # One update per user document, 400 updates per batch
+            updates = []
+            for user_id, fields in repairs.items():
+                update_data = {}
+                for field, keys in fields.items():
+                    for key in keys:
+                        update_data[FieldPath(field, key).to_api_repr()] = DELETE_FIELD
+                updates.append((user_id, update_data))
+
+            chunks = [updates[i:i + 400] for i in range(0, len(updates), 400)]
+
+            def commit_chunk(chunk):
+                batch = self.db.batch()
+                for user_id, update_data in chunk:
+                    batch.update(self.db.collection('users').document(user_id), update_data)
+                batch.commit()
+                return len(chunk)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(commit_chunk, chunk) for chunk in chunks]
+                for future in futures:
+                    try:
+                        report['documents_updated'] += future.result()
+                    except Exception as e:
+                        report['errors'].append(str(e))
+
+            print(f"Repaired relationships on {report['documents_updated']} user documents")
+            return report
+        except Exception as e:
+            print(f"Error scanning relationship integrity: {str(e)}")
+            report['errors'].append(str(e))
+            return report
+
+    def get_overdue_responders(self, now=None, limit=500, sample=None):
+        """Get responders whose next check-in time has already passed
+
+        Runs an ordered range query on checkInSettings.nextCheckInTime projected
+        to the fields needed, so only overdue responders are read. Range filters
+        only match values of the bound's type, so the bound takes the type of
+        a stored nextCheckInTime (see check_in_retention.cutoff_value).
+
+        Args:
+            now: Reference time as a timezone-aware datetime (defaults to now, UTC)
+            limit: Maximum number of responders to return
+            sample: A stored nextCheckInTime giving the bound's type
+                (defaults to a Firestore timestamp)
+
+        Returns:
+            List of dictionaries with 'id', 'name' and 'nextCheckInTime', most overdue
+            first, or None if the query failed
+        """
+        try:
+            now = now or datetime.now(timezone.utc)
+            bound = cutoff_value(sample, now.timestamp()) if sample is not None else now
+            query = self.db.collection('users') \
+                .where(filter=FieldFilter('checkInSettings.nextCheckInTime', '<', bound)) \
+                .order_by('checkInSettings.nextCheckInTime') \
+                .select(['name', 'role', 'checkInSettings.nextCheckInTime']) \
+                .limit(limit)
+
+            overdue = []
+            for doc in query.stream():
+                data = doc.to_dict() or {}
+                if data.get('role', 'responder') != 'responder':
+                    continue
+                overdue.append({
+                    'id': doc.id,
+                    'name': data.get('name', 'Unnamed'),
+                    'nextCheckInTime': data.get('checkInSettings', {}).get('nextCheckInTime')
+                })
+            return overdue
+        except Exception as e:
+            print(f"Error getting overdue responders: {str(e)}")
+            return None
+
+    def get_check_in_schedules(self, user_ids):
+        """Get the current next check-in time of specific users
+
+        Reads the users in one get_all projected to their name and
+        checkInSettings.nextCheckInTime.
+
+        Args:
+            user_ids: IDs of the users to read
+
+        Returns:
+            List of dictionaries with 'id', 'name' and 'nextCheckInTime' (None when
+            the user has no schedule), or None if the read failed
+        """
+        try:
+            if not user_ids:
+                return []
+            users_ref = self.db.collection('users')
+            refs = [users_ref.document(user_id) for user_id in user_ids]
+            schedules = []
+            for doc in self.db.get_all(refs, field_paths=['name', 'checkInSettings.nextCheckInTime']):
+                data = (doc.to_dict() or {}) if doc.exists else {}
+                schedules.append({
+                    'id': doc.id,
+                    'name': data.get('name', 'Unnamed'),
+                    'nextCheckInTime': data.get('checkInSettings', {}).get('nextCheckInTime')
+                })
+            return schedules
+        except Exception as e:
+            print(f"Error getting check-in schedules: {str(e)}")
+            return None
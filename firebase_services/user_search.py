@@ -0,0 +1,154 @@
+# firebase_services/user_search.py
+
+import bisect
+import heapq
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserSearchIndex:
+    """In-memory index for finding users by ID, name, invite code or peer names
+
+    Name, invite code and peer name fields are lowercased and split into
+    trigrams, each mapping to the set of users containing it. A query of three
+    or more characters intersects the sets of its trigrams (smallest first),
+    then confirms the candidates with a substring check. Shorter queries match
+    the first one or two characters of any word. User IDs are random strings,
+    so instead of trigrams they are kept in a sorted list and matched by prefix.
+
+    Users can be added, updated and removed one at a time, so the index never
+    has to be rebuilt after a delete.
+    """
+
+    def __init__(self, users=()):
+        self._grams = {}  # trigram -> set of user IDs
+        self._prefixes = {}  # 1-2 character word prefix -> set of user IDs
+        self._text = {}  # user_id -> lowercased searchable fields joined by NUL
+        self._names = {}  # user_id -> lowercased name (for ranking)
+        self._sorted_ids = []  # (lowercased user ID, user ID), sorted
+
+        for user in users:
+            self._index_user(user)
+            self._sorted_ids.append((user['id'].lower(), user['id']))
+        self._sorted_ids.sort()
+
+    @staticmethod
+    def _searchable_fields(user):
+        """Get the lowercased text fields a user can be found by"""
+        fields = [user.get('name', ''), user.get('invite_code', '')]
+        fields.extend(user.get('linked_observers', {}).values())
+        fields.extend(user.get('observing', {}).values())
+        return tuple(str(field).lower() for field in fields if field)
+
+    @staticmethod
+    def _keys(text):
+        """Get the trigrams and word prefixes of a NUL-joined field string"""
+        grams = _trigrams(text)
+        grams.difference_update([gram for gram in grams if '\0' in gram])  # Don't span fields
+        prefixes = set()
+        for word in text.replace('\0', ' ').split():
+            prefixes.add(word[:1])
+            prefixes.add(word[:2])
+        return grams, prefixes
+
+    def add(self, user):
+        """Index a user, replacing its previous entry if it was already indexed"""
+        if user['id'] in self._text:
+            self.remove(user['id'])
+
+        self._index_user(user)
+        bisect.insort(self._sorted_ids, (user['id'].lower(), user['id']))
+
+    def _index_user(self, user):
+        user_id = user['id']
+        text = '\0'.join(self._searchable_fields(user))
+        grams, prefixes = self._keys(text)
+        for index, keys in ((self._grams, grams), (self._prefixes, prefixes)):
+            for key in keys:
+                ids = index.get(key)
+                if ids is None:
+                    index[key] = {user_id}
+                else:
+                    ids.add(user_id)
+
+        self._text[user_id] = text
+        self._names[user_id] = user.get('name', '').lower()
+
+    def remove(self, user_id):
+        """Remove a user from the index"""
+        text = self._text.pop(user_id, None)
+        if text is None:
+            return
+        self._names.pop(user_id, None)
+
+        entry = (user_id.lower(), user_id)
+        position = bisect.bisect_left(self._sorted_ids, entry)
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == entry:
+            del self._sorted_ids[position]
+
+        grams, prefixes = self._keys(text)
+        for index, keys in ((self._grams, grams), (self._prefixes, prefixes)):
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(user_id)
+                    if not ids:
+                        del index[key]
+
+    def __len__(self):
+        return len(self._text)
+
+    def matching_ids(self, query):
+        """Get the set of IDs of users matching a query (case-insensitive)
+
+        Queries of one or two characters match the start of any word. User IDs
+        match when they start with the query.
+        """
+        query = query.strip().lower()
+        if not query:
+            return set()
+
+        matches = self._ids_starting_with(query)
+
+        if len(query) < 3:
+            return matches | self._prefixes.get(query, set())
+
+        gram_sets = sorted((self._grams.get(gram, set()) for gram in _trigrams(query)), key=len)
+        candidates = set.intersection(*gram_sets)
+        if len(gram_sets) == 1:
+            return matches | candidates  # A single trigram needs no confirmation
+
+        text = self._text
+        return matches | {user_id for user_id in candidates if query in text[user_id]}
+
+    def _ids_starting_with(self, query):
+        sorted_ids = self._sorted_ids
+        start = bisect.bisect_left(sorted_ids, (query,))
+        end = bisect.bisect_left(sorted_ids, (query + '\uffff',))
+        return {user_id for _, user_id in sorted_ids[start:end]}
+
+    def search(self, query, limit=20):
+        """Find the best matches for a query
+
+        Args:
+            query: Text to look for (case-insensitive)
+            limit: Maximum number of IDs to return
+
+        Returns:
+            List of user IDs: exact ID match first, then names starting with
+            the query, then other matches, each group ordered by name
+        """
+        matches = self.matching_ids(query)
+        query = query.strip().lower()
+        names = self._names
+
+        def rank(user_id):
+            if user_id.lower() == query:
+                return 0, names[user_id]
+            if names[user_id].startswith(query):
+                return 1, names[user_id]
+            return 2, names[user_id]
+
+        return heapq.nsmallest(limit, matches, key=rank)
@@ -0,0 +1,344 @@
+# firebase_services/user_table.py
+
+import re
+import time
+
+from .lru_cache import LRUCache
+
+
+class UserTable:
+    """Columnar in-memory copy of the loaded users joined with their FCM health data
+
+    Every field is one flat list with one entry per user, so a
+    compiled filter evaluates each comparison as a single pass over one column.
+    Missing values are normalized (0 for numbers, '' for text, False for flags)
+    so comparisons never see None.
+    """
+
+    # Column name -> kind ('num', 'str' or 'bool')
+    COLUMNS = {
+        'id': 'str',
+        'name': 'str',
+        'role': 'str',
+        'invite_code': 'str',
+        'created_at': 'str',
+        'age_days': 'num',
+        'engagement_score': 'num',
+        'successful_notification_count': 'num',
+        'token_failure_count': 'num',
+        'relationships': 'num',
+        'is_likely_test': 'bool',
+        'fcm_events': 'num',
+        'strikes': 'num',
+        'removals': 'num',
+    }
+
+    def __init__(self, users, fcm_token_data=None, now=None):
+        self.now = now if now is not None else time.time()
+        self.users = []
+        self.columns = {name: [] for name in self.COLUMNS}
+        self._index = {}  # user_id -> row
+        self.version = 0  # Bumped on every upsert and remove, for caches built from users
+
+        fcm_token_data = fcm_token_data or {}
+        for user in users:
+            self.upsert(user, fcm_token_data.get(user['id'], {}))
+
+    def _row_values(self, user, fcm_data):
+        """Get one user's values in COLUMNS order"""
+        created = user.get('created_timestamp')
+
+        if user.get('role') == 'responder':
+            relationships = len(user.get('linked_observers', {}))
+        else:
+            relationships = len(user.get('observing', {}))
+
+        return (
+            user['id'],
+            user.get('name', ''),
+            user.get('role', 'unknown'),
+            user.get('invite_code', ''),
+            user.get('created_at', ''),
+            (self.now - created) / 86400 if created is not None else -1,
+            user.get('engagement_score', 0) or 0,
+            user.get('successful_notification_count', 0) or 0,
+            user.get('token_failure_count', 0) or 0,
+            relationships,
+            bool(user.get('is_likely_test', False)),
+            fcm_data.get('recent_events_count', 0),
+            fcm_data.get('total_strikes', 0),
+            fcm_data.get('total_removals', 0),
+        )
+
+    def upsert(self, user, fcm_data=None):
+        """Add a user, or overwrite its row if it is already in the table"""
+        values = self._row_values(user, fcm_data or {})
+        row = self._index.get(user['id'])
+        self.version += 1
+
+        if row is None:
+            self._index[user['id']] = len(self.users)
+            self.users.append(user)
+            for column, value in zip(self.columns.values(), values):
+                column.append(value)
+        else:
+            self.users[row] = user
+            for column, value in zip(self.columns.values(), values):
+                column[row] = value
+
+    def remove(self, user_id):
+        """Remove a user, shifting later rows up so the remaining rows keep their order"""
+        row = self._index.pop(user_id, None)
+        if row is None:
+            return
+
+        self.version += 1
+        del self.users[row]
+        for column in self.columns.values():
+            del column[row]
+        for i in range(row, len(self.users)):
+            self._index[self.users[i]['id']] = i
+
+    def get(self, user_id):
+        """Get a user's record, or None if it is not in the table"""
+        row = self._index.get(user_id)
+        return self.users[row] if row is not None else None
+
+    def index_of(self, user_id):
+        """Get a user's row number, or None if it is not in the table"""
+        return self._index.get(user_id)
+
+    def __len__(self):
+        return len(self.users)
+
+    def filter(self, expression):
+        """Get the users matching a filter expression (see compile_filter)"""
+        mask = compile_filter(expression)(self)
+        return [user for user, keep in zip(self.users, mask) if keep]
+
+
+# === FILTER EXPRESSION LANGUAGE ===
+#
+#   expression := or_expr
+#   or_expr    := and_expr ('or' and_expr)*
+#   and_expr   := not_expr ('and' not_expr)*
+#   not_expr   := 'not' not_expr | '(' expression ')' | comparison
+#   comparison := operand [('==' | '!=' | '<' | '<=' | '>' | '>=' | 'contains') operand]
+#   operand    := column name | number (may be negative) | "string" | 'string' | true | false
+#
+# A bare column is true where its value is truthy. 'contains' is a
+# case-insensitive substring test. Example:
+#   role == "responder" and engagement_score < 50 and strikes >= 2
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op>==|!=|<=|>=|<|>|\(|\))
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'contains', 'true', 'false'}
+
+# Each comparator takes two columns/values and returns the mask as one comprehension
+_COLUMN_LITERAL = {
+    '==': lambda col, lit: [v == lit for v in col],
+    '!=': lambda col, lit: [v != lit for v in col],
+    '<': lambda col, lit: [v < lit for v in col],
+    '<=': lambda col, lit: [v <= lit for v in col],
+    '>': lambda col, lit: [v > lit for v in col],
+    '>=': lambda col, lit: [v >= lit for v in col],
+    'contains': lambda col, lit: [lit in v.lower() for v in col],
+}
+
+_LITERAL_COLUMN = {
+    '==': _COLUMN_LITERAL['=='],
+    '!=': _COLUMN_LITERAL['!='],
+    '<': _COLUMN_LITERAL['>'],
+    '<=': _COLUMN_LITERAL['>='],
+    '>': _COLUMN_LITERAL['<'],
+    '>=': _COLUMN_LITERAL['<='],
+}
+
+_COLUMN_COLUMN = {
+    '==': lambda a, b: [x == y for x, y in zip(a, b)],
+    '!=': lambda a, b: [x != y for x, y in zip(a, b)],
+    '<': lambda a, b: [x < y for x, y in zip(a, b)],
+    '<=': lambda a, b: [x <= y for x, y in zip(a, b)],
+    '>': lambda a, b: [x > y for x, y in zip(a, b)],
+    '>=': lambda a, b: [x >= y for x, y in zip(a, b)],
+}
+
+_compiled_filters = LRUCache(maxsize=128)  # Bounded, since every edit of the filter box is a new expression
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unexpected character at position {position}: '{expression[position:position + 10]}'")
+        position = match.end()
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'number':
+            tokens.append(('literal', float(text) if '.' in text else int(text)))
+        elif kind == 'string':
+            tokens.append(('literal', text[1:-1]))
+        elif kind == 'word' and text.lower() in _KEYWORDS:
+            word = text.lower()
+            if word in ('true', 'false'):
+                tokens.append(('literal', word == 'true'))
+            else:
+                tokens.append((word, word))
+        elif kind == 'word':
+            tokens.append(('column', text))
+        else:
+            tokens.append((text, text))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing mask functions of a UserTable"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self, kind=None):
+        if self.position >= len(self.tokens):
+            raise ValueError("Unexpected end of filter expression")
+        token = self.tokens[self.position]
+        if kind is not None and token[0] != kind:
+            raise ValueError(f"Expected '{kind}' but found '{token[1]}'")
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.position][1]}' in filter expression")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == 'or':
+            self.take()
+            left, right = node, self.parse_and()
+            node = lambda table, left=left, right=right: [a or b for a, b in zip(left(table), right(table))]
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == 'and':
+            self.take()
+            left, right = node, self.parse_not()
+            node = lambda table, left=left, right=right: [a and b for a, b in zip(left(table), right(table))]
+        return node
+
+    def parse_not(self):
+        if self.peek() == 'not':
+            self.take()
+            inner = self.parse_not()
+            return lambda table: [not value for value in inner(table)]
+        if self.peek() == '(':
+            self.take()
+            node = self.parse_or()
+            self.take(')')
+            return node
+        return self.parse_comparison()
+
+    def parse_operand(self):
+        kind, value = self.take()
+        if kind == 'column':
+            if value not in UserTable.COLUMNS:
+                raise ValueError(f"Unknown column '{value}'. Available: {', '.join(UserTable.COLUMNS)}")
+            return 'column', value
+        if kind == 'literal':
+            return 'literal', value
+        raise ValueError(f"Expected a column or value but found '{value}'")
+
+    def parse_comparison(self):
+        left = self.parse_operand()
+
+        if self.peek() not in _COLUMN_LITERAL:
+            if left[0] == 'column':
+                name = left[1]
+                return lambda table: [bool(value) for value in table.columns[name]]
+            constant = bool(left[1])
+            return lambda table: [constant] * len(table)
+
+        op = self.take()[0]
+        right = self.parse_operand()
+        return self.build_comparison(left, op, right)
+
+    def build_comparison(self, left, op, right):
+        kinds = (left[0], right[0])
+
+        if op == 'contains':
+            if kinds != ('column', 'literal') or UserTable.COLUMNS[left[1]] != 'str':
+                raise ValueError("'contains' needs a text column on the left and a string on the right")
+            name, needle = left[1], str(right[1]).lower()
+            return lambda table: _COLUMN_LITERAL['contains'](table.columns[name], needle)
+
+        if op not in ('==', '!='):
+            # Ordering text against numbers would raise TypeError on every row
+            left_kind, right_kind = _operand_kind(left), _operand_kind(right)
+            if (left_kind == 'str') != (right_kind == 'str'):
+                names = [_describe_operand(operand) for operand in (left, right)]
+                raise ValueError(f"Cannot compare {names[0]} with {names[1]} using '{op}'")
+
+        if kinds == ('column', 'literal'):
+            name, literal, comparator = left[1], right[1], _COLUMN_LITERAL[op]
+            return lambda table: comparator(table.columns[name], literal)
+        if kinds == ('literal', 'column'):
+            name, literal, comparator = right[1], left[1], _LITERAL_COLUMN[op]
+            return lambda table: comparator(table.columns[name], literal)
+        if kinds == ('column', 'column'):
+            left_name, right_name, comparator = left[1], right[1], _COLUMN_COLUMN[op]
+            return lambda table: comparator(table.columns[left_name], table.columns[right_name])
+
+        constant = _COLUMN_LITERAL[op]([left[1]], right[1])[0]
+        return lambda table: [constant] * len(table)
+
+
+def _operand_kind(operand):
+    """Get 'num', 'str' or 'bool' for a parsed column or literal"""
+    kind, value = operand
+    if kind == 'column':
+        return UserTable.COLUMNS[value]
+    if isinstance(value, bool):
+        return 'bool'
+    return 'str' if isinstance(value, str) else 'num'
+
+
+def _describe_operand(operand):
+    kind, value = operand
+    if kind == 'column':
+        return f"{'text' if UserTable.COLUMNS[value] == 'str' else 'numeric'} column '{value}'"
+    return f"text '{value}'" if isinstance(value, str) else f"value {value}"
+
+
+def compile_filter(expression):
+    """Compile a filter expression into a function mapping a UserTable to a boolean mask
+
+    An empty expression matches every user. Recently used expressions are cached.
+
+    Raises:
+        ValueError: If the expression is invalid, including comparisons that
+            order text against numbers
+    """
+    expression = (expression or '').strip()
+    compiled = _compiled_filters.get(expression)
+    if compiled is None:
+        if not expression:
+            compiled = lambda table: [True] * len(table)
+        else:
+            compiled = _Parser(_tokenize(expression)).parse()
+        _compiled_filters.put(expression, compiled)
+    return compiled
@@ -0,0 +1,79 @@
+# check_in_fetcher.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from firebase_services.lru_cache import LRUCache
+
+
+class CheckInFetcher(QObject):
+    """Fetches pages of responder check-ins on background threads
+
+    Each responder's first (newest) page is kept in an LRU cache keyed by
+    responder ID; later pages are fetched on demand and not cached. Each
+    finished fetch is announced with page_loaded, which Qt queues to the thread
+    owning the connected widgets, so slots can update the UI safely.
+    """
+
+    # (responder_id, cursor, newer, page) where page is the get_check_ins_page tuple
+    page_loaded = pyqtSignal(str, object, bool, object)
+
+    def __init__(self, firebase_manager, page_size=25, cache_size=64, max_workers=3):
+        super().__init__()
+        self.firebase_manager = firebase_manager
+        self.page_size = page_size
+        self.cache = LRUCache(cache_size)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = set()  # Responder IDs whose first page is being fetched
+        self._generation = 0  # Bumped by clear() so fetches started earlier are not cached
+        self._lock = threading.Lock()
+
+    def get(self, responder_id):
+        """Get a responder's cached first page, or None if it has not been fetched"""
+        return self.cache.get(responder_id)
+
+    def request(self, responder_id):
+        """Start fetching a responder's first page unless cached or already being fetched"""
+        if responder_id in self.cache:
+            return
+
+        with self._lock:
+            if responder_id in self._pending:
+                return
+            self._pending.add(responder_id)
+            generation = self._generation
+
+        self._executor.submit(self._fetch, responder_id, None, False, generation)
+
+    def request_page(self, responder_id, cursor, newer=False):
+        """Start fetching the page older (or newer) than a cursor"""
+        self._executor.submit(self._fetch, responder_id, cursor, newer, None)
+
+    def _fetch(self, responder_id, cursor, newer, generation):
+        try:
+            page = self.firebase_manager.get_check_ins_page(responder_id, self.page_size, cursor, newer)
+        finally:
+            if cursor is None:
+                with self._lock:
+                    self._pending.discard(responder_id)
+
+        if cursor is None:
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self.cache.put(responder_id, page)
+
+        self.page_loaded.emit(responder_id, cursor, newer, page)
+
+    def invalidate(self, responder_id):
+        """Forget a responder's cached first page"""
+        self.cache.pop(responder_id)
+
+    def clear(self):
+        """Forget all cached pages, including first pages still being fetched"""
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+        self.cache.clear()
@@ -0,0 +1,143 @@
+# check_in_history_model.py
+
+from collections import deque
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class CheckInHistoryModel(QAbstractListModel):
+    """Scrollable window over one responder's check-in history, newest first
+
+    Pages are requested from a CheckInFetcher as the view scrolls: fetchMore
+    loads older check-ins at the bottom, fetch_newer loads newer ones at the
+    top. At most max_pages pages are kept; when another page arrives, the page
+    at the opposite end is dropped and can be fetched again by scrolling back,
+    so a long history is never held in memory all at once.
+    """
+
+    def __init__(self, fetcher, max_pages=8, parent=None):
+        super().__init__(parent)
+        self.fetcher = fetcher
+        self.fetcher.page_loaded.connect(self.on_page_loaded)
+        self.max_pages = max_pages
+
+        self.responder_id = None
+        self.rows = []
+        self.offset = 0  # Position in the full history of the first row
+        self._pages = deque()  # (row_count, first_cursor, last_cursor) per loaded page
+        self._has_older = False
+        self._has_newer = False
+        self._loading = None  # (cursor, newer) of the page being fetched
+
+    # === QAbstractListModel interface ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        check_in = self.rows[index.row()]
+        text = f"{self.offset + index.row() + 1}. {check_in.get('timestamp', 'Unknown time')} - Result: {check_in.get('result', 'Unknown')}"
+        if 'prompt' in check_in:
+            text += f"\n   Question: {check_in['prompt']}"
+        return text
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_older and self._loading is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request(self._pages[-1][2], newer=False)
+
+    # === History loading ===
+
+    @property
+    def loading(self):
+        """Whether a page is being fetched"""
+        return self._loading is not None
+
+    def set_responder(self, responder_id):
+        """Show a responder's history from the newest check-in (None to clear)"""
+        self.beginResetModel()
+        self.responder_id = responder_id
+        self.rows = []
+        self.offset = 0
+        self._pages.clear()
+        self._has_older = False
+        self._has_newer = False
+        self._loading = None
+        self.endResetModel()
+
+        if responder_id is None:
+            return
+
+        page = self.fetcher.get(responder_id)
+        if page is not None:
+            self._add_page(page, newer=False)
+        else:
+            self._loading = (None, False)
+            self.fetcher.request(responder_id)
+
+    def fetch_newer(self):
+        """Load the page above the first row if it was dropped earlier"""
+        if self._has_newer and self._loading is None:
+            self._request(self._pages[0][1], newer=True)
+
+    def _request(self, cursor, newer):
+        self._loading = (cursor, newer)
+        self.fetcher.request_page(self.responder_id, cursor, newer)
+
+    def on_page_loaded(self, responder_id, cursor, newer, page):
+        """Add a fetched page if it is the one this model is waiting for"""
+        if responder_id != self.responder_id or self._loading is None:
+            return
+        loading_cursor, loading_newer = self._loading
+        if cursor is not loading_cursor or newer != loading_newer:
+            return
+
+        self._loading = None
+        self._add_page(page, newer)
+
+    def _add_page(self, page, newer):
+        check_ins, first_cursor, last_cursor, has_more = page
+
+        if newer:
+            self._has_newer = has_more
+        else:
+            self._has_older = has_more
+        if not check_ins:
+            return
+
+        count = len(check_ins)
+        if newer:
+            self.beginInsertRows(QModelIndex(), 0, count - 1)
+            self.rows[:0] = check_ins
+            self.offset -= count
+            self._pages.appendleft((count, first_cursor, last_cursor))
+            self.endInsertRows()
+        else:
+            start = len(self.rows)
+            self.beginInsertRows(QModelIndex(), start, start + count - 1)
+            self.rows.extend(check_ins)
+            self._pages.append((count, first_cursor, last_cursor))
+            self.endInsertRows()
+
+        if len(self._pages) > self.max_pages:
+            self._drop_page(at_top=not newer)
+
+    def _drop_page(self, at_top):
+        if at_top:
+            count = self._pages.popleft()[0]
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+            del self.rows[:count]
+            self.offset += count
+            self._has_newer = True
+        else:
+            count = self._pages.pop()[0]
+            start = len(self.rows) - count
+            self.beginRemoveRows(QModelIndex(), start, len(self.rows) - 1)
+            del self.rows[start:]
+            self._has_older = True
+        self.endRemoveRows()
@@ -0,0 +1,143 @@
+# checkable_table_model.py
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class TableColumn:
+    """Describes one data column of a CheckableTableModel
+
+    Args:
+        header: Header text
+        key: Name of the model column holding the values
+        format: Converts a value to its display text
+        background: Optional function mapping a value to a QBrush (or None)
+        alignment: Optional Qt alignment flags
+    """
+
+    def __init__(self, header, key, format=str, background=None, alignment=None):
+        self.header = header
+        self.key = key
+        self.format = format
+        self.background = background
+        self.alignment = alignment
+
+
+class CheckableTableModel(QAbstractTableModel):
+    """Table model with a "Select" checkbox column followed by data columns
+
+    Values are kept in one list per key, and the checked rows in a set, so
+    checking everything, clearing, or reading back the checked rows never goes
+    through per-cell widget items or display text.
+    """
+
+    def __init__(self, columns, id_key='id', parent=None):
+        super().__init__(parent)
+        self.table_columns = columns
+        self.id_key = id_key
+        self.values = {column.key: [] for column in columns}
+        self.values.setdefault(id_key, [])
+        self._row_count = 0
+        self._row_by_id = {}
+        self._checked = set()
+
+    # === QAbstractTableModel interface ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table_columns) + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if index.column() == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if row in self._checked else Qt.Unchecked
+            return None
+
+        column = self.table_columns[index.column() - 1]
+        value = self.values[column.key][row]
+
+        if role == Qt.DisplayRole:
+            return column.format(value)
+        if role == Qt.BackgroundRole and column.background is not None:
+            return column.background(value)
+        if role == Qt.TextAlignmentRole and column.alignment is not None:
+            return column.alignment
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != 0 or role != Qt.CheckStateRole:
+            return False
+
+        if value == Qt.Checked:
+            self._checked.add(index.row())
+        else:
+            self._checked.discard(index.row())
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == 0:
+            return Qt.ItemIsUserCheckable | Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal or role != Qt.DisplayRole:
+            return None
+        return "Select" if section == 0 else self.table_columns[section - 1].header
+
+    # === Data access ===
+
+    def set_rows(self, values):
+        """Replace all rows, clearing the checked rows
+
+        Args:
+            values: Dictionary mapping each column key, plus any extra keys
+                that are kept but not shown (such as the ID), to its list of values
+        """
+        self.beginResetModel()
+        self.values = {key: list(column_values) for key, column_values in values.items()}
+        self._row_count = len(self.values[self.id_key])
+        self._row_by_id = {row_id: row for row, row_id in enumerate(self.values[self.id_key])}
+        self._checked = set()
+        self.endResetModel()
+
+    def value(self, row, key):
+        """Get one value"""
+        return self.values[key][row]
+
+    def row_of(self, row_id):
+        """Get the row of an ID, or None"""
+        return self._row_by_id.get(row_id)
+
+    def set_value(self, row, key, value):
+        """Change one value and refresh its cell"""
+        self.values[key][row] = value
+        for column, table_column in enumerate(self.table_columns, 1):
+            if table_column.key == key:
+                index = self.index(row, column)
+                self.dataChanged.emit(index, index)
+
+    def _check_column_changed(self):
+        if self._row_count:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._row_count - 1, 0), [Qt.CheckStateRole])
+
+    def set_all_checked(self, checked):
+        """Check or uncheck every row"""
+        self._checked = set(range(self._row_count)) if checked else set()
+        self._check_column_changed()
+
+    def set_checked_rows(self, rows):
+        """Check exactly the given rows"""
+        self._checked = set(rows)
+        self._check_column_changed()
+
+    def checked_rows(self):
+        """Get the checked rows in table order"""
+        return sorted(self._checked)
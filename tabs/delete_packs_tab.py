@@ -9,10 +9,17 @@
 import os
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QGroupBox, QTextEdit, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTableView, QHeaderView,
                              QCheckBox, QAbstractItemView)
 from PyQt5.QtCore import Qt
 
+from tabs.checkable_table_model import CheckableTableModel, TableColumn
+
+PACK_COLUMNS = [
+    TableColumn("Pack Name", 'name'),
+    TableColumn("Questions", 'question_count', alignment=Qt.AlignCenter),
+]
+
 
 class DeletePacksTab(QWidget):
     """Tab for deleting question packs"""
@@ -20,7 +27,7 @@ class DeletePacksTab(QWidget):
     def __init__(self, firebase_manager):
         super().__init__()
         self.firebase_manager = firebase_manager
-        self.packs_data = []  # Will store (id, name, question_count)
+        self.packs_model = CheckableTableModel(PACK_COLUMNS)  # Rows also keep each pack's 'id'
         self.init_ui()
 
     def init_ui(self):
@@ -30,9 +37,8 @@ class DeletePacksTab(QWidget):
         table_group = QGroupBox("Available Question Packs")
         table_layout = QVBoxLayout()
 
-        self.packs_table = QTableWidget()
-        self.packs_table.setColumnCount(3)  # Checkbox, Name, Question Count
-        self.packs_table.setHorizontalHeaderLabels(["Select", "Pack Name", "Questions"])
+        self.packs_table = QTableView()
+        self.packs_table.setModel(self.packs_model)  # Checkbox, Name, Question Count
         self.packs_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         self.packs_table.setSelectionBehavior(QAbstractItemView.SelectRows)
 
@@ -85,33 +91,12 @@ class DeletePacksTab(QWidget):
 
         if not packs:
             self.status_text.append("No question packs found or failed to load packs")
-            self.packs_table.setRowCount(0)
-            self.packs_data = []
+            self.packs_model.set_rows({'id': [], 'name': [], 'question_count': []})
             return
 
-        # Store the packs data
-        self.packs_data = packs
-
-        # Populate the table
-        self.packs_table.setRowCount(len(packs))
-        for row, (pack_id, pack_name, question_count) in enumerate(packs):
-            # Checkbox cell
-            checkbox = QTableWidgetItem()
-            checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            checkbox.setCheckState(Qt.Unchecked)
-            self.packs_table.setItem(row, 0, checkbox)
-
-            # Pack name cell
-            name_item = QTableWidgetItem(pack_name)
-            name_item.setData(Qt.UserRole, pack_id)  # Store ID as user data
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)  # Make non-editable
-            self.packs_table.setItem(row, 1, name_item)
-
-            # Question count cell
-            count_item = QTableWidgetItem(str(question_count))
-            count_item.setTextAlignment(Qt.AlignCenter)
-            count_item.setFlags(count_item.flags() & ~Qt.ItemIsEditable)  # Make non-editable
-            self.packs_table.setItem(row, 2, count_item)
+        # Populate the table, one list per column
+        pack_ids, pack_names, question_counts = zip(*packs)
+        self.packs_model.set_rows({'id': pack_ids, 'name': pack_names, 'question_count': question_counts})
 
         # Adjust column widths
         self.packs_table.setColumnWidth(0, 50)  # Checkbox column
@@ -121,31 +106,19 @@ class DeletePacksTab(QWidget):
 
     def select_all_packs(self):
         """Select all packs in the table"""
-        for row in range(self.packs_table.rowCount()):
-            item = self.packs_table.item(row, 0)
-            if item:
-                item.setCheckState(Qt.Checked)
+        self.packs_model.set_all_checked(True)
         self.status_text.append("Selected all packs")
 
     def deselect_all_packs(self):
         """Deselect all packs in the table"""
-        for row in range(self.packs_table.rowCount()):
-            item = self.packs_table.item(row, 0)
-            if item:
-                item.setCheckState(Qt.Unchecked)
+        self.packs_model.set_all_checked(False)
         self.status_text.append("Deselected all packs")
 
     def get_selected_packs(self):
         """Get the selected pack IDs and names"""
-        selected = []
-        for row in range(self.packs_table.rowCount()):
-            checkbox = self.packs_table.item(row, 0)
-            if checkbox and checkbox.checkState() == Qt.Checked:
-                name_item = self.packs_table.item(row, 1)
-                pack_id = name_item.data(Qt.UserRole)
-                pack_name = name_item.text()
-                selected.append((pack_id, pack_name))
-        return selected
+        pack_ids = self.packs_model.values['id']
+        pack_names = self.packs_model.values['name']
+        return [(pack_ids[row], pack_names[row]) for row in self.packs_model.checked_rows()]
 
     def delete_selected_packs(self):
         """Delete the selected question packs"""
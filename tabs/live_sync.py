@@ -0,0 +1,40 @@
+# live_sync.py
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class LiveUserSync(QObject):
+    """Delivers UserManager live sync changes to the Qt main thread
+
+    Firestore calls snapshot listeners on a background thread. Emitting a
+    signal from there queues the call to the connected slots on the thread
+    that owns the receiving widgets, so slots can update the UI safely.
+    """
+
+    # (changed_users, removed_user_ids)
+    users_changed = pyqtSignal(list, list)
+
+    def __init__(self, user_manager):
+        super().__init__()
+        self.user_manager = user_manager
+        self.active = False
+        # One bound method object, so stop() removes exactly the listener start() added
+        self._listener = self._on_changes
+
+    def start(self):
+        """Start receiving changes
+
+        Returns:
+            Tuple (success, message)
+        """
+        success, message = self.user_manager.start_live_sync(self._listener)
+        self.active = success
+        return success, message
+
+    def stop(self):
+        """Stop receiving changes"""
+        self.user_manager.stop_live_sync(self._listener)
+        self.active = False
+
+    def _on_changes(self, changed_users, removed_ids):
+        self.users_changed.emit(changed_users, removed_ids)
@@ -1,14 +1,52 @@
 import os
+import time
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QGroupBox, QTextEdit, QMessageBox,
                              QTableWidget, QTableWidgetItem, QHeaderView,
                              QAbstractItemView, QApplication, QTreeWidget,
                              QTreeWidgetItem, QSplitter, QFrame, QTabWidget,
                              QTableView, QDialog, QDialogButtonBox, QCheckBox,
-                             QComboBox)
-from PyQt5.QtCore import Qt, QSize, pyqtSignal
+                             QComboBox, QLineEdit)
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal, QItemSelection, QItemSelectionModel
 from PyQt5.QtGui import QFont, QColor, QBrush
 
+from firebase_services.lru_cache import LRUCache
+from firebase_services.overdue_monitor import OverdueMonitor
+from firebase_services.user_search import UserSearchIndex
+from firebase_services.user_table import UserTable, compile_filter
+from tabs.live_sync import LiveUserSync
+from tabs.user_table_model import UserTableModel, UserFilterProxyModel
+
+# Filter expressions behind the preset filters in the filter combo box
+PRESET_FILTERS = {
+    "All Users": "",
+    "Healthy Users (Score > 90)": "engagement_score > 90",
+    "Declining Users (Score 50-90)": "engagement_score >= 50 and engagement_score <= 90",
+    "Churned Users (Score < 50)": "engagement_score < 50",
+    "Users with Token Issues": "strikes > 0 or removals > 0 or fcm_events > 5",
+    "Users with Multiple Strikes": "strikes >= 2",
+    "Users with Recent Removals": "removals > 0",
+    "Likely Test Accounts": "is_likely_test",
+    "Real Users Only": "not is_likely_test",
+}
+
+# FCM events table colors by event type
+EVENT_TYPE_BRUSHES = {
+    'removal': QBrush(QColor(255, 180, 180)),
+    'strike': QBrush(QColor(255, 220, 150)),
+    'error': QBrush(QColor(255, 255, 180)),
+}
+
+# Paged browsing sort options -> (UserManager.get_users_page sort key, descending)
+PAGE_SORT_OPTIONS = {
+    "Name (A-Z)": ('name', False),
+    "Name (Z-A)": ('name', True),
+    "Newest First": ('created_at', True),
+    "Oldest First": ('created_at', False),
+    "Lowest Engagement": ('engagement_score', False),
+    "Highest Engagement": ('engagement_score', True),
+}
+
 
 class ManageUsersTab(QWidget):
     """Enhanced tab for managing responders and observers with comprehensive FCM token health metrics"""
@@ -16,15 +54,48 @@ class ManageUsersTab(QWidget):
     # Signal for when data changes
     data_changed = pyqtSignal()
 
+    # Users fetched per page in paged browsing mode
+    PAGE_SIZE = 50
+
+    # Seconds between server-side overdue checks when live updates are off
+    OVERDUE_RECONCILE_SECONDS = 300
+    OVERDUE_QUERY_LIMIT = 500
+
     def __init__(self, firebase_manager):
         super().__init__()
         self.firebase_manager = firebase_manager
         self.users_data = []  # Will store user information
         self.fcm_token_data = {}  # Will store FCM token health data per user
+        self.engagement_aggregate = None  # Running engagement totals for the summary
+        self.user_table = UserTable([])  # Columnar copy of users_data joined with fcm_token_data
+        self.overdue_monitor = OverdueMonitor()  # Responders past their next check-in time
+        self.overdue_reconciled_at = 0.0  # When the overdue set was last checked against the server
+        self.search_index = UserSearchIndex()  # Search box lookups over the loaded users
+
+        # Detail tabs are rendered only when visible; rendered content is memoized per user
+        self.detail_cache = LRUCache(maxsize=256)  # (user_id, detail tab index) -> content
+        self._detail_user = None  # User shown in the detail tabs
+        self._dirty_detail_tabs = set()  # Detail tab indexes not yet rendered for _detail_user
+        self._token_issues = {}  # user_id -> token issue report from the last FCM data load
+
+        # Paged browsing state: cursor for the next page, or None once every page is loaded
+        self.page_cursor = None
+        self.has_more_pages = False
+        self._loading_page = False
+
+        # Optional live mode: row-level updates from a Firestore snapshot listener
+        self.live_sync = LiveUserSync(self.firebase_manager.users)
+        self.live_sync.users_changed.connect(self.apply_live_changes)
+
         self.show_engagement_metrics = True  # Toggle for showing engagement columns
         self.show_fcm_details = True  # Toggle for showing FCM token details
         self.init_ui()
 
+        # Re-check overdue responders periodically (only due heap entries are examined)
+        self.overdue_timer = QTimer()
+        self.overdue_timer.timeout.connect(self.check_overdue_responders)
+        self.overdue_timer.start(30000)
+
     def init_ui(self):
         layout = QVBoxLayout()
 
@@ -36,18 +107,15 @@ class ManageUsersTab(QWidget):
 
         # Filter controls
         self.filter_combo = QComboBox()
-        self.filter_combo.addItems([
-            "All Users",
-            "Healthy Users (Score > 90)",
-            "Declining Users (Score 50-90)", 
-            "Churned Users (Score < 50)",
-            "Users with Token Issues",
-            "Users with Multiple Strikes",
-            "Users with Recent Removals",
-            "Likely Test Accounts",
-            "Real Users Only"
-        ])
-        self.filter_combo.currentTextChanged.connect(self.apply_filter)
+        self.filter_combo.addItems(list(PRESET_FILTERS))
+        self.filter_combo.currentTextChanged.connect(self.apply_preset_filter)
+
+        # Ad-hoc filter expression, e.g. role == "responder" and strikes >= 2
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText('e.g. role == "responder" and engagement_score < 50 and strikes >= 2')
+        self.filter_input.setToolTip("Columns: " + ", ".join(UserTable.COLUMNS) +
+                                     "\nOperators: == != < <= > >= contains, and, or, not, ( )")
+        self.filter_input.returnPressed.connect(self.apply_filter)
 
         # Toggle display options
         self.toggle_metrics_btn = QPushButton("Hide Engagement Data")
@@ -56,11 +124,17 @@ class ManageUsersTab(QWidget):
         self.toggle_fcm_btn = QPushButton("Hide FCM Details")
         self.toggle_fcm_btn.clicked.connect(self.toggle_fcm_display)
 
+        self.live_updates_checkbox = QCheckBox("Live Updates")
+        self.live_updates_checkbox.setToolTip("Apply user changes as they happen instead of re-loading all users")
+        self.live_updates_checkbox.toggled.connect(self.toggle_live_updates)
+
         control_layout.addWidget(self.refresh_btn)
         control_layout.addWidget(QLabel("Filter:"))
         control_layout.addWidget(self.filter_combo)
+        control_layout.addWidget(self.filter_input, 1)
         control_layout.addWidget(self.toggle_metrics_btn)
         control_layout.addWidget(self.toggle_fcm_btn)
+        control_layout.addWidget(self.live_updates_checkbox)
         control_layout.addStretch()
         layout.addLayout(control_layout)
 
@@ -75,6 +149,10 @@ class ManageUsersTab(QWidget):
         # FCM health summary line
         self.fcm_summary_label = QLabel("Loading FCM token health data...")
         summary_layout.addWidget(self.fcm_summary_label)
+
+        # Overdue responders line
+        self.overdue_label = QLabel("Overdue responders: loading...")
+        summary_layout.addWidget(self.overdue_label)
         
         self.summary_group.setLayout(summary_layout)
         layout.addWidget(self.summary_group)
@@ -86,7 +164,13 @@ class ManageUsersTab(QWidget):
         table_widget = QWidget()
         table_layout = QVBoxLayout(table_widget)
 
-        self.users_table = QTableWidget()
+        # Model over user_table; the proxy sorts and filters without rebuilding any rows
+        self.user_model = UserTableModel(self)
+        self.user_proxy = UserFilterProxyModel(self)
+        self.user_proxy.setSourceModel(self.user_model)
+
+        self.users_table = QTableView()
+        self.users_table.setModel(self.user_proxy)
         self.setup_table_headers()
 
         # Make the table sortable
@@ -94,10 +178,49 @@ class ManageUsersTab(QWidget):
 
         self.users_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.users_table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.users_table.itemSelectionChanged.connect(self.on_user_selected)
-
-        table_layout.addWidget(QLabel("Users:"))
+        self.users_table.selectionModel().selectionChanged.connect(self.on_user_selected)
+
+        # Paged browsing: fetch users a page at a time in a server-side order
+        self.paged_checkbox = QCheckBox("Paged Browsing")
+        self.paged_checkbox.setToolTip(f"Load users {self.PAGE_SIZE} at a time as you scroll instead of all at once")
+        self.paged_checkbox.toggled.connect(self.toggle_paged_browsing)
+
+        self.page_sort_combo = QComboBox()
+        self.page_sort_combo.addItems(list(PAGE_SORT_OPTIONS))
+        self.page_sort_combo.setEnabled(False)
+        self.page_sort_combo.currentTextChanged.connect(self.start_paged_browsing)
+
+        self.page_label = QLabel("")
+
+        self.load_more_btn = QPushButton("Load More")
+        self.load_more_btn.setEnabled(False)
+        self.load_more_btn.clicked.connect(self.load_next_page)
+
+        self.users_table.verticalScrollBar().valueChanged.connect(self.on_users_scrolled)
+
+        page_layout = QHBoxLayout()
+        page_layout.addWidget(self.paged_checkbox)
+        page_layout.addWidget(QLabel("Sort by:"))
+        page_layout.addWidget(self.page_sort_combo)
+        page_layout.addStretch()
+        page_layout.addWidget(self.page_label)
+        page_layout.addWidget(self.load_more_btn)
+
+        # Instant search over the loaded users
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search by name, user ID, invite code or linked user name...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.apply_search)
+
+        users_header_layout = QHBoxLayout()
+        users_header_layout.addWidget(QLabel("Users:"))
+        users_header_layout.addStretch()
+        users_header_layout.addWidget(QLabel("Search:"))
+        users_header_layout.addWidget(self.search_input, 1)
+
+        table_layout.addLayout(users_header_layout)
         table_layout.addWidget(self.users_table)
+        table_layout.addLayout(page_layout)
 
         splitter.addWidget(table_widget)
 
@@ -156,6 +279,7 @@ class ManageUsersTab(QWidget):
         fcm_events_layout.addWidget(self.fcm_events_table)
         
         self.details_tabs.addTab(fcm_events_widget, "📋 Recent FCM Events")
+        self.details_tabs.currentChanged.connect(self.render_current_detail_tab)
 
         details_layout.addWidget(self.details_tabs)
 
@@ -180,6 +304,12 @@ class ManageUsersTab(QWidget):
         self.export_fcm_report_btn = QPushButton("📤 Export FCM Report")
         self.export_fcm_report_btn.clicked.connect(self.export_fcm_health_report)
 
+        self.check_relationships_btn = QPushButton("Check Relationships")
+        self.check_relationships_btn.clicked.connect(self.check_relationship_integrity)
+
+        self.engagement_analytics_btn = QPushButton("📊 Engagement Analytics")
+        self.engagement_analytics_btn.clicked.connect(self.show_engagement_analytics)
+
         self.delete_user_btn = QPushButton("Delete Selected User")
         self.delete_user_btn.setStyleSheet("background-color: #ffcccc;")
         self.delete_user_btn.clicked.connect(self.delete_selected_user)
@@ -188,6 +318,8 @@ class ManageUsersTab(QWidget):
         actions_layout.addWidget(self.select_token_issues_btn)
         actions_layout.addWidget(self.select_test_accounts_btn)
         actions_layout.addWidget(self.export_fcm_report_btn)
+        actions_layout.addWidget(self.check_relationships_btn)
+        actions_layout.addWidget(self.engagement_analytics_btn)
         actions_layout.addStretch()
         actions_layout.addWidget(self.delete_user_btn)
         layout.addLayout(actions_layout)
@@ -205,46 +337,36 @@ class ManageUsersTab(QWidget):
         self.refresh_users()
 
     def setup_table_headers(self):
-        """Setup table headers based on current display mode"""
-        base_headers = ["User ID", "Name", "Role", "Created", "Relationships"]
-        
-        headers = base_headers.copy()
-        
-        if self.show_engagement_metrics:
-            headers.extend(["Engagement\nScore", "Token\nHealth", "Last\nActivity"])
-        
-        if self.show_fcm_details:
-            headers.extend(["FCM\nEvents", "Strikes", "Removals", "Token\nStatus"])
-
-        self.users_table.setColumnCount(len(headers))
-        self.users_table.setHorizontalHeaderLabels(headers)
-
-        # Make column headers bold and left-aligned
-        bold_font = QFont()
-        bold_font.setBold(True)
-
-        for col in range(self.users_table.columnCount()):
-            header_item = self.users_table.horizontalHeaderItem(col)
-            header_item.setFont(bold_font)
-            header_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        """Setup table columns based on current display mode (headers come from the model)"""
+        self.user_model.set_columns(self.show_engagement_metrics, self.show_fcm_details)
+        column_count = self.user_model.columnCount()
 
         # Set column widths
-        for col in range(min(5, len(headers))):  # First 5 columns
-            self.users_table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
-        
+        header = self.users_table.horizontalHeader()
+        for col in range(column_count):
+            header.setSectionResizeMode(col, QHeaderView.ResizeToContents if col < 5 else QHeaderView.Interactive)
+
         # Make the last column stretch
-        if len(headers) > 0:
-            self.users_table.horizontalHeader().setSectionResizeMode(len(headers) - 1, QHeaderView.Stretch)
+        if column_count > 0:
+            header.setSectionResizeMode(column_count - 1, QHeaderView.Stretch)
 
     def refresh_users(self):
         """Refresh the list of users with engagement metrics and FCM token health data"""
+        if self.paged_checkbox.isChecked():
+            self.start_paged_browsing()
+            return
+
         self.status_text.append("Loading users with engagement and FCM data...")
+        self.clear_user_details()
 
-        # Temporarily disable sorting to avoid issues while populating
-        self.users_table.setSortingEnabled(False)
+        # Get users from Firebase with engagement metrics
+        users = self.firebase_manager.get_users_with_engagement_metrics()
+        self.load_users(users)
 
-        # Clear the current selection
+    def clear_user_details(self):
+        """Clear the current selection, the details tabs and their memoized content"""
         self.users_table.clearSelection()
+        self.detail_cache.clear()
         self.delete_user_btn.setEnabled(False)
         self.user_info_text.clear()
         self.relations_tree.clear()
@@ -252,14 +374,19 @@ class ManageUsersTab(QWidget):
         self.fcm_health_text.clear()
         self.fcm_events_table.setRowCount(0)
 
-        # Get users from Firebase with engagement metrics
-        users = self.firebase_manager.get_users_with_engagement_metrics()
+    def load_users(self, users):
+        """Load a full set of users into the tab's data, summaries and table"""
+        # Temporarily disable sorting to avoid issues while populating
+        self.users_table.setSortingEnabled(False)
 
         if not users:
             self.status_text.append("No users found or failed to load users")
-            self.users_table.setRowCount(0)
             self.users_data = []
             self.fcm_token_data = {}
+            self.engagement_aggregate = None
+            self.user_table = UserTable([])
+            self.user_model.set_table(self.user_table)
+            self.search_index = UserSearchIndex()
             self.update_engagement_summary({})
             return
 
@@ -268,38 +395,52 @@ class ManageUsersTab(QWidget):
 
         # Load FCM token health data for all users
         self.load_fcm_token_data()
-
-        # Update summaries
-        summary = self.firebase_manager.get_engagement_summary()
-        self.update_engagement_summary(summary)
+        self.user_table = UserTable(users, self.fcm_token_data)
+        self.users_data = self.user_table.users  # Kept current by the table's upsert/remove
+        self.overdue_monitor.load(users)
+        self.search_index = UserSearchIndex(users)
+        self.apply_search()
+
+        # Update summaries from the users just loaded (no second scan)
+        self.engagement_aggregate = self.firebase_manager.analytics.build_engagement_aggregate(users)
+        self.update_engagement_summary(self.engagement_aggregate.to_summary())
         self.update_fcm_summary()
+        self.update_overdue_summary()
 
-        # Populate the table
-        self.populate_user_table(users)
+        # Show the new rows (the current filter is kept)
+        self.user_model.set_table(self.user_table)
 
         # Re-enable sorting after population
-        self.users_table.setSortingEnabled(True)
+        self.restore_sorting()
 
         self.status_text.append(f"Loaded {len(users)} users with engagement and FCM metrics")
 
-    def load_fcm_token_data(self):
-        """Load FCM token health data for all users"""
+    def load_fcm_token_data(self, users=None):
+        """Load FCM token health data for all users, or add it for a page of users
+
+        Args:
+            users: Users to add data for, keeping the data already loaded and
+                reusing the last token issue report (defaults to all of
+                users_data, reloading everything)
+        """
         try:
-            self.status_text.append("Loading FCM token health data...")
-            
-            # Get users with token issues from the last 30 days
-            users_with_issues = self.firebase_manager.fcm.get_users_with_token_issues(days=30)
-            
-            # Create a lookup dictionary for quick access
-            self.fcm_token_data = {}
-            
-            for user_issue in users_with_issues:
-                user_id = user_issue.get('userId', '')
-                if user_id:
-                    self.fcm_token_data[user_id] = user_issue
-            
-            # For each user, also get their detailed token health report
-            for user in self.users_data:
+            if users is None:
+                self.status_text.append("Loading FCM token health data...")
+                self.load_token_issues()
+
+                # Create a lookup dictionary for quick access
+                self.fcm_token_data = dict(self._token_issues)
+                users = self.users_data
+            else:
+                for user in users:
+                    if user['id'] in self._token_issues:
+                        self.fcm_token_data[user['id']] = self._token_issues[user['id']]
+
+            # Recent events for every user, in batched queries rather than one per user
+            recent_events_by_user = self.firebase_manager.fcm.get_token_events_for_users(
+                [user['id'] for user in users], days=7)
+
+            for user in users:
                 user_id = user['id']
                 if user_id not in self.fcm_token_data:
                     # Initialize with empty data for users without issues
@@ -312,14 +453,9 @@ class ManageUsersTab(QWidget):
                         'contexts': []
                     }
                 
-                # Get recent events count for all users
-                try:
-                    recent_events = self.firebase_manager.fcm.get_token_events_for_user(user_id, days=7)
-                    self.fcm_token_data[user_id]['recent_events_count'] = len(recent_events)
-                    self.fcm_token_data[user_id]['recent_events'] = recent_events
-                except Exception as e:
-                    self.fcm_token_data[user_id]['recent_events_count'] = 0
-                    self.fcm_token_data[user_id]['recent_events'] = []
+                recent_events = recent_events_by_user.get(user_id, [])
+                self.fcm_token_data[user_id]['recent_events_count'] = len(recent_events)
+                self.fcm_token_data[user_id]['recent_events'] = recent_events
             
             self.status_text.append("FCM token health data loaded successfully")
             
@@ -327,159 +463,128 @@ class ManageUsersTab(QWidget):
             self.status_text.append(f"Error loading FCM token data: {str(e)}")
             self.fcm_token_data = {}
 
-    def populate_user_table(self, users):
-        """Populate the user table with the given user data including FCM metrics"""
-        self.users_table.setRowCount(len(users))
+    def load_token_issues(self):
+        """Load the users with token issues from the last 30 days"""
+        users_with_issues = self.firebase_manager.fcm.get_users_with_token_issues(days=30)
+
+        self._token_issues = {}
+        for user_issue in users_with_issues:
+            user_id = user_issue.get('userId', '')
+            if user_id:
+                self._token_issues[user_id] = user_issue
+
+    def restore_sorting(self):
+        """Re-enable header sorting, except in paged mode where rows keep the server order"""
+        if self.paged_checkbox.isChecked():
+            self.users_table.setSortingEnabled(False)
+            self.user_proxy.sort(-1)
+        else:
+            self.users_table.setSortingEnabled(True)
 
-        for row, user_data in enumerate(users):
-            col = 0
-            
-            # User ID
-            id_item = QTableWidgetItem(user_data['id'])
-            id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
-            self.users_table.setItem(row, col, id_item)
-            col += 1
-
-            # Name with color coding for test accounts
-            name_item = QTableWidgetItem(user_data['name'])
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            if user_data.get('is_likely_test', False):
-                name_item.setBackground(QBrush(QColor(255, 255, 200)))  # Light yellow for test accounts
-            self.users_table.setItem(row, col, name_item)
-            col += 1
-
-            # Role
-            role_item = QTableWidgetItem(user_data['role'])
-            role_item.setFlags(role_item.flags() & ~Qt.ItemIsEditable)
-            self.users_table.setItem(row, col, role_item)
-            col += 1
-
-            # Created timestamp
-            created_item = QTableWidgetItem(user_data.get('created_at', 'Unknown'))
-            created_item.setFlags(created_item.flags() & ~Qt.ItemIsEditable)
-            self.users_table.setItem(row, col, created_item)
-            col += 1
-
-            # Relationship summary
-            rel_count = 0
-            if user_data['role'] == 'responder':
-                rel_count = len(user_data.get('linked_observers', {}))
-                rel_text = f"{rel_count} observer{'s' if rel_count != 1 else ''}"
-            else:  # observer
-                rel_count = len(user_data.get('observing', {}))
-                rel_text = f"Watching {rel_count} responder{'s' if rel_count != 1 else ''}"
-
-            rel_item = QTableWidgetItem()
-            rel_item.setData(Qt.DisplayRole, rel_text)
-            rel_item.setData(Qt.UserRole, rel_count)  # For sorting by count
-            rel_item.setFlags(rel_item.flags() & ~Qt.ItemIsEditable)
-            self.users_table.setItem(row, col, rel_item)
-            col += 1
-
-            # Engagement metrics (if showing)
-            if self.show_engagement_metrics:
-                # Engagement Score with color coding
-                score = user_data.get('engagement_score', 0)
-                score_item = QTableWidgetItem()
-                score_item.setData(Qt.DisplayRole, score)
-                score_item.setData(Qt.UserRole, score)
-                score_item.setFlags(score_item.flags() & ~Qt.ItemIsEditable)
-
-                # Color code based on health
-                if score > 90:
-                    score_item.setBackground(QBrush(QColor(200, 255, 200)))  # Light green
-                elif score >= 50:
-                    score_item.setBackground(QBrush(QColor(255, 255, 200)))  # Light yellow
-                elif score > 0:
-                    score_item.setBackground(QBrush(QColor(255, 200, 200)))  # Light red
-                else:
-                    score_item.setBackground(QBrush(QColor(240, 240, 240)))  # Light gray for no data
-
-                self.users_table.setItem(row, col, score_item)
-                col += 1
-
-                # Token Health
-                health_item = QTableWidgetItem(user_data.get('token_health', 'No data'))
-                health_item.setFlags(health_item.flags() & ~Qt.ItemIsEditable)
-                self.users_table.setItem(row, col, health_item)
-                col += 1
-
-                # Last Activity
-                activity_item = QTableWidgetItem(user_data.get('last_successful_notification', 'Never'))
-                activity_item.setFlags(activity_item.flags() & ~Qt.ItemIsEditable)
-                self.users_table.setItem(row, col, activity_item)
-                col += 1
-
-            # FCM details (if showing)
-            if self.show_fcm_details:
-                user_id = user_data['id']
-                fcm_data = self.fcm_token_data.get(user_id, {})
-                
-                # Recent FCM Events count
-                events_count = fcm_data.get('recent_events_count', 0)
-                events_item = QTableWidgetItem()
-                events_item.setData(Qt.DisplayRole, events_count)
-                events_item.setData(Qt.UserRole, events_count)
-                events_item.setFlags(events_item.flags() & ~Qt.ItemIsEditable)
-                
-                # Color code based on events count
-                if events_count > 10:
-                    events_item.setBackground(QBrush(QColor(255, 200, 200)))  # Light red for many events
-                elif events_count > 3:
-                    events_item.setBackground(QBrush(QColor(255, 255, 200)))  # Light yellow for some events
-                
-                self.users_table.setItem(row, col, events_item)
-                col += 1
-                
-                # Strikes count
-                strikes = fcm_data.get('total_strikes', 0)
-                strikes_item = QTableWidgetItem()
-                strikes_item.setData(Qt.DisplayRole, strikes)
-                strikes_item.setData(Qt.UserRole, strikes)
-                strikes_item.setFlags(strikes_item.flags() & ~Qt.ItemIsEditable)
-                
-                # Color code strikes
-                if strikes >= 2:
-                    strikes_item.setBackground(QBrush(QColor(255, 150, 150)))  # Red for multiple strikes
-                elif strikes > 0:
-                    strikes_item.setBackground(QBrush(QColor(255, 220, 150)))  # Orange for single strike
-                
-                self.users_table.setItem(row, col, strikes_item)
-                col += 1
-                
-                # Removals count  
-                removals = fcm_data.get('total_removals', 0)
-                removals_item = QTableWidgetItem()
-                removals_item.setData(Qt.DisplayRole, removals)
-                removals_item.setData(Qt.UserRole, removals)
-                removals_item.setFlags(removals_item.flags() & ~Qt.ItemIsEditable)
-                
-                # Color code removals
-                if removals > 0:
-                    removals_item.setBackground(QBrush(QColor(255, 180, 180)))  # Light red for any removals
-                
-                self.users_table.setItem(row, col, removals_item)
-                col += 1
-                
-                # Token Status summary
-                if events_count == 0 and strikes == 0 and removals == 0:
-                    status = "Healthy"
-                    status_color = QColor(200, 255, 200)  # Light green
-                elif removals > 0 or strikes >= 2:
-                    status = "Critical"
-                    status_color = QColor(255, 150, 150)  # Red
-                elif strikes > 0 or events_count > 5:
-                    status = "Warning"
-                    status_color = QColor(255, 220, 150)  # Orange
-                else:
-                    status = "Monitoring"
-                    status_color = QColor(255, 255, 200)  # Light yellow
-                
-                status_item = QTableWidgetItem(status)
-                status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-                status_item.setBackground(QBrush(status_color))
-                self.users_table.setItem(row, col, status_item)
-                col += 1
+    def toggle_paged_browsing(self, enabled):
+        """Switch between paged browsing and loading every user"""
+        self.page_sort_combo.setEnabled(enabled)
+        self.load_more_btn.setEnabled(False)
+        self.page_label.setText("")
+
+        if enabled:
+            self.restore_sorting()
+        self.refresh_users()
+
+    def start_paged_browsing(self):
+        """Reset the loaded users and fetch the first page in the selected order"""
+        if not self.paged_checkbox.isChecked():
+            return
+
+        self.status_text.append("Loading first page of users...")
+        self.clear_user_details()
+
+        self.restore_sorting()
+        self.fcm_token_data = {}
+        self.user_table = UserTable([])
+        self.users_data = self.user_table.users
+        self.user_model.set_table(self.user_table)
+        self.search_index = UserSearchIndex()
+        self.engagement_aggregate = self.firebase_manager.analytics.build_engagement_aggregate([])
+        self.overdue_monitor.load([])
+
+        # The token issue report covers every user, so it is loaded after the first page is shown
+        self._token_issues = {}
+        self.page_cursor = None
+        self.has_more_pages = True
+        self.load_next_page()
+        QTimer.singleShot(0, self.load_page_token_issues)
+        QTimer.singleShot(0, self.load_aggregated_engagement_summary)
+
+    def load_page_token_issues(self):
+        """Load the token issue report and apply it to the users already paged in"""
+        if not self.paged_checkbox.isChecked():
+            return
+
+        try:
+            self.load_token_issues()
+        except Exception as e:
+            self.status_text.append(f"Error loading FCM token data: {str(e)}")
+            self._token_issues = {}
+            return
+
+        for user_id, issue in self._token_issues.items():
+            user = self.user_table.get(user_id)
+            fcm_data = self.fcm_token_data.get(user_id)
+            if user is None or fcm_data is None:
+                continue
+            # Keep the recent events already loaded for the row
+            fcm_data.update({key: value for key, value in issue.items() if not key.startswith('recent_events')})
+            self.user_model.upsert_user(user, fcm_data)
+            self.invalidate_user_details(user_id)
+        self.update_fcm_summary()
+
+    def load_next_page(self):
+        """Fetch the next page of users and append it to the table"""
+        if not self.has_more_pages or self._loading_page:
+            return
+
+        self._loading_page = True
+        try:
+            sort_key, descending = PAGE_SORT_OPTIONS[self.page_sort_combo.currentText()]
+            users, self.page_cursor = self.firebase_manager.get_users_page(
+                sort_key, descending, self.PAGE_SIZE, self.page_cursor
+            )
+            self.has_more_pages = self.page_cursor is not None
+
+            self.load_fcm_token_data(users)
+            self.apply_user_updates(users)
+        finally:
+            self._loading_page = False
+
+        self.load_more_btn.setEnabled(self.has_more_pages)
+        more = "" if self.has_more_pages else " (all loaded)"
+        self.page_label.setText(f"{len(self.users_data)} users loaded{more}")
+        self.status_text.append(f"Loaded page of {len(users)} users")
+
+    def on_users_scrolled(self, value):
+        """Fetch the next page when the table is scrolled to the bottom in paged mode"""
+        if not self.paged_checkbox.isChecked() or not self.has_more_pages:
+            return
+
+        if value >= self.users_table.verticalScrollBar().maximum():
+            self.load_next_page()
+
+    def update_loaded_engagement_summary(self):
+        """Show the engagement summary of the loaded users
+
+        Paged mode only holds some of the users, so its summary comes from
+        load_aggregated_engagement_summary instead.
+        """
+        if self.engagement_aggregate is None or self.paged_checkbox.isChecked():
+            return
+        self.update_engagement_summary(self.engagement_aggregate.to_summary())
+
+    def load_aggregated_engagement_summary(self):
+        """Show engagement totals for the whole users collection from server-side aggregation"""
+        if not self.paged_checkbox.isChecked():
+            return
+        self.update_engagement_summary(self.firebase_manager.get_engagement_summary_aggregated())
 
     def update_engagement_summary(self, summary):
         """Update the engagement summary display"""
@@ -487,12 +592,17 @@ class ManageUsersTab(QWidget):
             self.summary_label.setText("No engagement data available")
             return
 
+        # Test accounts are unknown when the summary came from server-side aggregation
+        test_accounts = summary.get('test_accounts', 0)
+        if test_accounts is None:
+            test_accounts = "n/a"
+
         summary_text = (
             f"Total Users: {summary.get('total_users', 0)} | "
             f"Healthy: {summary.get('healthy_users', 0)} | "
             f"Declining: {summary.get('declining_users', 0)} | "
             f"Churned: {summary.get('churned_users', 0)} | "
-            f"Test Accounts: {summary.get('test_accounts', 0)} | "
+            f"Test Accounts: {test_accounts} | "
             f"Notification Success Rate: {summary.get('avg_notification_success_rate', 0):.1f}%"
         )
         self.summary_label.setText(summary_text)
@@ -523,6 +633,77 @@ class ManageUsersTab(QWidget):
         )
         self.fcm_summary_label.setText(fcm_summary_text)
 
+    def check_overdue_responders(self):
+        """Pop newly due responders and, without live updates, confirm the overdue set with the server
+
+        The monitor only knows the check-in times loaded with the users, so a
+        responder who checks in stays overdue until the next reload. With live
+        updates off, the nextCheckInTime range query is run whenever someone
+        becomes due and at least every OVERDUE_RECONCILE_SECONDS while anyone
+        is overdue; overdue responders it no longer returns get their new
+        time read back so they stay monitored.
+        """
+        newly_overdue = self.overdue_monitor.poll()
+        now = time.time()
+        stale = now - self.overdue_reconciled_at >= self.OVERDUE_RECONCILE_SECONDS
+
+        if len(self.overdue_monitor) and not self.live_sync.active and \
+                (newly_overdue or (stale and self.overdue_monitor.get_overdue(now))):
+            sample, uniform = self.next_check_in_sample()
+            overdue = self.firebase_manager.get_overdue_responders(limit=self.OVERDUE_QUERY_LIMIT, sample=sample)
+            if overdue is not None:
+                complete = uniform and len(overdue) < self.OVERDUE_QUERY_LIMIT
+                recheck = self.overdue_monitor.reconcile(overdue, complete=complete)
+                schedules = self.firebase_manager.get_check_in_schedules(recheck) if recheck else []
+                for schedule in schedules or []:
+                    self.overdue_monitor.update(schedule['id'], schedule['name'], schedule['nextCheckInTime'])
+                self.overdue_reconciled_at = now
+
+        self.update_overdue_summary()
+
+    def next_check_in_sample(self):
+        """Get a loaded responder's stored nextCheckInTime and whether all loaded times share its type
+
+        The overdue query's bound takes the sample's type, and only matches
+        stored times of that type (epoch seconds and milliseconds count as
+        different types here).
+        """
+        sample = None
+        kinds = set()
+        for user in self.users_data:
+            value = user.get('nextCheckInTime')
+            if user.get('role') != 'responder' or value is None:
+                continue
+            if isinstance(value, str):
+                kinds.add('text')
+            elif isinstance(value, (int, float)):
+                kinds.add('milliseconds' if value > 1e11 else 'seconds')
+            else:
+                kinds.add('timestamp')
+            if sample is None:
+                sample = value
+        return sample, len(kinds) <= 1
+
+    def update_overdue_summary(self):
+        """Update the overdue responders display"""
+        if not len(self.overdue_monitor):
+            if self.users_data:
+                self.overdue_label.setText("Overdue responders: none (no responders with a check-in schedule)")
+            else:
+                self.overdue_label.setText("Overdue responders: no check-in schedules loaded")
+            return
+
+        overdue = self.overdue_monitor.get_overdue()
+        if not overdue:
+            self.overdue_label.setText("Overdue responders: none ✅")
+            return
+
+        names = ", ".join(
+            f"{entry['name']} ({int(entry['overdue_seconds'] // 60)} min)" for entry in overdue[:5]
+        )
+        more = f" and {len(overdue) - 5} more" if len(overdue) > 5 else ""
+        self.overdue_label.setText(f"⏰ Overdue responders: {len(overdue)} — {names}{more}")
+
     def toggle_engagement_display(self):
         """Toggle the display of engagement metrics columns"""
         self.show_engagement_metrics = not self.show_engagement_metrics
@@ -534,8 +715,6 @@ class ManageUsersTab(QWidget):
 
         # Rebuild table with new headers
         self.setup_table_headers()
-        if self.users_data:
-            self.populate_user_table(self.users_data)
 
     def toggle_fcm_display(self):
         """Toggle the display of FCM token health columns"""
@@ -548,73 +727,66 @@ class ManageUsersTab(QWidget):
 
         # Rebuild table with new headers
         self.setup_table_headers()
-        if self.users_data:
-            self.populate_user_table(self.users_data)
+
+    def apply_preset_filter(self, preset_name):
+        """Put the selected preset's expression in the filter box and apply it"""
+        self.filter_input.setText(PRESET_FILTERS.get(preset_name, ""))
+        self.apply_filter()
 
     def apply_filter(self):
-        """Apply the selected filter to the user list"""
-        filter_text = self.filter_combo.currentText()
+        """Apply the filter expression to the user list"""
+        expression = self.filter_input.text().strip()
 
-        if not self.users_data:
+        try:
+            compiled = compile_filter(expression) if expression else None
+            shown = self.user_proxy.set_filter(compiled)
+        except (ValueError, TypeError) as e:
+            self.status_text.append(f"❌ Invalid filter '{expression}': {str(e)}")
             return
 
-        filtered_users = []
+        self.status_text.append(f"Applied filter '{expression or 'All Users'}': showing {shown} users")
 
-        for user in self.users_data:
-            include_user = False
-            user_id = user['id']
-            fcm_data = self.fcm_token_data.get(user_id, {})
-
-            if filter_text == "All Users":
-                include_user = True
-            elif filter_text == "Healthy Users (Score > 90)":
-                include_user = user.get('engagement_score', 0) > 90
-            elif filter_text == "Declining Users (Score 50-90)":
-                score = user.get('engagement_score', 0)
-                include_user = 50 <= score <= 90
-            elif filter_text == "Churned Users (Score < 50)":
-                include_user = user.get('engagement_score', 0) < 50
-            elif filter_text == "Users with Token Issues":
-                include_user = (fcm_data.get('total_strikes', 0) > 0 or 
-                               fcm_data.get('total_removals', 0) > 0 or 
-                               fcm_data.get('recent_events_count', 0) > 5)
-            elif filter_text == "Users with Multiple Strikes":
-                include_user = fcm_data.get('total_strikes', 0) >= 2
-            elif filter_text == "Users with Recent Removals":
-                include_user = fcm_data.get('total_removals', 0) > 0
-            elif filter_text == "Likely Test Accounts":
-                include_user = user.get('is_likely_test', False)
-            elif filter_text == "Real Users Only":
-                include_user = not user.get('is_likely_test', False)
-
-            if include_user:
-                filtered_users.append(user)
-
-        self.populate_user_table(filtered_users)
-        self.status_text.append(f"Applied filter '{filter_text}': showing {len(filtered_users)} users")
+    def apply_search(self):
+        """Narrow the user list to the users matching the search box"""
+        query = self.search_input.text().strip()
+        self.user_proxy.set_search(self.search_index.matching_ids(query) if query else None)
+
+    def selected_user(self):
+        """Get the user record of the selected row, or None"""
+        selected_rows = self.users_table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+        return self.user_proxy.user_at(selected_rows[0].row())
+
+    def select_user_rows(self, predicate):
+        """Select the visible rows whose source row satisfies predicate(source_row)
+
+        Returns:
+            Number of rows selected
+        """
+        selection = QItemSelection()
+        last_column = self.user_proxy.columnCount() - 1
+        count = 0
+
+        for row in range(self.user_proxy.rowCount()):
+            source_row = self.user_proxy.mapToSource(self.user_proxy.index(row, 0)).row()
+            if predicate(source_row):
+                selection.select(self.user_proxy.index(row, 0), self.user_proxy.index(row, last_column))
+                count += 1
+
+        self.users_table.selectionModel().select(
+            selection, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows
+        )
+        return count
 
     def select_users_with_token_issues(self):
         """Select all rows that have FCM token issues"""
         if not self.users_data:
             return
 
-        selected_count = 0
-        self.users_table.clearSelection()
-
-        for row in range(self.users_table.rowCount()):
-            user_id_item = self.users_table.item(row, 0)
-            if user_id_item:
-                user_id = user_id_item.text()
-                fcm_data = self.fcm_token_data.get(user_id, {})
-                
-                # Check if user has token issues
-                has_issues = (fcm_data.get('total_strikes', 0) > 0 or 
-                             fcm_data.get('total_removals', 0) > 0 or 
-                             fcm_data.get('recent_events_count', 0) > 5)
-                
-                if has_issues:
-                    self.users_table.selectRow(row)
-                    selected_count += 1
+        # Strikes, removals or many recent events, evaluated over the whole column at once
+        has_issues = compile_filter(PRESET_FILTERS["Users with Token Issues"])(self.user_table)
+        selected_count = self.select_user_rows(has_issues.__getitem__)
 
         self.status_text.append(f"Selected {selected_count} users with FCM token issues")
 
@@ -631,14 +803,9 @@ class ManageUsersTab(QWidget):
         if not self.users_data:
             return
 
-        selected_count = 0
-        self.users_table.clearSelection()
-
-        for row in range(self.users_table.rowCount()):
-            name_item = self.users_table.item(row, 1)
-            if name_item and name_item.background().color() == QColor(255, 255, 200):  # Test account color
-                self.users_table.selectRow(row)
-                selected_count += 1
+        test_account_ids = set(self.firebase_manager.identify_test_accounts(users=self.users_data))
+        ids = self.user_table.columns['id']
+        selected_count = self.select_user_rows(lambda row: ids[row] in test_account_ids)
 
         self.status_text.append(f"Selected {selected_count} test accounts")
 
@@ -652,8 +819,10 @@ class ManageUsersTab(QWidget):
 
     def on_user_selected(self):
         """Handle user selection in the table"""
-        selected_rows = self.users_table.selectedIndexes()
-        if not selected_rows:
+        user_data = self.selected_user()
+        if not user_data:
+            self._detail_user = None
+            self._dirty_detail_tabs = set()
             self.delete_user_btn.setEnabled(False)
             self.user_info_text.clear()
             self.relations_tree.clear()
@@ -664,37 +833,40 @@ class ManageUsersTab(QWidget):
 
         self.delete_user_btn.setEnabled(True)
 
-        # Get the selected row
-        row = selected_rows[0].row()
-        user_id = self.users_table.item(row, 0).text()
-
-        # Find the user data
-        user_data = None
-        for user in self.users_data:
-            if user['id'] == user_id:
-                user_data = user
-                break
+        # Only the visible detail tab is rendered now; the others when they are opened
+        self._detail_user = user_data
+        self._dirty_detail_tabs = set(range(self.details_tabs.count()))
+        self.render_current_detail_tab()
 
-        if not user_data:
+    def render_current_detail_tab(self):
+        """Render the visible detail tab for the selected user if it is out of date"""
+        index = self.details_tabs.currentIndex()
+        if self._detail_user is None or index not in self._dirty_detail_tabs:
             return
-
-        # Update user info tab
-        self.update_user_info(user_data)
-
-        # Update relationships tab
-        self.update_relationships_tree(user_data)
-
-        # Update engagement tab
-        self.update_engagement_info(user_data)
-
-        # Update FCM health tab
-        self.update_fcm_health_info(user_data)
-
-        # Update FCM events tab
-        self.update_fcm_events_table(user_data)
-
-    def update_user_info(self, user_data):
-        """Update the user info text area"""
+        self._dirty_detail_tabs.discard(index)
+
+        build, show = [
+            (self.format_user_info, self.user_info_text.setText),
+            (self.format_relationships, self.show_relationships),
+            (self.format_engagement_info, self.engagement_text.setText),
+            (self.format_fcm_health_info, self.fcm_health_text.setText),
+            (self.format_fcm_events, self.show_fcm_events),
+        ][index]
+
+        key = (self._detail_user['id'], index)
+        content = self.detail_cache.get(key)
+        if content is None:
+            content = build(self._detail_user)
+            self.detail_cache.put(key, content)
+        show(content)
+
+    def invalidate_user_details(self, user_id):
+        """Drop a user's memoized detail tabs after its data changed"""
+        for index in range(self.details_tabs.count()):
+            self.detail_cache.pop((user_id, index))
+
+    def format_user_info(self, user_data):
+        """Build the user info text"""
         info_text = f"User ID: {user_data['id']}\n"
         info_text += f"Name: {user_data['name']}\n"
         info_text += f"Role: {user_data['role']}\n"
@@ -727,32 +899,37 @@ class ManageUsersTab(QWidget):
         info_text += f"\nnextCheckInTime: {user_data['nextCheckInTime']}"
         info_text += f"\nlastCheckInTime: {user_data['lastCheckInTime']}"
         
-        self.user_info_text.setText(info_text)
+        return info_text
 
-    def update_relationships_tree(self, user_data):
-        """Update the relationships tree"""
-        self.relations_tree.clear()
+    def format_relationships(self, user_data):
+        """Build the relationships tree rows
 
+        Returns:
+            Tuple (root_label, [(relationship, user_id, name), ...])
+        """
         if user_data['role'] == 'responder':
             # Responder's observers
             observers = user_data.get('linked_observers', {})
-            root = QTreeWidgetItem(self.relations_tree, ["Observers"])
-            root.setExpanded(True)
+            return "Observers", [("Is observed by", observer_id, observer_name)
+                                 for observer_id, observer_name in observers.items()]
 
-            for observer_id, observer_name in observers.items():
-                item = QTreeWidgetItem(root, ["Is observed by", observer_id, observer_name])
+        # Observer's responders
+        responders = user_data.get('observing', {})
+        return "Monitoring", [("Is monitoring", responder_id, responder_name)
+                              for responder_id, responder_name in responders.items()]
 
-        else:  # observer
-            # Observer's responders
-            responders = user_data.get('observing', {})
-            root = QTreeWidgetItem(self.relations_tree, ["Monitoring"])
-            root.setExpanded(True)
+    def show_relationships(self, content):
+        """Fill the relationships tree from format_relationships output"""
+        root_label, rows = content
+        self.relations_tree.clear()
 
-            for responder_id, responder_name in responders.items():
-                item = QTreeWidgetItem(root, ["Is monitoring", responder_id, responder_name])
+        root = QTreeWidgetItem(self.relations_tree, [root_label])
+        root.setExpanded(True)
+        for row in rows:
+            QTreeWidgetItem(root, list(row))
 
-    def update_engagement_info(self, user_data):
-        """Update the engagement metrics display"""
+    def format_engagement_info(self, user_data):
+        """Build the engagement metrics text"""
         engagement_text = "=== ENGAGEMENT METRICS ===\n\n"
 
         score = user_data.get('engagement_score', 0)
@@ -792,10 +969,10 @@ class ManageUsersTab(QWidget):
         else:
             engagement_text += "• User is healthy and engaged ✅\n"
 
-        self.engagement_text.setText(engagement_text)
+        return engagement_text
 
-    def update_fcm_health_info(self, user_data):
-        """Update the FCM token health display"""
+    def format_fcm_health_info(self, user_data):
+        """Build the FCM token health text"""
         user_id = user_data['id']
         fcm_data = self.fcm_token_data.get(user_id, {})
         
@@ -872,17 +1049,20 @@ class ManageUsersTab(QWidget):
             fcm_text += "• User's token health is good\n"
             fcm_text += "• Continue normal monitoring\n"
         
-        self.fcm_health_text.setText(fcm_text)
+        return fcm_text
+
+    def format_fcm_events(self, user_data):
+        """Build the FCM events table rows for a user
 
-    def update_fcm_events_table(self, user_data):
-        """Update the FCM events table for the selected user"""
+        Returns:
+            List of (timestamp, event_type, reason, context, details) tuples
+        """
         user_id = user_data['id']
         fcm_data = self.fcm_token_data.get(user_id, {})
         recent_events = fcm_data.get('recent_events', [])
-        
-        self.fcm_events_table.setRowCount(len(recent_events))
-        
-        for row, event in enumerate(recent_events):
+
+        rows = []
+        for event in recent_events:
             # Timestamp
             timestamp = event.get('timestamp', '')
             if timestamp:
@@ -892,35 +1072,40 @@ class ManageUsersTab(QWidget):
                     timestamp = dt.strftime('%m/%d %H:%M:%S')
                 except:
                     pass
+
+            # Details
+            details = event.get('details', {})
+            if isinstance(details, dict):
+                details_str = ', '.join([f"{k}={v}" for k, v in details.items()])
+            else:
+                details_str = str(details)
+
+            rows.append((timestamp, event.get('eventType', ''), event.get('reason', ''),
+                         event.get('context', ''), details_str[:100]))
+        return rows
+
+    def show_fcm_events(self, rows):
+        """Fill the FCM events table from format_fcm_events output"""
+        self.fcm_events_table.setRowCount(len(rows))
+
+        for row, (timestamp, event_type, reason, context, details) in enumerate(rows):
             self.fcm_events_table.setItem(row, 0, QTableWidgetItem(timestamp))
-            
+
             # Event Type
-            event_type = event.get('eventType', '')
             event_item = QTableWidgetItem(event_type)
-            
+
             # Color code by event type
             if event_type == 'removal':
-                event_item.setBackground(QBrush(QColor(255, 180, 180)))  # Light red
+                event_item.setBackground(EVENT_TYPE_BRUSHES['removal'])  # Light red
             elif event_type == 'strike':
-                event_item.setBackground(QBrush(QColor(255, 220, 150)))  # Light orange
+                event_item.setBackground(EVENT_TYPE_BRUSHES['strike'])  # Light orange
             elif event_type == 'error':
-                event_item.setBackground(QBrush(QColor(255, 255, 180)))  # Light yellow
-            
+                event_item.setBackground(EVENT_TYPE_BRUSHES['error'])  # Light yellow
+
             self.fcm_events_table.setItem(row, 1, event_item)
-            
-            # Reason
-            self.fcm_events_table.setItem(row, 2, QTableWidgetItem(event.get('reason', '')))
-            
-            # Context
-            self.fcm_events_table.setItem(row, 3, QTableWidgetItem(event.get('context', '')))
-            
-            # Details
-            details = event.get('details', {})
-            if isinstance(details, dict):
-                details_str = ', '.join([f"{k}={v}" for k, v in details.items()])
-            else:
-                details_str = str(details)
-            self.fcm_events_table.setItem(row, 4, QTableWidgetItem(details_str[:100]))
+            self.fcm_events_table.setItem(row, 2, QTableWidgetItem(reason))
+            self.fcm_events_table.setItem(row, 3, QTableWidgetItem(context))
+            self.fcm_events_table.setItem(row, 4, QTableWidgetItem(details))
 
     def export_fcm_health_report(self):
         """Export FCM health report for all users"""
@@ -1009,28 +1194,142 @@ class ManageUsersTab(QWidget):
             self.status_text.append(f"❌ Export error: {str(e)}")
             QMessageBox.critical(self, "Export Error", f"Failed to export FCM health report: {str(e)}")
 
-    def delete_selected_user(self):
-        """Delete the selected user"""
-        selected_rows = self.users_table.selectedIndexes()
-        if not selected_rows:
+    def check_relationship_integrity(self):
+        """Scan for broken observer/responder links and offer to repair them"""
+        self.status_text.append("Scanning relationship integrity...")
+
+        report = self.firebase_manager.scan_relationship_integrity(dry_run=True)
+
+        if report['errors']:
+            self.status_text.append(f"❌ Relationship scan failed: {report['errors'][0]}")
             return
 
-        # Get the selected row
-        row = selected_rows[0].row()
-        user_id = self.users_table.item(row, 0).text()
-        user_name = self.users_table.item(row, 1).text()
-        user_role = self.users_table.item(row, 2).text()
+        problems = report['dangling'] + report['asymmetric']
+        self.status_text.append(
+            f"Scanned {report['users_scanned']} users and {report['links_checked']} links: "
+            f"{len(report['dangling'])} dangling, {len(report['asymmetric'])} one-sided"
+        )
 
-        # Find the user data
-        user_data = None
-        for user in self.users_data:
-            if user['id'] == user_id:
-                user_data = user
-                break
+        if not problems:
+            QMessageBox.information(self, "Relationships OK", "All observer/responder links are consistent.")
+            return
 
+        # Show a sample of the problems found
+        problem_lines = []
+        for problem in problems[:15]:
+            kind = "dangling" if problem in report['dangling'] else "one-sided"
+            problem_lines.append(
+                f"• {problem['user_id']} → {problem['target_name']} ({problem['target_id']}) "
+                f"in {problem['field']} [{kind}]"
+            )
+        if len(problems) > 15:
+            problem_lines.append(f"...and {len(problems) - 15} more")
+
+        confirm = QMessageBox.question(
+            self,
+            "Repair Relationships",
+            f"Found {len(report['dangling'])} dangling and {len(report['asymmetric'])} one-sided links "
+            f"on {report['documents_to_update']} user documents:\n\n"
+            + "\n".join(problem_lines) +
+            "\n\nRemove these broken links now?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+
+        if confirm != QMessageBox.Yes:
+            self.status_text.append("Relationship repair cancelled")
+            return
+
+        result = self.firebase_manager.scan_relationship_integrity(dry_run=False)
+
+        if result['errors']:
+            self.status_text.append(f"❌ Relationship repair had errors: {'; '.join(result['errors'])}")
+        self.status_text.append(f"✅ Repaired links on {result['documents_updated']} user documents")
+
+        self.refresh_users()
+        self.data_changed.emit()
+
+    def show_engagement_analytics(self):
+        """Show score distribution, signup cohorts and per-role success rates"""
+        if not self.users_data:
+            QMessageBox.warning(self, "No Data", "Load users before viewing engagement analytics")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Engagement Analytics")
+        dialog.resize(700, 600)
+        dialog_layout = QVBoxLayout(dialog)
+
+        role_layout = QHBoxLayout()
+        role_combo = QComboBox()
+        role_combo.addItems(["All Roles", "responder", "observer"])
+        role_layout.addWidget(QLabel("Role:"))
+        role_layout.addWidget(role_combo)
+        role_layout.addStretch()
+        dialog_layout.addLayout(role_layout)
+
+        report_text = QTextEdit()
+        report_text.setReadOnly(True)
+        report_text.setFont(QFont("Courier New", 9))
+        dialog_layout.addWidget(report_text)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(dialog.reject)
+        dialog_layout.addWidget(buttons)
+
+        def render():
+            role = role_combo.currentText()
+            analytics = self.firebase_manager.get_engagement_analytics(
+                self.users_data, None if role == "All Roles" else role, version=self.user_table.version
+            )
+            report_text.setText(self.format_engagement_analytics(analytics))
+
+        role_combo.currentTextChanged.connect(render)
+        render()
+        dialog.exec_()
+
+    def format_engagement_analytics(self, analytics):
+        """Format an engagement analytics result as a text report"""
+        if not analytics:
+            return "No engagement analytics available"
+
+        text = f"=== SCORE DISTRIBUTION ({analytics['users']} users) ===\n"
+        hist = analytics['histogram']
+        peak = max(hist['counts']) if any(hist['counts']) else 1
+        for i, count in enumerate(hist['counts']):
+            bar = "█" * int(40 * count / peak)
+            text += f"{hist['edges'][i]:>5.0f}-{hist['edges'][i + 1]:<5.0f} {count:>7} {bar}\n"
+
+        text += "\n=== PERCENTILES ===\n"
+        for q, value in analytics['percentiles'].items():
+            text += f"P{q}: {value:.1f}\n"
+
+        text += "\n=== SIGNUP COHORTS (by week) ===\n"
+        for cohort in analytics['cohorts']:
+            mean = f"{cohort['mean_score']:.1f}" if cohort['mean_score'] is not None else "n/a"
+            text += (f"{cohort['week']}  users: {cohort['users']:>6}  mean score: {mean:>5}  "
+                     f"healthy: {cohort['healthy_pct']:.0f}%\n")
+        decay = analytics['score_decay_per_week']
+        if decay is not None:
+            text += f"Score decay: {decay:.2f} points per week of account age\n"
+
+        text += "\n=== PER-ROLE NOTIFICATION SUCCESS ===\n"
+        for role, stats in analytics['roles'].items():
+            rate = f"{stats['success_rate']:.1f}%" if stats['success_rate'] is not None else "No data"
+            text += f"{role}: {stats['users']} users, success rate {rate}, mean score {stats['mean_score']:.1f}\n"
+
+        return text
+
+    def delete_selected_user(self):
+        """Delete the selected user"""
+        user_data = self.selected_user()
         if not user_data:
             return
 
+        user_id = user_data['id']
+        user_name = user_data['name']
+        user_role = user_data['role']
+
         # Enhanced confirmation dialog with engagement info and FCM health
         is_test = user_data.get('is_likely_test', False)
         score = user_data.get('engagement_score', 0)
@@ -1088,9 +1387,169 @@ class ManageUsersTab(QWidget):
 
         if success:
             self.status_text.append(f"✅ {message}")
-            # Refresh users list
-            self.refresh_users()
+            # Update the loaded data in place instead of re-scanning all users
+            self.remove_user_locally(user_data)
             # Emit signal that data has changed
             self.data_changed.emit()
         else:
-            self.status_text.append(f"❌ {message}")
\ No newline at end of file
+            self.status_text.append(f"❌ {message}")
+
+    def remove_user_locally(self, user_data):
+        """Drop a deleted user from the loaded data, summaries and table
+
+        Mirrors the relationship cleanup done by delete_user so the remaining
+        users stay consistent without reloading the users collection.
+        """
+        user_id = user_data['id']
+
+        self.users_table.clearSelection()
+        self.user_model.remove_user(user_id)
+        self.search_index.remove(user_id)
+        self.invalidate_user_details(user_id)
+        self.users_data = self.user_table.users
+        self.fcm_token_data.pop(user_id, None)
+
+        for peer_id in list(user_data.get('linked_observers', {})) + list(user_data.get('observing', {})):
+            peer = self.user_table.get(peer_id)
+            if peer:
+                peer.get('observing', {}).pop(user_id, None)
+                peer.get('linked_observers', {}).pop(user_id, None)
+                self.user_model.upsert_user(peer, self.fcm_token_data.get(peer_id))
+                self.search_index.add(peer)  # Its linked user names changed
+                self.invalidate_user_details(peer_id)
+
+        self.overdue_monitor.remove(user_id)
+        self.update_overdue_summary()
+
+        if self.engagement_aggregate is not None:
+            self.engagement_aggregate.remove_user(user_data)
+        if self.paged_checkbox.isChecked():
+            self.load_aggregated_engagement_summary()
+        else:
+            self.update_loaded_engagement_summary()
+        self.update_fcm_summary()
+
+    def toggle_live_updates(self, enabled):
+        """Start or stop applying user changes as they happen"""
+        if not enabled:
+            self.live_sync.stop()
+            self.status_text.append("Live updates stopped")
+            return
+
+        success, message = self.live_sync.start()
+        self.status_text.append(f"{'✅' if success else '❌'} {message}")
+        if not success:
+            self.live_updates_checkbox.blockSignals(True)
+            self.live_updates_checkbox.setChecked(False)
+            self.live_updates_checkbox.blockSignals(False)
+
+    def apply_user_updates(self, users, refresh_summaries=True):
+        """Add or update users in the loaded data, summaries and table rows
+
+        Existing rows are updated in place and new users are appended; the
+        proxy shows them if they pass the current filter. Users identical to
+        the loaded record are skipped.
+
+        Returns:
+            Number of users added or changed
+        """
+        if self.engagement_aggregate is None:
+            self.engagement_aggregate = self.firebase_manager.analytics.build_engagement_aggregate([])
+
+        updated = 0
+        for user in users:
+            user_id = user['id']
+            old_user = self.user_table.get(user_id)
+            if old_user == user:
+                continue
+
+            fcm_data = self.fcm_token_data.setdefault(user_id, {
+                'userId': user_id,
+                'userName': user.get('name', 'Unknown'),
+                'issues': [],
+                'total_removals': 0,
+                'total_strikes': 0,
+                'contexts': [],
+                'recent_events_count': 0,
+                'recent_events': []
+            })
+
+            if old_user is not None:
+                self.engagement_aggregate.remove_user(old_user)
+            self.engagement_aggregate.add_user(user)
+            self.user_model.upsert_user(user, fcm_data)
+            self.search_index.add(user)
+            self.invalidate_user_details(user_id)
+
+            if user['role'] == 'responder':
+                self.overdue_monitor.update(user_id, user.get('name', 'Unnamed'), user.get('nextCheckInTime'))
+            else:
+                self.overdue_monitor.remove(user_id)
+
+            updated += 1
+
+        self.users_data = self.user_table.users
+        if updated and self.search_input.text().strip():
+            self.apply_search()
+
+        if updated and refresh_summaries:
+            self.update_loaded_engagement_summary()
+            self.update_fcm_summary()
+            self.update_overdue_summary()
+
+        return updated
+
+    def apply_live_changes(self, changed_users, removed_ids):
+        """Apply added, modified and removed users from live sync to the loaded data and table
+
+        Only the affected rows are re-rendered. Changed users that are identical
+        to the loaded record (e.g. from the listener's initial snapshot) are skipped.
+        In paged mode only users on the loaded pages are updated.
+        """
+        if not self.live_sync.active:
+            return  # Changes queued before live updates were turned off
+
+        paged = self.paged_checkbox.isChecked()
+        if not self.users_data and not paged:
+            if changed_users:
+                self.load_users(changed_users)
+            return
+
+        if paged:
+            changed_users = [user for user in changed_users if self.user_table.get(user['id']) is not None]
+
+        selected_user = self.selected_user()
+        selected_id = selected_user['id'] if selected_user else None
+
+        updated = self.apply_user_updates(changed_users, refresh_summaries=False)
+
+        removed = 0
+        for user_id in removed_ids:
+            old_user = self.user_table.get(user_id)
+            if old_user is None:
+                continue
+
+            self.user_model.remove_user(user_id)
+            self.search_index.remove(user_id)
+            self.invalidate_user_details(user_id)
+            self.fcm_token_data.pop(user_id, None)
+            self.overdue_monitor.remove(user_id)
+            if self.engagement_aggregate is not None:
+                self.engagement_aggregate.remove_user(old_user)
+            removed += 1
+
+        self.users_data = self.user_table.users
+
+        if not updated and not removed:
+            return
+
+        self.update_loaded_engagement_summary()
+        self.update_fcm_summary()
+        self.update_overdue_summary()
+
+        if selected_id in removed_ids:
+            self.users_table.clearSelection()
+        elif selected_id is not None and any(user['id'] == selected_id for user in changed_users):
+            self.on_user_selected()
+
+        self.status_text.append(f"Live update: {updated} users added or changed, {removed} removed")
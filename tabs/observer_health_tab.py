@@ -0,0 +1,155 @@
+# observer_health_tab.py
+
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QTextEdit, QTableWidget, QTableWidgetItem,
+                             QHeaderView, QAbstractItemView, QSplitter,
+                             QTreeWidget, QTreeWidgetItem)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QBrush
+
+HEALTH_BRUSHES = {
+    'Critical': QBrush(QColor(255, 150, 150)),
+    'Attention': QBrush(QColor(255, 220, 150)),
+    'Healthy': QBrush(QColor(200, 255, 200)),
+}
+
+# Header -> rollup key; numeric columns sort by value
+OBSERVER_COLUMNS = [
+    ("Observer", 'observer_name'),
+    ("Observer ID", 'observer_id'),
+    ("Health", 'health'),
+    ("Responders", 'responders'),
+    ("Overdue", 'overdue_responders'),
+    ("Silent", 'silent_responders'),
+    ("Missing", 'missing_responders'),
+    ("Token\nIssues", 'token_issue_responders'),
+    ("Check-ins", 'check_ins'),
+    ("Avg\nEngagement", 'mean_engagement'),
+    ("Latest Check-in", 'latest_check_in'),
+]
+
+
+class ObserverHealthTab(QWidget):
+    """Tab showing how the responders each observer watches are doing"""
+
+    def __init__(self, firebase_manager):
+        super().__init__()
+        self.firebase_manager = firebase_manager
+        self.rollup = {}  # observer_id -> rollup row
+        self.loaded = False  # The rollup is built when the tab is first shown
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        controls_layout = QHBoxLayout()
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(lambda: self.refresh_rollup(sync=True))
+        self.summary_label = QLabel()
+        controls_layout.addWidget(self.refresh_btn)
+        controls_layout.addWidget(self.summary_label, 1)
+        layout.addLayout(controls_layout)
+
+        splitter = QSplitter(Qt.Vertical)
+
+        # One row per observer
+        self.observers_table = QTableWidget(0, len(OBSERVER_COLUMNS))
+        self.observers_table.setHorizontalHeaderLabels([header for header, _ in OBSERVER_COLUMNS])
+        self.observers_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.observers_table.horizontalHeader().setStretchLastSection(True)
+        self.observers_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.observers_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.observers_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.observers_table.itemSelectionChanged.connect(self.on_observer_selected)
+        splitter.addWidget(self.observers_table)
+
+        # The selected observer's responders
+        self.responders_tree = QTreeWidget()
+        self.responders_tree.setHeaderLabels(["Responder", "Responder ID", "Check-ins", "Latest Check-in",
+                                              "Overdue", "Engagement", "Token Status"])
+        splitter.addWidget(self.responders_tree)
+        splitter.setSizes([300, 200])
+        layout.addWidget(splitter, 1)
+
+        # Status area
+        self.status_text = QTextEdit()
+        self.status_text.setReadOnly(True)
+        self.status_text.setMaximumHeight(80)
+        layout.addWidget(QLabel("Status:"))
+        layout.addWidget(self.status_text)
+
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        """Build the rollup the first time the tab is shown rather than at startup"""
+        super().showEvent(event)
+        if not self.loaded:
+            # Other tabs may already have filled the check-in mirror; only sync if it is empty
+            self.refresh_rollup(sync=self.firebase_manager.status.check_in_store.count() == 0)
+
+    def refresh_rollup(self, sync=True):
+        """Rebuild the rollup from the loaded users, check-in mirror and token issues
+
+        Args:
+            sync: Bring the check-in mirror up to date first
+        """
+        self.loaded = True
+        self.status_text.append("Building observer health rollup...")
+
+        users = self.firebase_manager.users.get_cached_users()
+        token_issues = {issue['userId']: issue
+                        for issue in self.firebase_manager.fcm.get_users_with_token_issues(days=30)
+                        if issue.get('userId')}
+        rows = self.firebase_manager.get_observer_health(users, token_issues, sync)
+        self.rollup = {row['observer_id']: row for row in rows}
+
+        self.observers_table.setSortingEnabled(False)
+        self.observers_table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column, (_, key) in enumerate(OBSERVER_COLUMNS):
+                value = row[key]
+                item = QTableWidgetItem()
+                if key == 'mean_engagement':
+                    item.setData(Qt.DisplayRole, round(value, 1) if value is not None else None)
+                elif isinstance(value, int):
+                    item.setData(Qt.DisplayRole, value)
+                else:
+                    item.setText(str(value) if value is not None else "Never")
+                if key == 'health':
+                    item.setBackground(HEALTH_BRUSHES[value])
+                self.observers_table.setItem(row_index, column, item)
+        self.observers_table.setSortingEnabled(True)
+        self.responders_tree.clear()
+
+        counts = {health: sum(1 for row in rows if row['health'] == health) for health in HEALTH_BRUSHES}
+        self.summary_label.setText(f"{len(rows)} observers: {counts['Critical']} critical, "
+                                   f"{counts['Attention']} need attention, {counts['Healthy']} healthy")
+        self.status_text.append(f"Rolled up {len(rows)} observers from {len(users)} users")
+
+    def on_observer_selected(self):
+        """Show the selected observer's responders"""
+        self.responders_tree.clear()
+        selected = self.observers_table.selectedItems()
+        if not selected:
+            return
+
+        id_column = [key for _, key in OBSERVER_COLUMNS].index('observer_id')
+        observer_id = self.observers_table.item(selected[0].row(), id_column).text()
+        row = self.rollup.get(observer_id)
+        if row is None:
+            return
+
+        for detail in row['responders_detail']:
+            item = QTreeWidgetItem([
+                detail['name'] if detail['exists'] else f"{detail['name']} (deleted)",
+                detail['id'],
+                str(detail['check_ins']),
+                str(detail['latest_check_in'] or "Never"),
+                "Yes" if detail['overdue'] else "",
+                str(detail['engagement_score']),
+                detail['token_status'],
+            ])
+            if detail['overdue'] or not detail['exists']:
+                for column in range(item.columnCount()):
+                    item.setBackground(column, HEALTH_BRUSHES['Critical'])
+            self.responders_tree.addTopLevelItem(item)
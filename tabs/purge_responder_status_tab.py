@@ -1,10 +1,34 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QGroupBox, QTextEdit, QMessageBox,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
-                             QAbstractItemView, QCheckBox, QSplitter)
-from PyQt5.QtCore import Qt, QSize, pyqtSlot
+                             QTableView, QHeaderView, QListView, QTabWidget,
+                             QTableWidget, QTableWidgetItem, QComboBox,
+                             QAbstractItemView, QCheckBox, QSplitter, QInputDialog)
+from PyQt5.QtCore import Qt, QSize, QPoint, pyqtSlot
 from PyQt5.QtGui import QColor, QBrush
 import datetime
+import os
+
+from tabs.check_in_fetcher import CheckInFetcher
+from tabs.check_in_history_model import CheckInHistoryModel
+from tabs.checkable_table_model import CheckableTableModel, TableColumn
+from tabs.live_sync import LiveUserSync
+
+# Progress of an interrupted retention run, resumed by the next run with the same policy
+RETENTION_CHECKPOINT = os.path.join(os.path.expanduser('~'), '.danoggin_check_in_retention.json')
+
+ORPHANED_BRUSH = QBrush(QColor(255, 200, 200))
+
+HEATMAP_DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+RESPONDER_COLUMNS = [
+    TableColumn("Responder ID", 'id'),
+    TableColumn("Name", 'name'),
+    TableColumn("Check-ins", 'check_ins', alignment=Qt.AlignCenter),
+    TableColumn("Latest Check-in", 'latest_check_in'),
+    # Highlight orphaned entries in red
+    TableColumn("Status", 'orphaned', lambda orphaned: "Orphaned" if orphaned else "Valid",
+                lambda orphaned: ORPHANED_BRUSH if orphaned else None),
+]
 
 
 class PurgeResponderStatusTab(QWidget):
@@ -13,8 +37,22 @@ class PurgeResponderStatusTab(QWidget):
     def __init__(self, firebase_manager):
         super().__init__()
         self.firebase_manager = firebase_manager
-        self.responder_data = []  # Will store responder status information
-        self.user_data = {}  # Will store user information for quick lookups
+        self.responder_model = CheckableTableModel(RESPONDER_COLUMNS)  # One row per responder_status record
+        self.user_names = {}  # Will store user names for quick lookups
+        self.orphaned_ids = set()  # responder_status IDs with no matching user
+
+        # Optional live mode: keep names and orphan status current from a users listener
+        self.live_sync = LiveUserSync(self.firebase_manager.users)
+        self.live_sync.users_changed.connect(self.apply_live_changes)
+
+        # Check-in history is fetched a page at a time in the background;
+        # first pages are cached per responder
+        self.check_in_fetcher = CheckInFetcher(self.firebase_manager)
+        self.history_model = CheckInHistoryModel(self.check_in_fetcher)
+        self.check_in_fetcher.page_loaded.connect(self.update_details_label)
+        self._history_anchor = None  # Top visible history row while rows are added or dropped above it
+        self._heatmap_key = None  # Scope of the heatmap currently shown
+
         self.init_ui()
 
     def init_ui(self):
@@ -27,11 +65,8 @@ class PurgeResponderStatusTab(QWidget):
         table_widget = QWidget()
         table_layout = QVBoxLayout(table_widget)
 
-        self.responders_table = QTableWidget()
-        self.responders_table.setColumnCount(6)
-        self.responders_table.setHorizontalHeaderLabels([
-            "Select", "Responder ID", "Name", "Check-ins", "Latest Check-in", "Status"
-        ])
+        self.responders_table = QTableView()
+        self.responders_table.setModel(self.responder_model)
 
         # Set column widths
         self.responders_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
@@ -43,14 +78,22 @@ class PurgeResponderStatusTab(QWidget):
 
         self.responders_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.responders_table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.responders_table.itemSelectionChanged.connect(self.on_responder_selected)
+        self.responders_table.selectionModel().selectionChanged.connect(self.on_responder_selected)
 
         refresh_btn = QPushButton("Refresh List")
         refresh_btn.clicked.connect(self.refresh_responders)
 
+        self.live_updates_checkbox = QCheckBox("Live Updates")
+        self.live_updates_checkbox.setToolTip("Update names and orphan status as users change")
+        self.live_updates_checkbox.toggled.connect(self.toggle_live_updates)
+
+        refresh_layout = QHBoxLayout()
+        refresh_layout.addWidget(refresh_btn, 1)
+        refresh_layout.addWidget(self.live_updates_checkbox)
+
         table_layout.addWidget(QLabel("Responder Status Records:"))
         table_layout.addWidget(self.responders_table)
-        table_layout.addWidget(refresh_btn)
+        table_layout.addLayout(refresh_layout)
 
         splitter.addWidget(table_widget)
 
@@ -58,10 +101,50 @@ class PurgeResponderStatusTab(QWidget):
         details_widget = QWidget()
         details_layout = QVBoxLayout(details_widget)
 
-        self.details_text = QTextEdit()
-        self.details_text.setReadOnly(True)
+        # Scrolling to either end of the history loads the next page in that direction
+        self.details_label = QLabel()
+        self.history_view = QListView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.verticalScrollBar().valueChanged.connect(self.on_history_scrolled)
+        self.history_model.rowsAboutToBeInserted.connect(self.remember_history_anchor)
+        self.history_model.rowsAboutToBeRemoved.connect(self.remember_history_anchor)
+        self.history_model.rowsInserted.connect(self.on_history_rows_inserted)
+        self.history_model.rowsRemoved.connect(self.on_history_rows_removed)
+
+        history_widget = QWidget()
+        history_layout = QVBoxLayout(history_widget)
+        history_layout.addWidget(self.details_label)
+        history_layout.addWidget(self.history_view)
+
+        # Activity heatmap: check-ins by weekday and hour, from the local check-in mirror
+        heatmap_widget = QWidget()
+        heatmap_layout = QVBoxLayout(heatmap_widget)
+
+        heatmap_controls = QHBoxLayout()
+        heatmap_controls.addWidget(QLabel("Show:"))
+        self.heatmap_scope_combo = QComboBox()
+        self.heatmap_scope_combo.addItems(["Selected Responder", "All Responders"])
+        self.heatmap_scope_combo.currentIndexChanged.connect(self.update_heatmap)
+        heatmap_controls.addWidget(self.heatmap_scope_combo)
+        self.heatmap_summary_label = QLabel()
+        heatmap_controls.addWidget(self.heatmap_summary_label, 1)
+        heatmap_layout.addLayout(heatmap_controls)
+
+        self.heatmap_table = QTableWidget(len(HEATMAP_DAYS), 24)
+        self.heatmap_table.setVerticalHeaderLabels(HEATMAP_DAYS)
+        self.heatmap_table.setHorizontalHeaderLabels([f"{hour:02d}" for hour in range(24)])
+        self.heatmap_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.heatmap_table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.heatmap_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        heatmap_layout.addWidget(self.heatmap_table)
+
+        self.details_tabs = QTabWidget()
+        self.details_tabs.addTab(history_widget, "Check-in History")
+        self.details_tabs.addTab(heatmap_widget, "Activity Heatmap")
+        self.details_tabs.currentChanged.connect(self.update_heatmap)
+
         details_layout.addWidget(QLabel("Check-in Details:"))
-        details_layout.addWidget(self.details_text)
+        details_layout.addWidget(self.details_tabs)
 
         splitter.addWidget(details_widget)
 
@@ -89,7 +172,15 @@ class PurgeResponderStatusTab(QWidget):
         actions_layout.addWidget(self.select_all_btn)
         actions_layout.addWidget(self.deselect_all_btn)
         actions_layout.addWidget(self.select_orphaned_btn)
+        self.retention_btn = QPushButton("Apply Retention Policy...")
+        self.retention_btn.clicked.connect(self.apply_retention_policy)
+
+        self.compact_btn = QPushButton("Archive Old Check-ins...")
+        self.compact_btn.clicked.connect(self.compact_old_check_ins)
+
         actions_layout.addStretch()
+        actions_layout.addWidget(self.compact_btn)
+        actions_layout.addWidget(self.retention_btn)
         actions_layout.addWidget(self.purge_selected_btn)
         layout.addLayout(actions_layout)
 
@@ -108,162 +199,235 @@ class PurgeResponderStatusTab(QWidget):
     def refresh_responders(self):
         """Refresh the list of responder_status entries"""
         self.status_text.append("Loading responder status records...")
-        self.details_text.clear()
+        self.check_in_fetcher.clear()
+        self.history_model.set_responder(None)
+        self.update_details_label()
+        self._heatmap_key = None
+
+        # Key-only reconciliation of users against responder_status
+        orphan_report = self.firebase_manager.reconcile_orphans(include_user_names=True)
+        self.user_names = orphan_report.get('user_names', {})
+        self.orphaned_ids = orphan_report.get('orphaned_responder_status', set())
 
-        # Get all users first for reference
-        users = self.firebase_manager.get_users_with_relationships()
-        self.user_data = {user['id']: user for user in users}
+        orphaned_event_users = orphan_report.get('orphaned_token_event_users', set())
+        if orphaned_event_users:
+            self.status_text.append(f"Note: {len(orphaned_event_users)} users in token_events no longer exist")
 
         # Get responder_status data
         responder_status_data = self.firebase_manager.get_responder_status_data()
 
         if not responder_status_data:
             self.status_text.append("No responder status records found or failed to load data")
-            self.responders_table.setRowCount(0)
-            self.responder_data = []
+            self.responder_model.set_rows({column.key: [] for column in RESPONDER_COLUMNS})
             return
 
-        # Store the responder data
-        self.responder_data = responder_status_data
-
-        # Populate the table
-        self.responders_table.setRowCount(len(responder_status_data))
-        for row, responder_info in enumerate(responder_status_data):
-            responder_id = responder_info['id']
-            check_ins = responder_info['check_ins']
-            latest_check_in = responder_info['latest_check_in']
-
-            # Get user name if exists
-            user_exists = responder_id in self.user_data
-            user_name = self.user_data.get(responder_id, {}).get('name', 'Unknown')
-
-            # Checkbox cell for selection
-            checkbox = QTableWidgetItem()
-            checkbox.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            checkbox.setCheckState(Qt.Unchecked)
-            self.responders_table.setItem(row, 0, checkbox)
-
-            # Responder ID cell
-            id_item = QTableWidgetItem(responder_id)
-            id_item.setFlags(id_item.flags() & ~Qt.ItemIsEditable)
-            self.responders_table.setItem(row, 1, id_item)
-
-            # Name cell
-            name_item = QTableWidgetItem(user_name)
-            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
-            self.responders_table.setItem(row, 2, name_item)
-
-            # Check-ins count cell
-            count_item = QTableWidgetItem(str(check_ins))
-            count_item.setTextAlignment(Qt.AlignCenter)
-            count_item.setFlags(count_item.flags() & ~Qt.ItemIsEditable)
-            self.responders_table.setItem(row, 3, count_item)
-
-            # Latest check-in cell
-            latest_item = QTableWidgetItem(latest_check_in)
-            latest_item.setFlags(latest_item.flags() & ~Qt.ItemIsEditable)
-            self.responders_table.setItem(row, 4, latest_item)
-
-            # Status cell
-            status_text = "Valid" if user_exists else "Orphaned"
-            status_item = QTableWidgetItem(status_text)
-            status_item.setFlags(status_item.flags() & ~Qt.ItemIsEditable)
-
-            # Highlight orphaned entries in red
-            if not user_exists:
-                status_item.setBackground(QBrush(QColor(255, 200, 200)))
-
-            self.responders_table.setItem(row, 5, status_item)
+        # Populate the table, one list per column
+        ids = [info['id'] for info in responder_status_data]
+        self.responder_model.set_rows({
+            'id': ids,
+            'name': [self.user_names.get(responder_id, 'Unknown') for responder_id in ids],
+            'check_ins': [info['check_ins'] for info in responder_status_data],
+            'latest_check_in': [info['latest_check_in'] for info in responder_status_data],
+            'orphaned': [responder_id in self.orphaned_ids for responder_id in ids],
+        })
 
         self.status_text.append(f"Loaded {len(responder_status_data)} responder status records")
+        self.update_heatmap()
+
+    def toggle_live_updates(self, enabled):
+        """Start or stop following user changes"""
+        if not enabled:
+            self.live_sync.stop()
+            self.status_text.append("Live updates stopped")
+            return
+
+        success, message = self.live_sync.start()
+        self.status_text.append(f"{'✅' if success else '❌'} {message}")
+        if not success:
+            self.live_updates_checkbox.blockSignals(True)
+            self.live_updates_checkbox.setChecked(False)
+            self.live_updates_checkbox.blockSignals(False)
+
+    def apply_live_changes(self, changed_users, removed_ids):
+        """Update the name and orphan status of rows whose user was added, changed or removed"""
+        if not self.live_sync.active:
+            return  # Changes queued before live updates were turned off
+
+        changed = 0
+
+        for user in changed_users:
+            user_id = user['id']
+            name = user.get('name', 'Unnamed')
+            if self.user_names.get(user_id) == name and user_id not in self.orphaned_ids:
+                continue
+
+            self.user_names[user_id] = name
+            self.orphaned_ids.discard(user_id)
+
+            row = self.responder_model.row_of(user_id)
+            if row is not None:
+                self.responder_model.set_value(row, 'name', name)
+                self.responder_model.set_value(row, 'orphaned', False)
+                changed += 1
+
+        for user_id in removed_ids:
+            self.user_names.pop(user_id, None)
+
+            row = self.responder_model.row_of(user_id)
+            if row is not None and user_id not in self.orphaned_ids:
+                self.orphaned_ids.add(user_id)
+                self.responder_model.set_value(row, 'orphaned', True)
+                changed += 1
+
+        if changed:
+            self.status_text.append(f"Live update: {changed} responder status records changed")
 
     def on_responder_selected(self):
-        """Handle responder selection in the table"""
-        selected_rows = self.responders_table.selectedIndexes()
+        """Handle responder selection in the table
+
+        Shows the responder's history from a cached first page at once, or
+        fetches it in the background. The neighboring rows' first pages are
+        prefetched so moving through the list stays instant.
+        """
+        selected_rows = self.responders_table.selectionModel().selectedRows()
         if not selected_rows:
-            self.details_text.clear()
+            self.history_model.set_responder(None)
+            self.update_details_label()
+            self.update_heatmap()
             return
 
         # Get the selected row
         row = selected_rows[0].row()
-        responder_id = self.responders_table.item(row, 1).text()
+        self.history_model.set_responder(self.responder_model.value(row, 'id'))
+        self.update_details_label()
+        self.update_heatmap()
+
+        for neighbor in (row + 1, row - 1):
+            if 0 <= neighbor < self.responder_model.rowCount():
+                self.check_in_fetcher.request(self.responder_model.value(neighbor, 'id'))
+
+    def update_details_label(self, *args):
+        """Show the selected responder and its check-in count above the history"""
+        responder_id = self.history_model.responder_id
+        if responder_id is None:
+            self.details_label.clear()
+            return
+
+        row = self.responder_model.row_of(responder_id)
+        total = self.responder_model.value(row, 'check_ins') if row is not None else 'Unknown'
+        details = f"Responder ID: {responder_id}    Total Check-ins: {total}"
+
+        if self.history_model.loading and not self.history_model.rowCount():
+            details += "    Loading check-ins..."
+        elif not self.history_model.rowCount():
+            details += "    No check-in details available."
+
+        self.details_label.setText(details)
+
+    def on_history_scrolled(self, value):
+        """Load newer check-ins when the history is scrolled to the top
 
-        # Find the responder data
-        responder_info = None
-        for info in self.responder_data:
-            if info['id'] == responder_id:
-                responder_info = info
-                break
+        Older check-ins are loaded by the view itself through the model's fetchMore.
+        """
+        if value == self.history_view.verticalScrollBar().minimum():
+            self.history_model.fetch_newer()
 
-        if not responder_info:
+    def remember_history_anchor(self, parent, first, last):
+        """Remember the top visible row before rows are added or dropped above it"""
+        if first == 0 and self.history_model.rowCount():
+            self._history_anchor = self.history_view.indexAt(QPoint(0, 0)).row()
+
+    def on_history_rows_inserted(self, parent, first, last):
+        if first == 0:
+            self.restore_history_anchor(last - first + 1)
+
+    def on_history_rows_removed(self, parent, first, last):
+        if first == 0:
+            self.restore_history_anchor(first - last - 1)
+
+    def restore_history_anchor(self, shift):
+        """Scroll the remembered row back to the top after rows above it were added or dropped
+
+        Args:
+            shift: Number of rows added (positive) or dropped (negative) above it
+        """
+        anchor, self._history_anchor = self._history_anchor, None
+        if anchor is None or anchor < 0:
             return
 
-        # Get detailed check-in data
-        check_in_details = self.firebase_manager.get_responder_check_ins(responder_id)
+        row = max(0, min(anchor + shift, self.history_model.rowCount() - 1))
+        self.history_view.scrollTo(self.history_model.index(row), QAbstractItemView.PositionAtTop)
 
-        # Format details text
-        details = f"Responder ID: {responder_id}\n"
-        details += f"Total Check-ins: {len(check_in_details)}\n\n"
+    def update_heatmap(self, *args):
+        """Fill the heatmap for the selected responder or all responders
 
-        if check_in_details:
-            details += "Recent Check-ins:\n"
-            for i, check_in in enumerate(check_in_details[:10]):  # Show only 10 recent check-ins
-                details += f"{i + 1}. {check_in.get('timestamp', 'Unknown time')} - Result: {check_in.get('result', 'Unknown')}\n"
-                if 'prompt' in check_in:
-                    details += f"   Question: {check_in['prompt']}\n"
-                details += "\n"
+        Only rendered while the heatmap tab is visible, and only when its scope changed.
+        """
+        if self.details_tabs.currentIndex() != 1:
+            return
 
-            if len(check_in_details) > 10:
-                details += f"...and {len(check_in_details) - 10} more check-ins\n"
-        else:
-            details += "No check-in details available."
+        all_responders = self.heatmap_scope_combo.currentIndex() == 1
+        responder_id = None if all_responders else self.history_model.responder_id
+        key = ('all',) if all_responders else ('responder', responder_id)
+        if key == self._heatmap_key:
+            return
+        self._heatmap_key = key
+
+        self.heatmap_table.clearContents()
+        if not all_responders and responder_id is None:
+            self.heatmap_summary_label.setText("Select a responder")
+            return
 
-        self.details_text.setText(details)
+        heatmap = self.firebase_manager.get_check_in_heatmap(responder_id=responder_id)
+        if not heatmap:
+            self.heatmap_summary_label.setText("Heatmap unavailable")
+            return
+
+        counts, rates = heatmap['counts'], heatmap['success_rates']
+        busiest = max(map(max, counts)) or 1
+        for day, day_name in enumerate(HEATMAP_DAYS):
+            for hour in range(24):
+                count = counts[day][hour]
+                item = QTableWidgetItem(str(count) if count else "")
+                item.setTextAlignment(Qt.AlignCenter)
+                if count:
+                    # Darker blue for busier hours
+                    shade = int(225 * count / busiest)
+                    item.setBackground(QBrush(QColor(255 - shade, 255 - shade // 2, 255)))
+                    item.setToolTip(f"{day_name} {hour:02d}:00 - {count} check-ins, "
+                                    f"{rates[day][hour]:.0f}% correct")
+                self.heatmap_table.setItem(day, hour, item)
+
+        scope = "all responders" if all_responders else responder_id
+        self.heatmap_summary_label.setText(f"{heatmap['total']} check-ins for {scope} (local time)")
 
     def select_all_responders(self):
         """Select all responders in the table"""
-        for row in range(self.responders_table.rowCount()):
-            item = self.responders_table.item(row, 0)
-            if item:
-                item.setCheckState(Qt.Checked)
+        self.responder_model.set_all_checked(True)
         self.status_text.append("Selected all responder records")
 
     def deselect_all_responders(self):
         """Deselect all responders in the table"""
-        for row in range(self.responders_table.rowCount()):
-            item = self.responders_table.item(row, 0)
-            if item:
-                item.setCheckState(Qt.Unchecked)
+        self.responder_model.set_all_checked(False)
         self.status_text.append("Deselected all responder records")
 
     def select_orphaned_responders(self):
         """Select only orphaned responders (those without a user record)"""
-        count = 0
-        for row in range(self.responders_table.rowCount()):
-            status_item = self.responders_table.item(row, 5)
-            if status_item and status_item.text() == "Orphaned":
-                check_item = self.responders_table.item(row, 0)
-                if check_item:
-                    check_item.setCheckState(Qt.Checked)
-                    count += 1
-            else:
-                check_item = self.responders_table.item(row, 0)
-                if check_item:
-                    check_item.setCheckState(Qt.Unchecked)
+        orphaned = self.responder_model.values['orphaned']
+        rows = [row for row, is_orphaned in enumerate(orphaned) if is_orphaned]
+        self.responder_model.set_checked_rows(rows)
 
-        self.status_text.append(f"Selected {count} orphaned responder records")
+        self.status_text.append(f"Selected {len(rows)} orphaned responder records")
 
     def get_selected_responders(self):
-        """Get the selected responder IDs"""
-        selected = []
-        for row in range(self.responders_table.rowCount()):
-            checkbox = self.responders_table.item(row, 0)
-            if checkbox and checkbox.checkState() == Qt.Checked:
-                responder_id = self.responders_table.item(row, 1).text()
-                responder_name = self.responders_table.item(row, 2).text()
-                check_ins = self.responders_table.item(row, 3).text()
-                selected.append((responder_id, responder_name, check_ins))
-        return selected
+        """Get the selected responders
+
+        Returns:
+            List of tuples (responder_id, responder_name, check_in_count)
+        """
+        values = self.responder_model.values
+        ids, names, check_ins = values['id'], values['name'], values['check_ins']
+        return [(ids[row], names[row], check_ins[row]) for row in self.responder_model.checked_rows()]
 
     def purge_selected_responders(self):
         """Purge selected responder_status records"""
@@ -274,7 +438,7 @@ class PurgeResponderStatusTab(QWidget):
             return
 
         # Calculate total check-ins that will be deleted
-        total_check_ins = sum(int(count) for _, _, count in selected)
+        total_check_ins = sum(count for _, _, count in selected)
 
         # Confirmation dialog with list of responders to purge
         responder_list = "\n".join([f"• {name} ({id}): {count} check-ins" for id, name, count in selected])
@@ -301,6 +465,7 @@ class PurgeResponderStatusTab(QWidget):
             success, message = self.firebase_manager.purge_responder_status(responder_id)
 
             if success:
+                self.check_in_fetcher.invalidate(responder_id)
                 self.status_text.append(f"✅ Purged status for '{responder_name}' ({responder_id})")
                 success_count += 1
             else:
@@ -313,8 +478,88 @@ class PurgeResponderStatusTab(QWidget):
         # Refresh the list
         self.refresh_responders()
 
+    def apply_retention_policy(self):
+        """Delete every responder's check-ins older than a number of days"""
+        days, ok = QInputDialog.getInt(self, "Check-in Retention",
+                                       "Keep check-ins from the last how many days?", 365, 1, 3650)
+        if not ok:
+            return
+
+        self.status_text.append(f"Counting check-ins older than {days} days...")
+        preview = self.firebase_manager.apply_check_in_retention(days, dry_run=True)
+        if preview['errors']:
+            self.status_text.append(f"❌ Retention dry run failed: {'; '.join(preview['errors'])}")
+            return
+        if not preview['matched']:
+            self.status_text.append(f"No check-ins are older than {days} days")
+            return
+
+        confirm = QMessageBox.question(
+            self,
+            "Confirm Retention",
+            f"Delete {preview['matched']} check-ins older than {days} days across all responders?\n\n"
+            f"This action cannot be undone!",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            self.status_text.append("Retention cancelled")
+            return
+
+        report = self.firebase_manager.apply_check_in_retention(days, dry_run=False,
+                                                                checkpoint_path=RETENTION_CHECKPOINT)
+        if report['resumed']:
+            self.status_text.append("Resumed an interrupted retention run")
+        self.status_text.append(f"Deleted {report['deleted']} check-ins older than {days} days")
+        for error in report['errors']:
+            self.status_text.append(f"❌ {error}")
+
+        self.check_in_fetcher.clear()
+        self.refresh_responders()
+
+    def compact_old_check_ins(self):
+        """Roll every responder's old check-ins into monthly archives"""
+        days, ok = QInputDialog.getInt(self, "Archive Check-ins",
+                                       "Archive check-ins older than how many days?", 90, 1, 3650)
+        if not ok:
+            return
+
+        self.status_text.append(f"Finding check-ins older than {days} days...")
+        preview = self.firebase_manager.compact_check_ins(days, dry_run=True)
+        if preview['errors']:
+            self.status_text.append(f"❌ Archive dry run failed: {'; '.join(preview['errors'])}")
+            return
+        if not preview['check_ins']:
+            self.status_text.append(f"No check-ins are older than {days} days")
+            return
+
+        confirm = QMessageBox.question(
+            self,
+            "Confirm Archive",
+            f"Archive {preview['check_ins']} check-ins from {preview['responders']} responders "
+            f"into {preview['months']} monthly archives?\n\n"
+            f"The check-ins stay visible in the history, but their original documents are deleted.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            self.status_text.append("Archive cancelled")
+            return
+
+        report = self.firebase_manager.compact_check_ins(days)
+        self.status_text.append(f"Archived {report['check_ins']} check-ins into {report['months']} monthly archives "
+                                f"and removed {report['deleted']} check-in documents")
+        for error in report['errors']:
+            self.status_text.append(f"❌ {error}")
+
+        self.check_in_fetcher.clear()
+        self.refresh_responders()
+
     @pyqtSlot()
     def handle_user_deleted(self):
         """Handle the signal when a user is deleted"""
+        if self.live_sync.active:
+            return  # The users listener already reported the removal
+
         self.status_text.append("User deleted - refreshing responder status list...")
         self.refresh_responders()
\ No newline at end of file
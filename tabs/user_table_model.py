@@ -0,0 +1,278 @@
+# user_table_model.py
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QBrush, QColor, QFont
+
+from firebase_services.user_table import UserTable
+
+# Role holding each cell's typed sort key (numbers sort numerically, not as text)
+SORT_ROLE = Qt.UserRole
+
+_brushes = {}
+
+
+def _brush(r, g, b):
+    """Get a shared brush for a color, creating it on first use"""
+    brush = _brushes.get((r, g, b))
+    if brush is None:
+        brush = _brushes[(r, g, b)] = QBrush(QColor(r, g, b))
+    return brush
+
+
+# === CELL RENDERERS ===
+#
+# Each renderer takes (user, columns, row) and returns (display, sort_key, background)
+# where columns are the UserTable's flat column lists.
+
+def _text_cell(field, default=''):
+    return lambda user, columns, row: (user.get(field, default), user.get(field, default), None)
+
+
+def _name_cell(user, columns, row):
+    background = _brush(255, 255, 200) if columns['is_likely_test'][row] else None  # Test accounts
+    return user['name'], user['name'].lower(), background
+
+
+def _relationships_cell(user, columns, row):
+    count = columns['relationships'][row]
+    if user['role'] == 'responder':
+        text = f"{count} observer{'s' if count != 1 else ''}"
+    else:  # observer
+        text = f"Watching {count} responder{'s' if count != 1 else ''}"
+    return text, count, None
+
+
+def _score_cell(user, columns, row):
+    score = columns['engagement_score'][row]
+    if score > 90:
+        background = _brush(200, 255, 200)  # Light green
+    elif score >= 50:
+        background = _brush(255, 255, 200)  # Light yellow
+    elif score > 0:
+        background = _brush(255, 200, 200)  # Light red
+    else:
+        background = _brush(240, 240, 240)  # Light gray for no data
+    return score, score, background
+
+
+def _events_cell(user, columns, row):
+    events = columns['fcm_events'][row]
+    background = None
+    if events > 10:
+        background = _brush(255, 200, 200)  # Light red for many events
+    elif events > 3:
+        background = _brush(255, 255, 200)  # Light yellow for some events
+    return events, events, background
+
+
+def _strikes_cell(user, columns, row):
+    strikes = columns['strikes'][row]
+    background = None
+    if strikes >= 2:
+        background = _brush(255, 150, 150)  # Red for multiple strikes
+    elif strikes > 0:
+        background = _brush(255, 220, 150)  # Orange for single strike
+    return strikes, strikes, background
+
+
+def _removals_cell(user, columns, row):
+    removals = columns['removals'][row]
+    background = _brush(255, 180, 180) if removals > 0 else None  # Light red for any removals
+    return removals, removals, background
+
+
+def _token_status_cell(user, columns, row):
+    events = columns['fcm_events'][row]
+    strikes = columns['strikes'][row]
+    removals = columns['removals'][row]
+
+    if events == 0 and strikes == 0 and removals == 0:
+        return "Healthy", 0, _brush(200, 255, 200)  # Light green
+    if removals > 0 or strikes >= 2:
+        return "Critical", 3, _brush(255, 150, 150)  # Red
+    if strikes > 0 or events > 5:
+        return "Warning", 2, _brush(255, 220, 150)  # Orange
+    return "Monitoring", 1, _brush(255, 255, 200)  # Light yellow
+
+
+BASE_COLUMNS = [
+    ("User ID", _text_cell('id')),
+    ("Name", _name_cell),
+    ("Role", _text_cell('role')),
+    ("Created", _text_cell('created_at', 'Unknown')),
+    ("Relationships", _relationships_cell),
+]
+
+ENGAGEMENT_COLUMNS = [
+    ("Engagement\nScore", _score_cell),
+    ("Token\nHealth", _text_cell('token_health', 'No data')),
+    ("Last\nActivity", _text_cell('last_successful_notification', 'Never')),
+]
+
+FCM_COLUMNS = [
+    ("FCM\nEvents", _events_cell),
+    ("Strikes", _strikes_cell),
+    ("Removals", _removals_cell),
+    ("Token\nStatus", _token_status_cell),
+]
+
+
+class UserTableModel(QAbstractTableModel):
+    """Table model over a UserTable
+
+    Cells are rendered on demand from the table's rows, so only visible rows
+    cost anything to draw. The model also keeps the current filter's mask,
+    updating single entries as users are added or changed, so the filter
+    proxy never has to re-evaluate the whole expression.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.user_table = UserTable([])
+        self.column_specs = BASE_COLUMNS + ENGAGEMENT_COLUMNS + FCM_COLUMNS
+        self._filter = None  # Compiled filter, or None to show every user
+        self._mask = []
+        self._search_ids = None  # IDs matching the search box, or None when not searching
+
+        self._header_font = QFont()
+        self._header_font.setBold(True)
+
+    # === QAbstractTableModel interface ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.user_table)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.column_specs)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, SORT_ROLE, Qt.BackgroundRole):
+            return None
+
+        row = index.row()
+        renderer = self.column_specs[index.column()][1]
+        display, sort_key, background = renderer(self.user_table.users[row], self.user_table.columns, row)
+
+        if role == Qt.DisplayRole:
+            return display
+        if role == SORT_ROLE:
+            return sort_key
+        return background
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            return self.column_specs[section][0]
+        if role == Qt.FontRole:
+            return self._header_font
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignLeft | Qt.AlignVCenter
+        return None
+
+    # === Data updates ===
+
+    def set_table(self, user_table):
+        """Show a new UserTable, keeping the current filter"""
+        self.beginResetModel()
+        self.user_table = user_table
+        self._mask = self._filter(user_table) if self._filter else []
+        self.endResetModel()
+
+    def set_columns(self, show_engagement_metrics, show_fcm_details):
+        """Choose which optional column groups are shown"""
+        self.beginResetModel()
+        self.column_specs = list(BASE_COLUMNS)
+        if show_engagement_metrics:
+            self.column_specs += ENGAGEMENT_COLUMNS
+        if show_fcm_details:
+            self.column_specs += FCM_COLUMNS
+        self.endResetModel()
+
+    def set_filter(self, compiled_filter):
+        """Set the compiled filter (see compile_filter), or None to show every user
+
+        Returns:
+            Number of users passing the filter
+        """
+        self._mask = compiled_filter(self.user_table) if compiled_filter else []
+        self._filter = compiled_filter
+        return sum(self._mask) if compiled_filter else len(self.user_table)
+
+    def set_search(self, user_ids):
+        """Only show these user IDs (None to stop searching)"""
+        self._search_ids = user_ids
+
+    def accepts(self, row):
+        """Check whether a row passes the current filter and search"""
+        if self._filter and not self._mask[row]:
+            return False
+        return self._search_ids is None or self.user_table.columns['id'][row] in self._search_ids
+
+    def _matches(self, user, fcm_data):
+        return self._filter(UserTable([user], {user['id']: fcm_data}, self.user_table.now))[0]
+
+    def upsert_user(self, user, fcm_data=None):
+        """Add a user, or update its row in place"""
+        row = self.user_table.index_of(user['id'])
+
+        if row is None:
+            row = len(self.user_table)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.user_table.upsert(user, fcm_data)
+            if self._filter:
+                self._mask.append(self._matches(user, fcm_data or {}))
+            self.endInsertRows()
+            return
+
+        self.user_table.upsert(user, fcm_data)
+        if self._filter:
+            self._mask[row] = self._matches(user, fcm_data or {})
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.column_specs) - 1))
+
+    def remove_user(self, user_id):
+        """Remove a user's row"""
+        row = self.user_table.index_of(user_id)
+        if row is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.user_table.remove(user_id)
+        if self._filter:
+            del self._mask[row]
+        self.endRemoveRows()
+
+    def user_at(self, row):
+        """Get the user record shown in a row"""
+        return self.user_table.users[row]
+
+
+class UserFilterProxyModel(QSortFilterProxyModel):
+    """Sorts UserTableModel rows by their typed sort keys and hides rows failing its filter"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.sourceModel().accepts(source_row)
+
+    def set_filter(self, compiled_filter):
+        """Apply a compiled filter (or None for every user)
+
+        Returns:
+            Number of users passing the filter
+        """
+        count = self.sourceModel().set_filter(compiled_filter)
+        self.invalidateFilter()
+        return count
+
+    def set_search(self, user_ids):
+        """Only show these user IDs (None to show every user passing the filter)"""
+        self.sourceModel().set_search(user_ids)
+        self.invalidateFilter()
+
+    def user_at(self, proxy_row):
+        """Get the user record shown in a view row"""
+        return self.sourceModel().user_at(self.mapToSource(self.index(proxy_row, 0)).row())
@@ -0,0 +1,81 @@
+# tests/test_observer_health.py
+
+import pytest
+
+pytest.importorskip('firebase_admin')
+pytest.importorskip('google.cloud.firestore_v1')
+
+from firebase_services.check_in_store import CheckInStore
+from firebase_services.observer_health import observer_rollup
+from firebase_services.user_manager import UserManager
+
+NOW = 1_700_000_000
+
+
+def build_users(documents):
+    """Build user records exactly as get_users_with_engagement_metrics does"""
+    manager = UserManager(base_manager=None)
+    return [manager._build_engagement_user_info(user_id, data) for user_id, data in documents.items()]
+
+
+def responder_document(name, next_check_in, observers):
+    return {
+        'name': name,
+        'role': 'responder',
+        'fcmTokens': [],
+        'linkedObservers': observers,
+        'checkInSettings': {'nextCheckInTime': next_check_in, 'lastCheckInTime': next_check_in - 3600},
+        'engagementMetrics': {'engagementScore': 80},
+    }
+
+
+def test_rollup_uses_observing_from_builder_output():
+    users = build_users({
+        'obs1': {
+            'name': 'Olive',
+            'role': 'observer',
+            'fcmTokens': [],
+            'observing': {'resp1': 'Rita', 'resp2': 'Ray'},
+        },
+        'resp1': responder_document('Rita', NOW - 600, {'obs1': 'Olive'}),
+        'resp2': responder_document('Ray', NOW + 600, {'obs1': 'Olive'}),
+    })
+
+    rows = observer_rollup(users, {'resp1': (3, '2023-11-14T20:00:00'), 'resp2': (0, None)}, now=NOW)
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert row['observer_id'] == 'obs1'
+    assert row['responders'] == 2
+    assert row['overdue_responders'] == 1
+    assert row['silent_responders'] == 1
+    assert row['check_ins'] == 3
+    assert row['health'] == 'Critical'
+
+
+def test_observer_without_responders_is_healthy():
+    users = build_users({
+        'obs1': {'name': 'Olive', 'role': 'observer', 'fcmTokens': []},
+    })
+
+    rows = observer_rollup(users, {}, now=NOW)
+
+    assert rows[0]['responders'] == 0
+    assert rows[0]['health'] == 'Healthy'
+
+
+def test_rollup_reads_epoch_timestamps_from_the_mirror():
+    users = build_users({
+        'obs1': {'name': 'Olive', 'role': 'observer', 'fcmTokens': [], 'observing': {'resp1': 'Rita'}},
+        'resp1': responder_document('Rita', NOW + 600, {'obs1': 'Olive'}),
+    })
+    store = CheckInStore()
+    store.upsert_check_ins([
+        ('responder_status/resp1/check_ins/a', 'resp1', 'a', {'timestamp': (NOW - 7200) * 1000}),
+        ('responder_status/resp1/check_ins/b', 'resp1', 'b', {'timestamp': (NOW - 3600) * 1000}),
+    ])
+
+    rows = observer_rollup(users, store.summary(), now=NOW)
+
+    assert rows[0]['check_ins'] == 2
+    assert rows[0]['latest_check_in'] == (NOW - 3600) * 1000